@@ -0,0 +1,527 @@
+# Per-tick cost of the vehicle extensions' hot paths, outside Kit.
+#
+#   python benchmarks/bench_hot_paths.py --ticks 2000 --wheels 4,8 --contacts 16,128 --vehicles 1,16 \
+#       --out bench.json --baseline previous_bench.json
+#
+# Needs usd-core (pxr) and numpy; Kit, carb and PhysX are the stand-ins in kit_stand_ins.py,
+# the stage is an in-memory pxr stage built here. Each benchmark drives one hot path for
+# --ticks ticks and reports the per-tick time (mean, p50, p99) and, from a second pass with
+# tracemalloc on, the memory allocated per tick. With --baseline, p50s more than --threshold
+# slower than the baseline's are listed and the exit code is 1.
+#
+#   round_physics_step      JumpTestRound.physics_step             wheels
+#   contact_report          JumpTestRound._on_contact_report_event contacts
+#   vehicle_audio_step      VehicleAudio.step_audio                wheels
+#   jumper_cam_step         JumperCam.step_camera                  -
+#   vehicle_definition_load VehicleDefinition.load_from_definition_prim, all vehicles   vehicles, wheels
+#   helper_frame            one app update with WheelRefTestExtension.tick_vehicle_list, vehicles moving  vehicles, wheels
+#   transform_sync          TransformSync.sync, every vehicle moving                 vehicles, wheels
+#   vehicle_index_attach    VehicleIndex.attach on a stage file, walking the stage     vehicles, wheels
+#   vehicle_index_cached    VehicleIndex.attach on a stage file, from its sidecar index vehicles, wheels
+import os
+import sys
+import gc
+import io
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+import contextlib
+import subprocess
+import tracemalloc
+
+import kit_stand_ins
+kit = kit_stand_ins.install()
+
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdLux
+
+import omni.docs.vehicle.helper as helper
+import omni.docs.vehicle.jumper as jumper
+from omni.docs.vehicle.jumper import extension as jumper_ext
+from omni.docs.vehicle.jumper.extension import SimData, UI_Data, ValueModel, VEHICLE_PRIM_PATH
+from omni.docs.vehicle.jumper.jumper_cam import JumperCam
+from omni.docs.vehicle.jumper.vehicle_audio import VehicleAudio
+
+from kit_stand_ins import (
+    ContactData,
+    ContactHeader,
+    sdf_path_to_int,
+    VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED,
+    VEHICLE_WHEEL_STATE_GROUND_MATERIAL,
+    VEHICLE_WHEEL_STATE_SUSPENSION_FORCE,
+    VEHICLE_WHEEL_STATE_IS_ON_GROUND,
+    VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP,
+    VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP
+)
+
+STEP_DT = 1.0 / 60.0
+# cm/s along x, fast enough that the round never stalls
+VEHICLE_SPEED = 1000.0
+RESULTS_VERSION = 1
+
+
+################################ stage ################################
+
+def wheel_names(num_wheels):
+    names = []
+    for idx in range(num_wheels):
+        side = "/LeftWheel" if idx % 2 == 0 else "/RightWheel"
+        names.append(f"{side}{idx // 2 + 1}References")
+    return names
+
+
+def float_attr(prim, name, value, value_type=Sdf.ValueTypeNames.Float):
+    prim.CreateAttribute(name, value_type).Set(value)
+
+
+def transform_prim(stage, path, translate=(0.0, 0.0, 0.0)):
+    prim = UsdGeom.Xform.Define(stage, path).GetPrim()
+    UsdGeom.Xformable(prim).AddTransformOp().Set(Gf.Matrix4d(1.0).SetTranslate(Gf.Vec3d(*translate)))
+    return prim
+
+
+# the jump test scene as far as the round logic, camera and audio look at it, with num_wheels
+# wheels, plus num_vehicles vehicle helper definitions (physx vehicle, meshes, veh_ prim)
+def build_stage(num_wheels, num_vehicles):
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.SetStageMetersPerUnit(stage, 0.01)
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.y)
+
+    vehicle = transform_prim(stage, VEHICLE_PRIM_PATH)
+    for name, value in [ ("physxVehicleEngine:moi", 1.0),
+                         ("physxVehicleEngine:dampingRateFullThrottle", 0.15),
+                         ("physxVehicleEngine:dampingRateZeroThrottleClutchEngaged", 2.0),
+                         ("physxVehicleEngine:peakTorque", 5000.0),
+                         ("physxVehicleEngine:maxRotationSpeed", 800.0),
+                         ("physxVehicleController:accelerator", 0.0),
+                         ("physxVehicleController:brake0", 0.0),
+                         ("physxVehicleController:brake1", 0.0) ]:
+        float_attr(vehicle, name, value)
+    float_attr(vehicle, "physxVehicleController:targetGear", 1, Sdf.ValueTypeNames.Int)
+    float_attr(vehicle, "physics:velocity", Gf.Vec3f(VEHICLE_SPEED, 0, 0), Sdf.ValueTypeNames.Vector3f)
+    for name in wheel_names(num_wheels):
+        wheel = transform_prim(stage, VEHICLE_PRIM_PATH + name)
+        float_attr(wheel, "physxVehicleTire:longitudinalStiffness", 5000.0)
+    for path in [jumper_ext.VEHICLE_COLLISION_PRIM_PATH, jumper_ext.VEHICLE_ROOF_PRIM_PATH]:
+        transform_prim(stage, path)
+
+    friction = stage.DefinePrim(jumper_ext.WHEEL_FRICTION_PRIM_PATH)
+    float_attr(friction, "defaultFrictionValue", 0.7)
+    for path in [jumper_ext.END_GOAL_PRIM_PATH, jumper_ext.LANDING_RAMP_PRIM_PATH]:
+        transform_prim(stage, path)
+
+    camera = UsdGeom.Camera.Define(stage, jumper_ext.JUMPER_CAMERA_PATH)
+    camera.AddTransformOp().Set(Gf.Matrix4d(1.0))
+    for path in jumper_ext.HEADLIGHTS:
+        UsdLux.SphereLight.Define(stage, path).CreateIntensityAttr(2000000.0)
+    for path in audio_prim_paths():
+        sound = stage.DefinePrim(path)
+        float_attr(sound, "gain", 0.0)
+        float_attr(sound, "timeScale", 1.0)
+        float_attr(sound, "loopCount", -1, Sdf.ValueTypeNames.Int)
+
+    for v_idx in range(num_vehicles):
+        physx_path = f"/World/Vehicles/physx_{v_idx}"
+        transform_prim(stage, physx_path, (v_idx * 500.0, 0.0, 0.0))
+        mesh_wheels = []
+        for w_idx, name in enumerate(wheel_names(num_wheels)):
+            transform_prim(stage, physx_path + name, (v_idx * 500.0 + w_idx * 10.0, 0.0, 0.0))
+            mesh_wheel = f"/World/Meshes/mesh_{v_idx}/wheel_{w_idx}"
+            transform_prim(stage, mesh_wheel)
+            mesh_wheels.append(mesh_wheel)
+        chassis = f"/World/Meshes/mesh_{v_idx}/chassis"
+        transform_prim(stage, chassis)
+        definition = stage.DefinePrim(f"/World/Definitions/{helper.VEHICLE_DEF_PREFIX}{v_idx}")
+        definition.CreateAttribute(helper.VEH_PHYS_VEH_ATTR, Sdf.ValueTypeNames.String).Set(physx_path)
+        definition.CreateAttribute(helper.VEH_MESH_CHASSIS_ATTR, Sdf.ValueTypeNames.String).Set(chassis)
+        definition.CreateAttribute(helper.VEH_MESH_WHEELS_ATTR, Sdf.ValueTypeNames.StringArray).Set(mesh_wheels)
+
+    kit.usd_context.stage = stage
+    return stage
+
+
+def audio_prim_paths():
+    return [ jumper_ext.SOUND_TIRE_SKID_PATH, jumper_ext.SOUND_VEHICLE_ENGINE_PATH,
+             jumper_ext.SOUND_ENGINE_REV_PATH, jumper_ext.SOUND_SUSPENSION_SLAM_PATH,
+             jumper_ext.SOUND_IMPACT_LARGE_PATH_1, jumper_ext.SOUND_IMPACT_LARGE_PATH_2,
+             jumper_ext.SOUND_IMPACT_LARGE_PATH_3 ]
+
+
+################################ physx state ################################
+
+# wheels on the road, light suspension load, the vehicle driving along x
+def set_vehicle_state(num_wheels):
+    kit.physx.wheel_states.clear()
+    for idx, name in enumerate(wheel_names(num_wheels)):
+        kit.physx.wheel_states[VEHICLE_PRIM_PATH + name] = {
+            VEHICLE_WHEEL_STATE_SUSPENSION_FORCE: (0.0, 3000.0 + idx, 0.0),
+            VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP: 0.05,
+            VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP: 0.01,
+            VEHICLE_WHEEL_STATE_IS_ON_GROUND: True,
+            VEHICLE_WHEEL_STATE_GROUND_MATERIAL: jumper_ext.MATERIAL_SAFE_ROAD }
+    kit.physx.drive_states[VEHICLE_PRIM_PATH] = { VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED: 400.0 }
+    move_vehicle(0.0)
+
+
+def move_vehicle(sim_time):
+    kit.physx.poses[VEHICLE_PRIM_PATH] = ((VEHICLE_SPEED * sim_time, 50.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+
+
+def sim_data_for(stage, num_wheels):
+    sim_data = SimData(headless=True)
+    sim_data.test_stage = stage
+    sim_data.wheel_list = wheel_names(num_wheels)
+    sim_data.sim_torque_steps = 1
+    sim_data.sim_min_torque = 5000.0
+    sim_data.sim_max_torque = 5000.0
+    sim_data.fast_forward = True
+    sim_data.round_time_budget = 1e6
+    sim_data.engine_max_rpm = 800.0
+    return sim_data
+
+
+################################ benchmarks ################################
+# each returns (tick function, cleanup function)
+
+def bench_round_physics_step(num_wheels, **_):
+    stage = build_stage(num_wheels, 0)
+    set_vehicle_state(num_wheels)
+    test_round = jumper.JumpTestRound(sim_data_for(stage, num_wheels), UI_Data(), headless=True)
+    test_round.reset_test(test_round.sim_data)
+    test_round.start_test()
+    clock = [0.0]
+
+    def tick():
+        clock[0] += STEP_DT
+        move_vehicle(clock[0])
+        kit.physx.step(STEP_DT)
+
+    return tick, test_round.finish_test
+
+
+def bench_contact_report(num_wheels, num_contacts, **_):
+    stage = build_stage(num_wheels, 0)
+    set_vehicle_state(num_wheels)
+    test_round = jumper.JumpTestRound(sim_data_for(stage, num_wheels), UI_Data(), headless=True)
+    test_round.reset_test(test_round.sim_data)
+    test_round.start_test()
+
+    # vehicle against the ramp and some other body, four contact points per pair
+    vehicle_id = sdf_path_to_int(VEHICLE_PRIM_PATH)
+    others = [sdf_path_to_int(jumper_ext.LANDING_RAMP_PRIM_PATH), sdf_path_to_int("/World/ground")]
+    collider_id = sdf_path_to_int(jumper_ext.VEHICLE_COLLISION_PRIM_PATH)
+    material_id = sdf_path_to_int(jumper_ext.MATERIAL_SAFE_RAMP)
+    rng = np.random.default_rng(0)
+    contact_data = [ContactData(tuple(rng.uniform(-100.0, 100.0, 3)), material_id, material_id)
+                     for _ in range(num_contacts)]
+    contact_headers = []
+    for offset in range(0, num_contacts, 4):
+        contact_headers.append(ContactHeader(vehicle_id, others[(offset // 4) % 2], collider_id, 0,
+                                             offset, min(4, num_contacts - offset)))
+
+    def tick():
+        kit.physx_simulation.report_contacts(contact_headers, contact_data)
+
+    return tick, test_round.finish_test
+
+
+def bench_vehicle_audio_step(num_wheels, **_):
+    stage = build_stage(num_wheels, 0)
+    set_vehicle_state(num_wheels)
+    sim_data = sim_data_for(stage, num_wheels)
+    ui_data = UI_Data()
+    ui_data.engine_rpm_model = ValueModel()
+    audio = VehicleAudio()
+    audio.setup_audio( vehicle_prim_path=VEHICLE_PRIM_PATH,
+                       audio_tire_skid_prim_path=jumper_ext.SOUND_TIRE_SKID_PATH,
+                       audio_car_engine_prim_path=jumper_ext.SOUND_VEHICLE_ENGINE_PATH,
+                       audio_engine_rev_path=jumper_ext.SOUND_ENGINE_REV_PATH,
+                       audio_suspension_slam_path=jumper_ext.SOUND_SUSPENSION_SLAM_PATH,
+                       audio_impact_heavy_list=[ jumper_ext.SOUND_IMPACT_LARGE_PATH_1,
+                                                 jumper_ext.SOUND_IMPACT_LARGE_PATH_2,
+                                                 jumper_ext.SOUND_IMPACT_LARGE_PATH_3 ],
+                       sim_data=sim_data,
+                       ui_data=ui_data,
+                       stage=stage )
+    state = jumper.VehicleState(stage.GetPrimAtPath(VEHICLE_PRIM_PATH),
+                                [VEHICLE_PRIM_PATH + name for name in sim_data.wheel_list],
+                                kit.physx, pose_from_physx=True)
+    audio.state_source = state
+    audio.start_audio()
+    clock = [0.0]
+
+    def tick():
+        clock[0] += STEP_DT
+        state.sample(clock[0])
+        audio.step_audio(STEP_DT)
+
+    return tick, lambda: None
+
+
+def bench_jumper_cam_step(num_wheels, **_):
+    stage = build_stage(num_wheels, 0)
+    set_vehicle_state(num_wheels)
+    vehicle_prim = stage.GetPrimAtPath(VEHICLE_PRIM_PATH)
+    camera = JumperCam()
+    camera.setup_camera(camera_prim_path=jumper_ext.JUMPER_CAMERA_PATH, vehicle_prim=vehicle_prim, stage=stage)
+    state = jumper.VehicleState(vehicle_prim, [], kit.physx, pose_from_physx=True)
+    camera.state_source = state
+    camera.car_started_moving = True
+    clock = [0.0]
+
+    def tick():
+        clock[0] += STEP_DT
+        move_vehicle(clock[0])
+        state.sample(clock[0])
+        camera.step_camera(STEP_DT)
+
+    return tick, lambda: None
+
+
+def bench_vehicle_definition_load(num_wheels, num_vehicles, **_):
+    stage = build_stage(num_wheels, num_vehicles)
+    definitions = [prim for prim in stage.Traverse() if prim.GetName().startswith(helper.VEHICLE_DEF_PREFIX)]
+
+    def tick():
+        # setup_vehicle prints every wheel pair
+        with contextlib.redirect_stdout(io.StringIO()):
+            for definition in definitions:
+                helper.VehicleDefinition().load_from_definition_prim(stage, definition)
+
+    return tick, lambda: None
+
+
+def bench_helper_frame(num_wheels, num_vehicles, **_):
+    stage = build_stage(num_wheels, num_vehicles)
+    extension = helper.WheelRefTestExtension()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extension.on_startup("bench")
+        # no window after the headless signal timeout, and vehicles loaded before timing
+        extension.headless_signal_timeout = 0.0
+        kit.frame(STEP_DT)
+    # the mesh sync only runs while playing
+    kit.timeline.play()
+    physx_transforms = [stage.GetAttributeAtPath(f"/World/Vehicles/physx_{v_idx}.xformOp:transform")
+                        for v_idx in range(num_vehicles)]
+    clock = [0.0]
+
+    def tick():
+        # PhysX moves every vehicle each frame
+        clock[0] += STEP_DT
+        with Sdf.ChangeBlock():
+            for v_idx, attr in enumerate(physx_transforms):
+                attr.Set(Gf.Matrix4d(1.0).SetTranslate(Gf.Vec3d(v_idx * 500.0 + VEHICLE_SPEED * clock[0], 0.0, 0.0)))
+        kit.frame(STEP_DT)
+
+    def cleanup():
+        kit.timeline.stop()
+        with contextlib.redirect_stdout(io.StringIO()):
+            extension.stop_test()
+            extension.on_shutdown()
+
+    return tick, cleanup
+
+
+# TransformSync alone, every vehicle moving: the mesh sync's cost against the vehicle count
+def bench_transform_sync(num_wheels, num_vehicles, **_):
+    stage = build_stage(num_wheels, num_vehicles)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vehicles = []
+        for prim in stage.Traverse():
+            if prim.GetName().startswith(helper.VEHICLE_DEF_PREFIX):
+                definition = helper.VehicleDefinition()
+                if definition.load_from_definition_prim(stage, prim):
+                    vehicles.append(definition)
+    transform_sync = helper.TransformSync()
+    transform_sync.build(stage, vehicles)
+    # what PhysX writes each frame, straight to the specs so the tick is mostly the sync
+    layer = stage.GetRootLayer()
+    physx_specs = [layer.GetAttributeAtPath(f"/World/Vehicles/physx_{v_idx}.xformOp:transform")
+                   for v_idx in range(num_vehicles)]
+    clock = [0.0]
+
+    def tick():
+        clock[0] += STEP_DT
+        with Sdf.ChangeBlock():
+            for v_idx, spec in enumerate(physx_specs):
+                spec.default = Gf.Matrix4d(1.0).SetTranslate(Gf.Vec3d(v_idx * 500.0 + VEHICLE_SPEED * clock[0], 0.0, 0.0))
+        transform_sync.sync()
+
+    return tick, lambda: None
+
+
+# the helper's startup on a saved stage: the stage walk, or the sidecar index the walk wrote
+def vehicle_index_attach(num_wheels, num_vehicles, use_cache):
+    folder = tempfile.mkdtemp()
+    stage_path = os.path.join(folder, "vehicles.usda")
+    build_stage(num_wheels, num_vehicles).GetRootLayer().Export(stage_path)
+    stage = Usd.Stage.Open(stage_path)
+    index = helper.VehicleIndex(use_cache=use_cache)
+    with contextlib.redirect_stdout(io.StringIO()):
+        helper.VehicleIndex(use_cache=True).attach(stage)
+
+    def tick():
+        with contextlib.redirect_stdout(io.StringIO()):
+            index.attach(stage)
+
+    def cleanup():
+        index.detach()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return tick, cleanup
+
+
+def bench_vehicle_index_attach(num_wheels, num_vehicles, **_):
+    return vehicle_index_attach(num_wheels, num_vehicles, use_cache=False)
+
+
+def bench_vehicle_index_cached(num_wheels, num_vehicles, **_):
+    return vehicle_index_attach(num_wheels, num_vehicles, use_cache=True)
+
+
+BENCHMARKS = { "round_physics_step": (bench_round_physics_step, ["wheels"]),
+               "contact_report": (bench_contact_report, ["contacts"]),
+               "vehicle_audio_step": (bench_vehicle_audio_step, ["wheels"]),
+               "jumper_cam_step": (bench_jumper_cam_step, []),
+               "vehicle_definition_load": (bench_vehicle_definition_load, ["vehicles", "wheels"]),
+               "helper_frame": (bench_helper_frame, ["vehicles", "wheels"]),
+               "transform_sync": (bench_transform_sync, ["vehicles", "wheels"]),
+               "vehicle_index_attach": (bench_vehicle_index_attach, ["vehicles", "wheels"]),
+               "vehicle_index_cached": (bench_vehicle_index_cached, ["vehicles", "wheels"]) }
+
+
+################################ runner ################################
+
+def measure(tick, ticks, warmup):
+    for _ in range(warmup):
+        tick()
+
+    gc.collect()
+    gc.disable()
+    try:
+        durations = np.empty(ticks)
+        for idx in range(ticks):
+            start = time.perf_counter()
+            tick()
+            durations[idx] = time.perf_counter() - start
+    finally:
+        gc.enable()
+
+    # second pass for memory, tracing slows every allocation down
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start_bytes, _ = tracemalloc.get_traced_memory()
+    for _ in range(ticks):
+        tick()
+    end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations_us = durations * 1e6
+    return { "ticks": ticks,
+             "mean_us": float(durations_us.mean()),
+             "p50_us": float(np.percentile(durations_us, 50)),
+             "p99_us": float(np.percentile(durations_us, 99)),
+             "min_us": float(durations_us.min()),
+             "retained_bytes_per_tick": (end_bytes - start_bytes) / ticks,
+             "peak_alloc_kib": (peak_bytes - start_bytes) / 1024.0 }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    sizes = { "wheels": args.wheels, "contacts": args.contacts, "vehicles": args.vehicles }
+    results = {}
+    for name, (bench_fn, scaled_by) in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        # every combination of the sizes this benchmark scales with
+        combos = [{}]
+        for size_name in scaled_by:
+            combos = [dict(combo, **{size_name: value}) for combo in combos for value in sizes[size_name]]
+        for combo in combos:
+            params = { "num_wheels": combo.get("wheels", 4),
+                       "num_contacts": combo.get("contacts", 0),
+                       "num_vehicles": combo.get("vehicles", 0) }
+            key = name + "".join(f"[{size_name}={value}]" for size_name, value in combo.items())
+            tick, cleanup = bench_fn(**params)
+            try:
+                results[key] = dict(measure(tick, args.ticks, args.warmup), params=params)
+            finally:
+                cleanup()
+            per_vehicle = ""
+            if params["num_vehicles"] > 0:
+                results[key]["p50_us_per_vehicle"] = results[key]["p50_us"] / params["num_vehicles"]
+                per_vehicle = f"   {results[key]['p50_us_per_vehicle']:7.2f} us/vehicle"
+            print(f"{key:55s} p50 {results[key]['p50_us']:9.1f} us   p99 {results[key]['p99_us']:9.1f} us"
+                  f"   {results[key]['retained_bytes_per_tick']:8.1f} B/tick retained{per_vehicle}")
+
+    return { "version": RESULTS_VERSION,
+             "meta": { "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "commit": git_commit(),
+                       "python": sys.version.split()[0],
+                       "usd": ".".join(str(v) for v in Usd.GetVersion()),
+                       "numpy": np.__version__,
+                       "platform": platform.platform(),
+                       "machine": platform.machine(),
+                       "ticks": args.ticks },
+             "benchmarks": results }
+
+
+# benchmarks whose p50 went up by more than threshold (0.2 = 20%)
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, result in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(key)
+        if previous is None or previous["p50_us"] <= 0:
+            continue
+        ratio = result["p50_us"] / previous["p50_us"]
+        marker = "  REGRESSION" if ratio > 1.0 + threshold else ""
+        print(f"{key:55s} {previous['p50_us']:9.1f} -> {result['p50_us']:9.1f} us  x{ratio:5.2f}{marker}")
+        if marker:
+            regressions.append(key)
+    return regressions
+
+
+def int_list(text):
+    return [int(value) for value in text.split(",") if value]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-tick cost of the vehicle extensions' hot paths")
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--wheels", type=int_list, default=[4], help="wheel counts, comma separated (4 or more)")
+    parser.add_argument("--contacts", type=int_list, default=[16], help="contact points per report")
+    parser.add_argument("--vehicles", type=int_list, default=[8], help="vehicle helper definitions")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50 slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+    if min(args.wheels) < 4:
+        parser.error("the round logic needs the rear wheels, --wheels must be 4 or more")
+
+    results = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,433 @@
+# In-process stand-ins for the Kit, carb and PhysX interfaces the vehicle extensions use,
+# so their hot paths run in a plain Python with usd-core (pxr) and numpy installed.
+#
+#   kit = install()                     # before importing omni.docs.vehicle.*
+#   import omni.docs.vehicle.jumper
+#   kit.physx.wheel_states[path] = {...}
+#   kit.frame(dt, physics_steps=2)      # physics step subscribers, then the update stream
+#
+# Only what the extensions call is here; UI modules (omni.ui, viewport, commands ...) accept
+# any call and do nothing. PhysxSchema and PhysicsSchemaTools aren't in usd-core and are
+# stood in too.
+import os
+import sys
+import enum
+import types
+import tempfile
+
+from pxr import Gf, Sdf, Usd
+
+EXTENSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "source", "extensions")
+EXTENSION_NAMES = ["omni.docs.vehicle.helper", "omni.docs.vehicle.jumper"]
+
+# omni.physx.bindings._physx
+VEHICLE_WHEEL_STATE_SUSPENSION_FORCE = "suspensionForce"
+VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP = "tireLongitudinalSlip"
+VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP = "tireLateralSlip"
+VEHICLE_WHEEL_STATE_IS_ON_GROUND = "isOnGround"
+VEHICLE_WHEEL_STATE_GROUND_MATERIAL = "groundMaterial"
+VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED = "engineRotationSpeed"
+
+
+################################ anything goes (UI) ################################
+
+class _AnythingMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Anything
+
+
+# any attribute, call or base class, does nothing
+class Anything(metaclass=_AnythingMeta):
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Anything()
+
+    def __call__(self, *args, **kwargs):
+        return Anything()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __bool__(self):
+        return False
+
+
+class AnythingModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Anything
+
+
+################################ events ################################
+
+class Event():
+
+    def __init__(self, event_type=0, payload=None):
+        self.type = event_type
+        self.payload = payload or {}
+
+
+class Subscription():
+
+    def __init__(self, subscribers, entry):
+        self._subscribers = subscribers
+        self._entry = entry
+
+    def unsubscribe(self):
+        if self._entry in self._subscribers:
+            self._subscribers.remove(self._entry)
+
+    def __del__(self):
+        self.unsubscribe()
+
+
+class EventStream():
+
+    def __init__(self):
+        self._subscribers = []
+
+    def create_subscription_to_pop(self, fn, order=0, name=""):
+        entry = (order, len(self._subscribers), fn)
+        self._subscribers.append(entry)
+        self._subscribers.sort(key=lambda sub: (sub[0], sub[1]))
+        return Subscription(self._subscribers, entry)
+
+    def push(self, event):
+        for entry in list(self._subscribers):
+            entry[2](event)
+
+
+################################ carb ################################
+
+class Settings():
+
+    def __init__(self):
+        self._values = {}
+
+    def get(self, path):
+        return self._values.get(path)
+
+    def get_as_bool(self, path):
+        return bool(self._values.get(path))
+
+    def set(self, path, value):
+        self._values[path] = value
+
+    set_bool = set
+    set_float = set
+    set_int = set
+    set_string = set
+
+
+class Tokens():
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def resolve(self, token):
+        return token.replace("${data}", self.data_dir)
+
+
+################################ timeline ################################
+
+class TimelineEventType(enum.IntEnum):
+    PLAY = 0
+    PAUSE = 1
+    STOP = 2
+    CURRENT_TIME_TICKED = 3
+
+
+class Timeline():
+
+    def __init__(self):
+        self._events = EventStream()
+        self.current_time = 0.0
+        self.playing = False
+        self.play_every_frame = False
+        self.target_framerate = 60.0
+
+    def get_timeline_event_stream(self):
+        return self._events
+
+    def get_current_time(self):
+        return self.current_time
+
+    def get_time_codes_per_seconds(self):
+        return 60.0
+
+    def is_playing(self):
+        return self.playing
+
+    def play(self, *args):
+        self.playing = True
+        self._events.push(Event(int(TimelineEventType.PLAY)))
+
+    def pause(self):
+        self.playing = False
+        self._events.push(Event(int(TimelineEventType.PAUSE)))
+
+    def stop(self):
+        self.playing = False
+        self._events.push(Event(int(TimelineEventType.STOP)))
+
+    def get_play_every_frame(self):
+        return self.play_every_frame
+
+    def set_play_every_frame(self, value):
+        self.play_every_frame = value
+
+    def get_target_framerate(self):
+        return self.target_framerate
+
+    def set_target_framerate(self, value):
+        self.target_framerate = value
+
+
+################################ physx ################################
+
+# wheel / drive states and rigid body poses are whatever the benchmark puts in
+class PhysX():
+
+    def __init__(self):
+        self.wheel_states = {}
+        self.drive_states = {}
+        # prim path : (position (x, y, z), rotation quaternion (x, y, z, w))
+        self.poses = {}
+        self._step_subscribers = []
+
+    def get_wheel_state(self, wheel_path):
+        return self.wheel_states.get(wheel_path)
+
+    def get_vehicle_drive_state(self, vehicle_path):
+        return self.drive_states.get(vehicle_path)
+
+    def get_rigidbody_transformation(self, prim_path):
+        pose = self.poses.get(prim_path)
+        if pose is None:
+            return {"ret_val": False}
+        return {"ret_val": True, "position": pose[0], "rotation": pose[1]}
+
+    def subscribe_physics_step_events(self, fn):
+        entry = (0, len(self._step_subscribers), fn)
+        self._step_subscribers.append(entry)
+        return Subscription(self._step_subscribers, entry)
+
+    def step(self, dt):
+        for entry in list(self._step_subscribers):
+            entry[2](dt)
+
+
+class PhysXSimulation():
+
+    def __init__(self):
+        self._contact_subscribers = []
+
+    def subscribe_contact_report_events(self, fn):
+        entry = (0, len(self._contact_subscribers), fn)
+        self._contact_subscribers.append(entry)
+        return Subscription(self._contact_subscribers, entry)
+
+    def report_contacts(self, contact_headers, contact_data):
+        for entry in list(self._contact_subscribers):
+            entry[2](contact_headers, contact_data)
+
+
+class ContactHeader():
+
+    def __init__(self, actor0, actor1, collider0, collider1, contact_data_offset, num_contact_data):
+        self.actor0 = actor0
+        self.actor1 = actor1
+        self.collider0 = collider0
+        self.collider1 = collider1
+        self.contact_data_offset = contact_data_offset
+        self.num_contact_data = num_contact_data
+
+
+class ContactData():
+
+    def __init__(self, impulse, material0=0, material1=0):
+        self.impulse = impulse
+        self.material0 = material0
+        self.material1 = material1
+
+
+# PhysicsSchemaTools.sdfPathToInt: any stable int per path will do
+_path_ids = {}
+def sdf_path_to_int(path):
+    key = str(path)
+    path_id = _path_ids.get(key)
+    if path_id is None:
+        path_id = _path_ids[key] = len(_path_ids) + 1
+    return path_id
+
+
+# the few PhysxSchema APIs the jumper applies, as plain attributes and relationships
+class _PhysxApi():
+
+    def __init__(self, prim):
+        self.prim = prim
+
+    @classmethod
+    def Apply(cls, prim):
+        return cls(prim)
+
+
+class PhysxTriggerAPI(_PhysxApi):
+    pass
+
+
+class PhysxTriggerStateAPI(_PhysxApi):
+
+    def GetTriggeredCollisionsRel(self):
+        return self.prim.CreateRelationship("physxTriggerState:triggeredCollisions")
+
+
+class PhysxContactReportAPI(_PhysxApi):
+
+    def CreateThresholdAttr(self):
+        return self.prim.CreateAttribute("physxContactReport:threshold", Sdf.ValueTypeNames.Float)
+
+
+################################ usd context ################################
+
+class StageEventType(enum.IntEnum):
+    SAVED = 0
+    SAVE_FAILED = 1
+    OPENING = 2
+    OPEN_FAILED = 3
+    OPENED = 4
+    CLOSING = 5
+    CLOSED = 6
+    DIRTY_STATE_CHANGED = 7
+    ASSETS_LOADED = 8
+
+
+class UsdContext():
+
+    def __init__(self):
+        self.stage = None
+        self._events = EventStream()
+
+    def get_stage(self):
+        return self.stage
+
+    def get_stage_event_stream(self):
+        return self._events
+
+    def open_stage(self, path):
+        self.stage = Usd.Stage.Open(path)
+
+    def get_selection(self):
+        return Anything()
+
+
+class StageAudio():
+
+    def spawn_voice(self, prim):
+        return None
+
+
+################################ install ################################
+
+class Kit():
+
+    def __init__(self, data_dir):
+        self.settings = Settings()
+        self.tokens = Tokens(data_dir)
+        self.timeline = Timeline()
+        self.physx = PhysX()
+        self.physx_simulation = PhysXSimulation()
+        self.usd_context = UsdContext()
+        self.update_stream = EventStream()
+        self.stage_audio = StageAudio()
+
+    # one app update: the physics steps of the frame, then the update stream subscribers
+    def frame(self, dt, physics_steps=1):
+        if self.timeline.playing:
+            step_dt = dt / physics_steps
+            for _ in range(physics_steps):
+                self.physx.step(step_dt)
+                self.timeline.current_time += step_dt
+        self.update_stream.push(Event(0, {"dt": dt}))
+
+
+def _module(name, attrs=None, anything=False, package=False):
+    module = AnythingModule(name) if anything else types.ModuleType(name)
+    if package:
+        module.__path__ = []
+    for key, value in (attrs or {}).items():
+        setattr(module, key, value)
+    sys.modules[name] = module
+    parent_name, _, child = name.rpartition(".")
+    if parent_name and parent_name in sys.modules:
+        setattr(sys.modules[parent_name], child, module)
+    return module
+
+
+_kit = None
+# registers the stand-in modules, returns the Kit holding their state
+def install(data_dir=None):
+    global _kit
+    if _kit is not None:
+        return _kit
+    kit = Kit(data_dir or tempfile.mkdtemp(prefix="vehicle_bench_"))
+
+    # carb
+    carb = _module("carb", { "log_verbose": lambda *a: None, "log_info": lambda *a: None, "log_warn": lambda *a: None,
+                             "log_error": lambda *a: None, "Float3": Gf.Vec3f }, package=True)
+    _module("carb.settings", { "get_settings": lambda: kit.settings })
+    _module("carb.tokens", { "get_tokens_interface": lambda: kit.tokens })
+    _module("carb.events", { "IEvent": Event })
+    _module("carb.dictionary", anything=True)
+
+    # omni: the extensions' own packages are found through __path__
+    omni = _module("omni", package=True)
+    omni.__path__ = [os.path.join(EXTENSIONS_DIR, name, "omni") for name in EXTENSION_NAMES]
+    _module("omni.kit", package=True)
+    _module("omni.kit.app", { "get_app": lambda: types.SimpleNamespace(get_update_event_stream=lambda: kit.update_stream) })
+    _module("omni.kit.commands", { "Command": Anything,
+                                   "execute": lambda *a, **k: None,
+                                   "register_all_commands_in_module": lambda *a: None,
+                                   "unregister_module_commands": lambda *a: None })
+    _module("omni.kit.viewport", package=True)
+    _module("omni.kit.viewport.utility", { "get_active_viewport": lambda: None })
+    _module("omni.timeline", { "get_timeline_interface": lambda: kit.timeline,
+                               "TimelineEventType": TimelineEventType })
+    _module("omni.usd", { "get_context": lambda: kit.usd_context,
+                          "StageEventType": StageEventType }, package=True)
+    _module("omni.usd.audio", { "get_stage_audio_interface": lambda: kit.stage_audio })
+    _module("omni.physx", { "get_physx_interface": lambda: kit.physx,
+                            "get_physx_simulation_interface": lambda: kit.physx_simulation }, package=True)
+    _module("omni.physx.bindings", package=True)
+    _module("omni.physx.bindings._physx", { name: value for name, value in globals().items()
+                                            if name.startswith("VEHICLE_") } | { "SimulationEvent": Anything })
+    _module("omni.physx.scripts", package=True)
+    physics_utils = _module("omni.physx.scripts.physicsUtils")
+    exec("import math\nimport carb\nfrom pxr import Usd, UsdGeom, UsdPhysics, UsdShade, Sdf, Gf, Tf", physics_utils.__dict__)
+    for name in ["omni.ext", "omni.ui", "omni.ui.scene", "omni.appwindow"]:
+        _module(name, anything=True)
+    omni.ext.IExt = Anything
+
+    # the schemas usd-core doesn't have
+    import pxr
+    physx_schema = _module("pxr.PhysxSchema", { "PhysxTriggerAPI": PhysxTriggerAPI,
+                                                "PhysxTriggerStateAPI": PhysxTriggerStateAPI,
+                                                "PhysxContactReportAPI": PhysxContactReportAPI })
+    schema_tools = _module("pxr.PhysicsSchemaTools", { "sdfPathToInt": sdf_path_to_int })
+    pxr.PhysxSchema = physx_schema
+    pxr.PhysicsSchemaTools = schema_tools
+
+    _kit = kit
+    return kit
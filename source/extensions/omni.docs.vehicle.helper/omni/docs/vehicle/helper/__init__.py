@@ -1 +1,5 @@
 from .extension import *
+from .usd_write_queue import *
+from .vehicle_index import *
+from .transform_sync import *
+from .tick_metrics import *
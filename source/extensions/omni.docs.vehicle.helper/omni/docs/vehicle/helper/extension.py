@@ -2,15 +2,17 @@ import omni.ext
 import omni.usd
 import omni.ui as ui
 import omni.kit.app
+import omni.timeline
 import carb
 import carb.settings
 import carb.dictionary
 from pxr import UsdGeom 
 from functools import partial
 from .vehicle_definition import *
- 
-# Vehicle definition prim name starts with prefix "veh_"
-VEHICLE_DEF_PREFIX = "veh_"
+from .vehicle_index import VehicleIndex
+from .transform_sync import TransformSync
+from .usd_write_queue import get_write_queue
+from .tick_metrics import timed
        
 
 # give parent ext's ability to tell us
@@ -30,13 +32,26 @@ class WheelRefTestExtension(omni.ext.IExt):
         # assume ui unless parent signals to suppress 
         self.headless = False
         self.headless_signal_timeout = 1.0
+        # set by suspend_sync() for a headless sweep, stage events don't restart the sync
+        self.sync_suspended = False
         
         global _extension_instance
         _extension_instance = self        
         
         self.vehicle_list = []
+        # definitions follow stage edits, no stage walk per edit
+        self.vehicle_index = VehicleIndex()
         self.stage_dirty = False
         self.stage_event_sub = None
+
+        # the jumper's per-tick writes are authored once per frame
+        self.write_queue = get_write_queue()
+        self.write_queue.start()
+        # every mesh transform in one pass, while the timeline plays (and once after) or
+        # when asked to with request_sync()
+        self.transform_sync = TransformSync()
+        self._timeline = omni.timeline.get_timeline_interface()
+        self._sync_frames = 1
         
         usd_context = omni.usd.get_context()
         events = usd_context.get_stage_event_stream()
@@ -55,24 +70,43 @@ class WheelRefTestExtension(omni.ext.IExt):
         if my_stage is None:
             return
         
-        found_veh_prims = [x for x in my_stage.Traverse() if x.GetName().startswith(VEHICLE_DEF_PREFIX)]
-        self.vehicle_list = []
-        for veh_prim in found_veh_prims:
-            if veh_prim:
-                print(f"found vehicle def: {veh_prim.GetPath()}")             
-                new_veh = VehicleDefinition()
-                if new_veh.load_from_definition_prim(my_stage, veh_prim):
-                    self.vehicle_list.append(new_veh)
+        # one full walk, or the sidecar index of a saved stage; edits after this are picked up by the index
+        self.vehicle_index.attach(my_stage)
+        self.set_vehicle_list(self.vehicle_index.vehicles())
                         
         
     def start_sim(self):
+        if self.sync_suspended:
+            return
         update_event_stream = omni.kit.app.get_app().get_update_event_stream()       
         self._pop_event_steam_sub_id = update_event_stream.create_subscription_to_pop(self.tick_vehicle_list,name="tickupdate")  
         
      
+    def set_vehicle_list(self, vehicle_list):
+        self.vehicle_list = vehicle_list
+        self.transform_sync.build(self.vehicle_index.stage, vehicle_list)
+        # meshes put where the vehicles are, even when stopped
+        self._sync_frames = max(self._sync_frames, 1)
+
+    # for whatever poses the physx vehicles with the timeline stopped (a telemetry replay):
+    # a pose queued this frame is authored at its end, so this frame and the next are synced
+    def request_sync(self):
+        self._sync_frames = 2
+
     def stop_test(self):
-        self.vehicle_list = []
+        self.set_vehicle_list([])
+        self.vehicle_index.detach()
         self._pop_event_steam_sub_id = None
+
+    # no vehicle loading or mesh sync until resume_sync(), whatever stage events come in between
+    def suspend_sync(self):
+        self.sync_suspended = True
+        self.stop_test()
+
+    def resume_sync(self):
+        self.sync_suspended = False
+        self.force_load = True
+        self.start_sim()
         
     def on_stage_event(self, e: carb.events.IEvent):
         if self.headless:
@@ -91,8 +125,8 @@ class WheelRefTestExtension(omni.ext.IExt):
                 print(f"on_stage_event: etype=CLOSED")
                 self.stop_test()
             elif e.type == int(omni.usd.StageEventType.DIRTY_STATE_CHANGED):
+                # edits reach the vehicle index through change notices
                 print(f"on_stage_event: etype=DIRTY_STATE_CHANGED")
-                self.force_load = True
             elif e.type == int(omni.usd.StageEventType.ASSETS_LOADED):
                 print(f"on_stage_event: etype=ASSETS_LOADED")
                 self.force_load = True
@@ -129,6 +163,10 @@ class WheelRefTestExtension(omni.ext.IExt):
                     ui.IntField(model=self.new_vehicle_axles_num_model, height=25, width=30) 
                     ui.Separator()
                     ui.Button("New vehicle definition", clicked_fn=self.on_click_new_vehicle_def, height=25)   
+                with ui.HStack():
+                    self.import_file_path_model = ui.SimpleStringModel()
+                    ui.StringField(model=self.import_file_path_model, height=25)
+                    ui.Button("Import vehicle definitions", clicked_fn=self.on_click_import_vehicle_defs, height=25, width=180)
                 ui.Separator(height=25)
                 ui.Separator(height=10)
                 with ui.HStack():
@@ -214,6 +252,10 @@ class WheelRefTestExtension(omni.ext.IExt):
                     'mesh_wheel_paths' : wheel_paths_list }
         
         new_veh.create_definition_from_paths(**args)
+
+    # JSON file of vehicle specs, see create_vehicle_definitions
+    def on_click_import_vehicle_defs(self):
+        import_vehicle_definitions(self.import_file_path_model.as_string)
  
 
     def get_selected_prim_path(self):
@@ -226,15 +268,20 @@ class WheelRefTestExtension(omni.ext.IExt):
     def on_shutdown(self):
         global _extension_instance
         _extension_instance = None
+        self.write_queue.stop()
+        self.vehicle_index.detach()
         print("[omni.docs.vehicle.helper] shutdown")
 
      
+    @timed("VehicleHelper.tick_vehicle_list")
     def tick_vehicle_list(self, e: carb.events.IEvent): 
             
         if self.force_load:
             self.force_load = False
             print(f"**** FORCE LOAD ****")
             self.find_vehicles()
+        elif self.vehicle_index.update():
+            self.set_vehicle_list(self.vehicle_index.vehicles())
         
         if self.headless_signal_timeout > 0:
             self.headless_signal_timeout -= e.payload["dt"]
@@ -243,18 +290,12 @@ class WheelRefTestExtension(omni.ext.IExt):
                     # then we never got signal from parent to run headless
                     self.make_ui()
         
-        for veh in self.vehicle_list:
-            for source_prim in veh.wheel_pairs:
-                if source_prim and source_prim.IsValid():
-                    dest_prim = veh.wheel_pairs[source_prim]
-                    if dest_prim and dest_prim.IsValid():
-                        srcXform = UsdGeom.Xformable(source_prim) 
-                        mtrx_world = srcXform.ComputeLocalToWorldTransform(0)
-                        destXformAttr = dest_prim.GetAttribute('xformOp:transform')
-                        destXformAttr.Set(mtrx_world)
-            
-            srcXform = UsdGeom.Xformable(veh.physx_veh_prim)
-            if srcXform: #.IsValid():
-                mtrx_world = srcXform.ComputeLocalToWorldTransform(0)
-                destXformAttr = veh.mesh_chassis_prim.GetAttribute('xformOp:transform')
-                destXformAttr.Set(mtrx_world)
\ No newline at end of file
+        # nothing moves the physx vehicles while stopped, one last sync puts the meshes back
+        # where stopping reset them
+        if self._timeline.is_playing():
+            self._sync_frames = 1
+        elif self._sync_frames > 0:
+            self._sync_frames -= 1
+        else:
+            return
+        self.transform_sync.sync()
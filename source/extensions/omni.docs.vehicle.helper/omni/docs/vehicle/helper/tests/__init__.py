@@ -1 +1,4 @@
-from .test_hello_world import *
\ No newline at end of file
+from .test_hello_world import *
+from .test_vehicle_index import *
+from .test_vehicle_definition import *
+from .test_usd_write_queue import *
\ No newline at end of file
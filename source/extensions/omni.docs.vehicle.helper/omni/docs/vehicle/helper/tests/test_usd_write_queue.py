@@ -0,0 +1,100 @@
+import omni.kit.test
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+from omni.docs.vehicle.helper.usd_write_queue import UsdWriteQueue
+
+ATTR_NAMES = ["c:value", "a:value", "b:value"]
+
+
+def make_stage():
+    stage = Usd.Stage.CreateInMemory()
+    prim = UsdGeom.Xform.Define(stage, "/World/prim").GetPrim()
+    attrs = [prim.CreateAttribute(name, Sdf.ValueTypeNames.Float) for name in ATTR_NAMES]
+    return stage, attrs
+
+
+class TestUsdWriteQueue(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self.stage, self.attrs = make_stage()
+        self.layer = Sdf.Layer.CreateAnonymous()
+        self.stage.GetSessionLayer().subLayerPaths.append(self.layer.identifier)
+        self.queue = UsdWriteQueue()
+        self.queue.start()
+        # attribute paths changed per notice, in the order they were sent
+        self.notices = []
+        self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self.on_objects_changed, self.stage)
+
+    async def tearDown(self):
+        self._listener.Revoke()
+        self.queue.stop()
+
+    def on_objects_changed(self, notice, stage):
+        paths = sorted(str(path) for path in notice.GetChangedInfoOnlyPaths() if path.IsPropertyPath())
+        # the over specs a first write adds to the layer come with notices of their own
+        if paths:
+            self.notices.append(paths)
+
+    def layer_value(self, attr):
+        spec = self.layer.GetAttributeAtPath(attr.GetPath())
+        return spec.default if spec else None
+
+    async def test_not_running(self):
+        self.queue.stop()
+        self.queue.set(self.attrs[0], 1.0, self.layer)
+        self.assertEqual(self.layer_value(self.attrs[0]), 1.0)
+        self.assertEqual(len(self.queue), 0)
+
+    async def test_last_write_wins(self):
+        for value in [1.0, 2.0, 3.0]:
+            self.queue.set(self.attrs[0], value, self.layer)
+        # one per attribute and layer, nothing authored before the flush
+        self.assertEqual(len(self.queue), 1)
+        self.assertIsNone(self.layer_value(self.attrs[0]))
+        self.queue.flush()
+        self.assertEqual(self.layer_value(self.attrs[0]), 3.0)
+        self.assertEqual((self.queue.writes, self.queue.flushes), (1, 1))
+
+    async def test_edit_target(self):
+        self.queue.set(self.attrs[0], 4.0)
+        self.queue.flush()
+        self.assertIsNone(self.layer_value(self.attrs[0]))
+        self.assertEqual(self.attrs[0].Get(), 4.0)
+
+    async def test_discard(self):
+        other_layer = Sdf.Layer.CreateAnonymous()
+        self.stage.GetSessionLayer().subLayerPaths.append(other_layer.identifier)
+        self.queue.set(self.attrs[0], 1.0, self.layer)
+        self.queue.set(self.attrs[1], 1.0, other_layer)
+        self.queue.discard(self.layer)
+        self.assertEqual(len(self.queue), 1)
+        self.queue.flush()
+        self.assertIsNone(self.layer_value(self.attrs[0]))
+        self.assertEqual(other_layer.GetAttributeAtPath(self.attrs[1].GetPath()).default, 1.0)
+
+        self.queue.set(self.attrs[0], 2.0, self.layer)
+        self.queue.discard()
+        self.assertEqual(len(self.queue), 0)
+
+    async def test_spec_created_on_first_write(self):
+        self.assertFalse(self.layer.GetAttributeAtPath(self.attrs[0].GetPath()))
+        self.queue.set(self.attrs[0], 1.0, self.layer)
+        self.queue.flush()
+        spec = self.layer.GetAttributeAtPath(self.attrs[0].GetPath())
+        self.assertEqual(spec.typeName, Sdf.ValueTypeNames.Float)
+        self.assertEqual(spec.default, 1.0)
+
+    async def test_sorted_single_block(self):
+        # no specs yet: written one by one, in path order
+        for attr in self.attrs:
+            self.queue.set(attr, 1.0, self.layer)
+        self.queue.flush()
+        self.assertEqual(self.notices, [[str(attr.GetPath())] for attr in sorted(self.attrs, key=lambda attr: attr.GetPath())])
+
+        # the specs are there: every value in one change block, one notice
+        self.notices = []
+        for attr in self.attrs:
+            self.queue.set(attr, 2.0, self.layer)
+        self.queue.flush()
+        self.assertEqual(self.notices, [sorted(str(attr.GetPath()) for attr in self.attrs)])
+        self.assertEqual([self.layer_value(attr) for attr in self.attrs], [2.0] * len(self.attrs))
@@ -0,0 +1,85 @@
+import os
+import json
+import tempfile
+import omni.kit.test
+from pxr import Gf, Usd, UsdGeom
+
+from omni.docs.vehicle.helper.vehicle_definition import (
+    VEH_PHYS_VEH_ATTR,
+    VEH_MESH_WHEELS_ATTR,
+    XFORM_OP_TRANSFORM,
+    create_vehicle_definitions,
+    import_vehicle_definitions
+)
+
+WHEEL_NAMES = ["/LeftWheel1References", "/RightWheel1References"]
+
+
+# a physx vehicle with its wheel references and the meshes, no transform ops on any of them
+def add_vehicle_prims(stage, v_idx):
+    physx_path = f"/World/Vehicles/physx_{v_idx}"
+    UsdGeom.Xform.Define(stage, physx_path)
+    for name in WHEEL_NAMES:
+        UsdGeom.Xform.Define(stage, physx_path + name)
+    mesh_wheels = [f"/World/Meshes/mesh_{v_idx}/wheel_{w_idx}" for w_idx in range(len(WHEEL_NAMES))]
+    for mesh_wheel in mesh_wheels:
+        UsdGeom.Xform.Define(stage, mesh_wheel)
+    chassis = f"/World/Meshes/mesh_{v_idx}/chassis"
+    UsdGeom.Xform.Define(stage, chassis)
+    return { 'veh_def_prim_path' : f"/World/Definitions/veh_{v_idx}",
+             'physx_veh_path' : physx_path,
+             'mesh_chassis_path' : chassis,
+             'mesh_wheel_paths' : mesh_wheels }
+
+
+def has_transform_op(stage, path):
+    return bool(stage.GetPrimAtPath(path).GetAttribute(XFORM_OP_TRANSFORM))
+
+
+class TestVehicleDefinition(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self.stage = Usd.Stage.CreateInMemory()
+        self.specs = [add_vehicle_prims(self.stage, v_idx) for v_idx in range(2)]
+
+    async def test_create(self):
+        created = create_vehicle_definitions(self.specs, self.stage)
+        self.assertEqual(created, ["/World/Definitions/veh_0", "/World/Definitions/veh_1"])
+        definition_prim = self.stage.GetPrimAtPath("/World/Definitions/veh_1")
+        self.assertTrue(definition_prim.IsDefined())
+        self.assertEqual(definition_prim.GetAttribute(VEH_PHYS_VEH_ATTR).Get(), "/World/Vehicles/physx_1")
+        self.assertEqual(list(definition_prim.GetAttribute(VEH_MESH_WHEELS_ATTR).Get()), self.specs[1]['mesh_wheel_paths'])
+        for path in ["/World/Vehicles/physx_0", "/World/Vehicles/physx_0/RightWheel1References", "/World/Meshes/mesh_0/chassis"]:
+            self.assertTrue(has_transform_op(self.stage, path))
+
+    async def test_existing_ops_kept(self):
+        chassis = UsdGeom.Xformable(self.stage.GetPrimAtPath("/World/Meshes/mesh_0/chassis"))
+        chassis.AddTranslateOp().Set(Gf.Vec3d(1.0, 2.0, 3.0))
+        create_vehicle_definitions(self.specs[:1], self.stage)
+        self.assertEqual(list(chassis.GetXformOpOrderAttr().Get()), ["xformOp:translate", XFORM_OP_TRANSFORM])
+
+    async def test_missing_prim_skips_spec(self):
+        self.stage.RemovePrim("/World/Meshes/mesh_1/wheel_1")
+        created = create_vehicle_definitions(self.specs, self.stage)
+        self.assertEqual(created, ["/World/Definitions/veh_0"])
+        self.assertFalse(self.stage.GetPrimAtPath("/World/Definitions/veh_1"))
+        # the prims found before the missing one are left alone too
+        for path in ["/World/Vehicles/physx_1", "/World/Vehicles/physx_1/LeftWheel1References", "/World/Meshes/mesh_1/chassis"]:
+            self.assertFalse(has_transform_op(self.stage, path))
+
+    async def test_import(self):
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, "vehicles.json")
+            with open(file_path, "w") as f:
+                json.dump({ "vehicles" : self.specs }, f)
+            self.assertEqual(len(import_vehicle_definitions(file_path, self.stage)), 2)
+
+            # a plain list works too
+            with open(file_path, "w") as f:
+                json.dump(self.specs[:1], f)
+            self.assertEqual(import_vehicle_definitions(file_path, self.stage), ["/World/Definitions/veh_0"])
+
+            with open(file_path, "w") as f:
+                f.write("not json")
+            self.assertEqual(import_vehicle_definitions(file_path, self.stage), [])
+            self.assertEqual(import_vehicle_definitions(os.path.join(folder, "missing.json"), self.stage), [])
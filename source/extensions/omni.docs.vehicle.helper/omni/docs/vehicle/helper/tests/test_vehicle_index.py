@@ -0,0 +1,130 @@
+import os
+import tempfile
+import omni.kit.test
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from omni.docs.vehicle.helper.vehicle_definition import (
+    VEHICLE_DEF_PREFIX,
+    VEH_PHYS_VEH_ATTR,
+    VEH_MESH_CHASSIS_ATTR,
+    VEH_MESH_WHEELS_ATTR
+)
+from omni.docs.vehicle.helper.vehicle_index import VehicleIndex, index_file_path
+
+WHEEL_NAMES = ["/LeftWheel1References", "/RightWheel1References"]
+
+
+# a physx vehicle with its wheels and a mesh chassis and wheels, the definition pointing at them
+def add_vehicle(stage, v_idx, def_root="/World/Definitions"):
+    physx_path = f"/World/Vehicles/physx_{v_idx}"
+    UsdGeom.Xform.Define(stage, physx_path)
+    mesh_wheels = []
+    for w_idx, name in enumerate(WHEEL_NAMES):
+        UsdGeom.Xform.Define(stage, physx_path + name)
+        mesh_wheel = f"/World/Meshes/mesh_{v_idx}/wheel_{w_idx}"
+        UsdGeom.Xform.Define(stage, mesh_wheel).AddTransformOp()
+        mesh_wheels.append(mesh_wheel)
+    chassis = f"/World/Meshes/mesh_{v_idx}/chassis"
+    UsdGeom.Xform.Define(stage, chassis).AddTransformOp()
+    definition = stage.DefinePrim(f"{def_root}/{VEHICLE_DEF_PREFIX}{v_idx}")
+    definition.CreateAttribute(VEH_PHYS_VEH_ATTR, Sdf.ValueTypeNames.String).Set(physx_path)
+    definition.CreateAttribute(VEH_MESH_CHASSIS_ATTR, Sdf.ValueTypeNames.String).Set(chassis)
+    definition.CreateAttribute(VEH_MESH_WHEELS_ATTR, Sdf.ValueTypeNames.StringArray).Set(mesh_wheels)
+    return definition
+
+
+def make_stage(num_vehicles):
+    stage = Usd.Stage.CreateInMemory()
+    for v_idx in range(num_vehicles):
+        add_vehicle(stage, v_idx)
+    return stage
+
+
+class TestVehicleIndex(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self.stage = make_stage(2)
+        self.index = VehicleIndex(use_cache=False)
+        self.index.attach(self.stage)
+
+    async def tearDown(self):
+        self.index.detach()
+
+    def chassis_paths(self):
+        return [definition.mesh_chassis_path for definition in self.index.vehicles()]
+
+    async def test_attach_walks_once(self):
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.full_walks, 1)
+        self.assertEqual(self.chassis_paths(), ["/World/Meshes/mesh_0/chassis", "/World/Meshes/mesh_1/chassis"])
+        # nothing edited, nothing to do
+        self.assertFalse(self.index.update())
+
+    async def test_add_edit_remove(self):
+        add_vehicle(self.stage, 2)
+        self.assertTrue(self.index.update())
+        self.assertEqual(len(self.index), 3)
+
+        definition_prim = self.stage.GetPrimAtPath(f"/World/Definitions/{VEHICLE_DEF_PREFIX}2")
+        definition_prim.GetAttribute(VEH_MESH_CHASSIS_ATTR).Set("/World/Meshes/mesh_0/chassis")
+        self.assertTrue(self.index.update())
+        self.assertEqual(self.chassis_paths()[2], "/World/Meshes/mesh_0/chassis")
+
+        self.stage.RemovePrim(f"/World/Definitions/{VEHICLE_DEF_PREFIX}0")
+        self.index.update()
+        self.assertEqual(self.chassis_paths(), ["/World/Meshes/mesh_1/chassis", "/World/Meshes/mesh_0/chassis"])
+        # every edit was picked up without walking the stage again
+        self.assertEqual(self.index.full_walks, 1)
+
+    async def test_unrelated_edits(self):
+        vehicles = self.index.vehicles()
+        for p_idx in range(20):
+            self.stage.DefinePrim(f"/World/Other/prim_{p_idx}")
+        self.stage.GetAttributeAtPath("/World/Meshes/mesh_0/chassis.xformOp:transform").Set(Gf.Matrix4d(2.0))
+        self.index.update()
+        # the same definition objects, none re-parsed
+        self.assertEqual([id(definition) for definition in self.index.vehicles()], [id(definition) for definition in vehicles])
+        self.assertEqual(self.index.full_walks, 1)
+
+    async def test_target_removed(self):
+        vehicles = self.index.vehicles()
+        self.stage.RemovePrim("/World/Vehicles/physx_1")
+        self.index.update()
+        # only the definition pointing at it was parsed again
+        self.assertIs(self.index.vehicles()[0], vehicles[0])
+        self.assertIsNot(self.index.vehicles()[1], vehicles[1])
+        self.assertEqual(self.index.full_walks, 1)
+
+    async def test_definition_in_sublayer(self):
+        sublayer = Sdf.Layer.CreateAnonymous()
+        self.stage.GetRootLayer().subLayerPaths.append(sublayer.identifier)
+        with Usd.EditContext(self.stage, sublayer):
+            add_vehicle(self.stage, 2, def_root="/World/Sublayer")
+        self.assertTrue(self.index.update())
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.full_walks, 1)
+
+    async def test_sidecar(self):
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, "vehicles.usda")
+            self.stage.GetRootLayer().Export(file_path)
+            stage = Usd.Stage.Open(file_path)
+
+            first = VehicleIndex(use_cache=True)
+            first.attach(stage)
+            self.assertEqual((first.full_walks, first.cache_loads), (1, 0))
+            self.assertTrue(os.path.exists(index_file_path(stage)))
+            first.detach()
+
+            second = VehicleIndex(use_cache=True)
+            second.attach(stage)
+            self.assertEqual((second.full_walks, second.cache_loads), (0, 1))
+            self.assertEqual([definition.mesh_chassis_path for definition in second.vehicles()], self.chassis_paths())
+            second.detach()
+
+            # an unsaved edit: nothing saved describes the stage, walked again
+            add_vehicle(stage, 2)
+            third = VehicleIndex(use_cache=True)
+            third.attach(stage)
+            self.assertEqual((third.full_walks, len(third)), (1, 3))
+            third.detach()
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import bisect
+import functools
+import carb.settings
+
+__all__ = ['TickMetrics', 'get_tick_metrics', 'timed']
+
+FRAME_BUDGET_SETTING = "/exts/omni.docs.vehicle.helper/frameBudgetMs"
+# 60 fps, the frameBudgetMs default in config/extension.toml
+DEFAULT_FRAME_BUDGET_MS = 16.667
+
+# histogram bucket upper bounds in seconds (Prometheus "le"), past the last one is +Inf
+BUCKET_BOUNDS = ( 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                  1e-3, 2.5e-3, 5e-3, 1e-2, 1.6667e-2, 2.5e-2, 5e-2,
+                  0.1, 0.25, 0.5, 1.0 )
+
+METRIC_PREFIX = "vehicle_tick"
+
+
+class SubscriberStats():
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.over_budget = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, elapsed, budget):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if elapsed > budget:
+            self.over_budget += 1
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, elapsed)] += 1
+
+    # upper bound of the bucket the q quantile falls in (the max for the +Inf bucket)
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[idx], self.max) if idx < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return { "count": self.count,
+                 "total_s": self.total,
+                 "mean_s": self.total / self.count if self.count else 0.0,
+                 "p50_s": self.quantile(0.5),
+                 "p99_s": self.quantile(0.99),
+                 "max_s": self.max,
+                 "over_budget": self.over_budget,
+                 "buckets": dict(zip([str(b) for b in BUCKET_BOUNDS] + ["+Inf"], self.buckets)) }
+
+
+# Time spent in each update / physics subscriber: call count, total, a latency histogram
+# (p50 / p99 from it) and how many calls went over the frame budget.
+#
+#   @timed("VehicleAudio.update_audio")
+#   def update_audio(self, e): ...
+#
+#   get_tick_metrics().write_json(path, extra={"rounds_per_hour": 212.0})
+#   get_tick_metrics().write_prometheus(path)
+#
+# A subscriber that calls another timed one includes it in its own time.
+# The frame budget is the frameBudgetMs setting of this extension.
+class TickMetrics():
+
+    def __init__(self, frame_budget_ms=None):
+        if frame_budget_ms is None:
+            frame_budget_ms = carb.settings.get_settings().get(FRAME_BUDGET_SETTING) or DEFAULT_FRAME_BUDGET_MS
+        self.frame_budget = frame_budget_ms / 1000.0
+        self.reset()
+
+    def reset(self):
+        self.subscribers = {}
+        self.start_time = time.time()
+
+    def record(self, name, elapsed):
+        stats = self.subscribers.get(name)
+        if stats is None:
+            stats = self.subscribers[name] = SubscriberStats()
+        stats.add(elapsed, self.frame_budget)
+
+    # extra: other numbers to export alongside, name : value
+    def to_dict(self, extra=None):
+        return { "frame_budget_s": self.frame_budget,
+                 "start_time": self.start_time,
+                 "export_time": time.time(),
+                 "subscribers": {name: self.subscribers[name].to_dict() for name in sorted(self.subscribers)},
+                 "extra": dict(extra or {}) }
+
+    # Prometheus text exposition format
+    def to_prometheus(self, extra=None):
+        histogram = f"{METRIC_PREFIX}_seconds"
+        lines = [ f"# HELP {histogram} Time spent in an update or physics subscriber.",
+                  f"# TYPE {histogram} histogram" ]
+        for name in sorted(self.subscribers):
+            stats = self.subscribers[name]
+            label = f'subscriber="{name}"'
+            cumulative = 0
+            for bound, bucket_count in zip([repr(b) for b in BUCKET_BOUNDS] + ["+Inf"], stats.buckets):
+                cumulative += bucket_count
+                lines.append(f'{histogram}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{histogram}_sum{{{label}}} {stats.total!r}")
+            lines.append(f"{histogram}_count{{{label}}} {stats.count}")
+
+        over_budget = f"{METRIC_PREFIX}_over_budget_total"
+        lines += [ f"# HELP {over_budget} Subscriber calls longer than the frame budget.",
+                   f"# TYPE {over_budget} counter" ]
+        for name in sorted(self.subscribers):
+            lines.append(f'{over_budget}{{subscriber="{name}"}} {self.subscribers[name].over_budget}')
+
+        lines += [ f"# TYPE {METRIC_PREFIX}_frame_budget_seconds gauge",
+                   f"{METRIC_PREFIX}_frame_budget_seconds {self.frame_budget!r}" ]
+        for key, value in sorted((extra or {}).items()):
+            lines += [ f"# TYPE {key} gauge", f"{key} {float(value)!r}" ]
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, file_path, extra=None):
+        write_text(file_path, json.dumps(self.to_dict(extra), indent=2))
+        return file_path
+
+    def write_prometheus(self, file_path, extra=None):
+        write_text(file_path, self.to_prometheus(extra))
+        return file_path
+
+
+def write_text(file_path, text):
+    folder = os.path.dirname(file_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(file_path, "w") as f:
+        f.write(text)
+
+
+_tick_metrics = None
+def get_tick_metrics():
+    global _tick_metrics
+    if _tick_metrics is None:
+        _tick_metrics = TickMetrics()
+    return _tick_metrics
+
+
+# decorator, records every call's duration under name
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                get_tick_metrics().record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
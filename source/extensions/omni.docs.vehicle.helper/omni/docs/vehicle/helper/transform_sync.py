@@ -0,0 +1,79 @@
+import numpy as np
+from pxr import Sdf, Usd, UsdGeom
+
+__all__ = ['TransformSync']
+
+
+# Mesh transforms of every vehicle from their physx prims, in one pass per frame.
+#
+#   sync = TransformSync()
+#   sync.build(stage, vehicle_list)     # whenever the vehicles change
+#   sync.sync()                         # once per frame, returns how many meshes were written
+#
+# build() flattens every vehicle's sync_pairs (see VehicleDefinition) into one list of sources
+# and one of destination attribute specs. sync() gathers all world transforms from one
+# XformCache into a contiguous (N, 4, 4) array, compares it to the last written one in bulk,
+# and writes the meshes that moved straight to their layer specs inside one Sdf.ChangeBlock.
+# Destinations without a spec in the layer yet get one from a Usd Set on their first write, and
+# again when the spec went away (the layer was cleared or reloaded without it).
+# These writes are not part of the UsdWriteQueue flush: they're a change block of their own.
+class TransformSync():
+
+    def __init__(self):
+        self.stage = None
+        self.layer = None
+        self.source_prims = []
+        self.dest_attrs = []
+        self._specs = []
+        self._synced = np.empty((0, 4, 4))
+        self._xform_cache = UsdGeom.XformCache(Usd.TimeCode(0))
+        self.writes = 0
+
+    def __len__(self):
+        return len(self.source_prims)
+
+    # layer: where the mesh transforms are authored, the stage's edit target if None
+    def build(self, stage, vehicle_list, layer=None):
+        self.stage = stage
+        self.layer = layer
+        if stage is not None and layer is None:
+            self.layer = stage.GetEditTarget().GetLayer()
+        pairs = [ (source_prim, dest_attr) for veh in vehicle_list
+                                           for source_prim, dest_attr in veh.sync_pairs
+                                           if source_prim.IsValid() and dest_attr ]
+        self.source_prims = [source_prim for source_prim, _ in pairs]
+        self.dest_attrs = [dest_attr for _, dest_attr in pairs]
+        self._specs = [None] * len(pairs)
+        # nan never compares equal, everything is written on the first sync
+        self._synced = np.full((len(pairs), 4, 4), np.nan)
+
+    def sync(self) -> int:
+        if not self.source_prims:
+            return 0
+        # physics moved the sources since the last frame, shared parents are computed once per frame
+        self._xform_cache.Clear()
+        get_world = self._xform_cache.GetLocalToWorldTransform
+        matrices = [get_world(source_prim) for source_prim in self.source_prims]
+        # Gf matrices expose their doubles as buffers, joined they're the (N, 4, 4) array
+        world = np.frombuffer(b"".join([memoryview(matrix) for matrix in matrices]), dtype=np.float64).reshape(-1, 4, 4)
+
+        moved = np.flatnonzero(np.any(world != self._synced, axis=(1, 2)))
+        if len(moved) == 0:
+            return 0
+        self._synced[moved] = world[moved]
+        self.write(moved, matrices)
+        return len(moved)
+
+    def write(self, indices, matrices):
+        specs = self._specs
+        unresolved = [idx for idx in indices if specs[idx] is None or specs[idx].expired]
+        if unresolved:
+            with Usd.EditContext(self.stage, self.layer):
+                for idx in unresolved:
+                    self.dest_attrs[idx].Set(matrices[idx])
+                    specs[idx] = self.layer.GetAttributeAtPath(self.dest_attrs[idx].GetPath())
+
+        with Sdf.ChangeBlock():
+            for idx in indices:
+                specs[idx].default = matrices[idx]
+        self.writes += len(indices)
@@ -0,0 +1,103 @@
+import omni.kit.app
+import carb
+from pxr import Sdf, Usd
+
+__all__ = ['UsdWriteQueue', 'get_write_queue']
+
+# after every other update subscriber, so the whole frame's writes are in
+FLUSH_ORDER = 1000
+
+
+# Attribute values written during a frame, authored together at the end of it.
+# Only the last value per attribute and layer is kept, and the flush writes them sorted by
+# layer and path inside one Sdf.ChangeBlock: one round of change notices per frame instead
+# of one per Set. The helper's mesh transforms aren't queued (TransformSync has its own block).
+#
+#   queue = get_write_queue()
+#   queue.set(camera_prim.GetAttribute("xformOp:transform"), mtrx)          # edit target layer
+#   queue.set(vehicle_prim.GetAttribute("physxVehicleController:accelerator"), 1.0, round_layer)
+#   queue.flush()          # now, instead of at the end of the frame
+#
+# Attributes without a spec in the layer yet are written with Usd before the block (that
+# creates the spec with the right type), every later write is a plain spec value.
+# Until start() the queue writes straight away.
+class UsdWriteQueue():
+
+    def __init__(self):
+        self._pending = {}
+        self._flush_sub = None
+        self.flushes = 0
+        self.writes = 0
+
+    @property
+    def running(self):
+        return self._flush_sub is not None
+
+    def start(self, order=FLUSH_ORDER):
+        if self._flush_sub is not None:
+            return
+        update_stream = omni.kit.app.get_app().get_update_event_stream()
+        self._flush_sub = update_stream.create_subscription_to_pop(self.on_update, order=order, name="UsdWriteQueue")
+
+    def stop(self):
+        self.flush()
+        self._flush_sub = None
+
+    # layer None: the stage's edit target
+    def set(self, attr, value, layer=None):
+        if not attr:
+            return
+        if layer is None:
+            layer = attr.GetStage().GetEditTarget().GetLayer()
+        if self._flush_sub is None:
+            with Usd.EditContext(attr.GetStage(), layer):
+                attr.Set(value)
+            self.writes += 1
+            return
+        self._pending[(layer.identifier, str(attr.GetPath()))] = (layer, attr, value)
+
+    # drops what's queued for a layer (it's about to be cleared), or everything
+    def discard(self, layer=None):
+        if layer is None:
+            self._pending = {}
+            return
+        self._pending = {key: item for key, item in self._pending.items() if key[0] != layer.identifier}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def on_update(self, e: carb.events.IEvent):
+        self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+
+        spec_values = []
+        for key in sorted(pending):
+            layer, attr, value = pending[key]
+            if not layer or not attr:
+                continue
+            spec = layer.GetAttributeAtPath(attr.GetPath())
+            if spec:
+                spec_values.append((spec, value))
+            else:
+                with Usd.EditContext(attr.GetStage(), layer):
+                    attr.Set(value)
+
+        with Sdf.ChangeBlock():
+            for spec, value in spec_values:
+                spec.default = value
+
+        self.writes += len(pending)
+        self.flushes += 1
+
+
+_write_queue = None
+def get_write_queue():
+    global _write_queue
+    if _write_queue is None:
+        _write_queue = UsdWriteQueue()
+    return _write_queue
@@ -1,18 +1,26 @@
 import omni
-from pxr import UsdGeom, Sdf
+import json
+from pxr import UsdGeom, Sdf, Gf
 
+# Vehicle definition prim name starts with prefix "veh_"
+VEHICLE_DEF_PREFIX = "veh_"
  
 VEHICLE_DEF_ATTRIBUTE = "vehicle_helper"  
 VEH_PHYS_VEH_ATTR = VEHICLE_DEF_ATTRIBUTE + ":physx_veh"
 VEH_MESH_CHASSIS_ATTR = VEHICLE_DEF_ATTRIBUTE + ":mesh_chassis"
 VEH_MESH_WHEELS_ATTR = VEHICLE_DEF_ATTRIBUTE + ":mesh_wheels"
 
+# what a vehicle spec (create_vehicle_definitions, create_definition_from_paths) has
+VEHICLE_SPEC_KEYS = ['veh_def_prim_path', 'physx_veh_path', 'mesh_chassis_path', 'mesh_wheel_paths']
+XFORM_OP_TRANSFORM = "xformOp:transform"
+
 class VehicleDefinition():
     def __init__(self):
         self.definition_prim = None
         self.physx_veh_prim = None
         self.mesh_chassis_prim = None
         self.wheel_pairs = {}
+        self.sync_pairs = []
    
     def load_from_definition_prim(self, stage, definition_prim) -> bool:
         #self.stage = stage
@@ -80,119 +88,172 @@ class VehicleDefinition():
                 is_left = not is_left
                 if is_left:
                     axle_num += 1
+
+            # mesh transform sync: (physx prim, mesh transform attribute) pairs, the chassis last
+            self.sync_pairs = [(source_prim, dest_prim.GetAttribute('xformOp:transform'))
+                               for source_prim, dest_prim in self.wheel_pairs.items()]
+            self.sync_pairs.append((self.physx_veh_prim, self.mesh_chassis_prim.GetAttribute('xformOp:transform')))
                     
         except Exception as inst:
             print(f"{self} setup_vehicle: Exception {inst}")
             return False
         
         return True
+
+    # prims this definition points at
+    @property
+    def target_paths(self):
+        paths = [self.physx_veh_path, self.mesh_chassis_path] + list(self.mesh_wheel_paths or [])
+        return [Sdf.Path(path) for path in paths if path] + [source_prim.GetPath() for source_prim in self.wheel_pairs]
     
     def make_physx_wheel_ref_list(self, phys_veh_path, wheel_count):
-        is_left = True
-        axle_num = 1
-        wheel_list = [] 
-        for wr_num in range(wheel_count):
-            wheel_ref_name = "/LeftWheel" if is_left else "/RightWheel"
-            wheel_ref_name = wheel_ref_name + str(axle_num) + "References"     
-            ref_path = phys_veh_path + wheel_ref_name
-            wheel_list.append(ref_path)
-            # cue up next wheel
-            is_left = not is_left
-            if is_left:
-                axle_num += 1
-                
-        return wheel_list
-    
-    def ensure_prim_has_xform_op(self, prim_path) -> bool:
-        try:
-            usd_context = omni.usd.get_context()
-            my_stage = usd_context.get_stage()
-            prim = my_stage.GetPrimAtPath(prim_path)
-            xform_op = prim.GetAttribute('xformOp:transform')
-            if xform_op is None or not xform_op.IsValid():
-                xform_op = UsdGeom.Xformable(prim) 
-                new_op = xform_op.AddTransformOp()
-                if new_op is None:
-                    return False
-        except Exception:
-            print(f"ensure_prim_has_xform_op : {Exception}")
-            return False
-                   
-        return True
-    
-    def set_prim_property(self, prim_path, attr_name, prop_type, prop_value):
-        try:
-            usd_context = omni.usd.get_context()
-            my_stage = usd_context.get_stage()
-            prim = my_stage.GetPrimAtPath(prim_path)
-            prop = prim.GetAttribute(attr_name)
-            if prop:
-                prop.Set(prop_value)
-            else:
-                prim.CreateAttribute(attr_name, prop_type, custom=True).Set(prop_value)
-                
-        except Exception as inst:
-            print(f"set_prim_property: {inst}")
-            return False
-                
-        return True            
-        
+        return physx_wheel_ref_paths(phys_veh_path, wheel_count)
     
-    def create_definition_from_paths(self, **kwargs) -> bool:
-        expected = [    'veh_def_prim_path', 'physx_veh_path',
-                        'mesh_chassis_path', 'mesh_wheel_paths'] 
-        
-        for key in expected:
+    # stage: the usd context's stage if not given
+    def create_definition_from_paths(self, stage=None, **kwargs) -> bool:
+        for key in VEHICLE_SPEC_KEYS:
             if not key in kwargs:
                 print(f"create_definition_from_paths missing: {key}")
                 return False
-        
-        veh_def_prim_path = kwargs['veh_def_prim_path']
-        physx_veh_path = kwargs['physx_veh_path']
-        mesh_chassis_path = kwargs['mesh_chassis_path']
-        mesh_wheel_paths = kwargs['mesh_wheel_paths'] 
-        
-        if not self.ensure_prim_has_xform_op(physx_veh_path):
-            return False
-        
-        if not self.ensure_prim_has_xform_op(mesh_chassis_path):
-            return False        
-                
-        wheel_ref_list = self.make_physx_wheel_ref_list(physx_veh_path, len(mesh_wheel_paths))
-        for wheel_ref_path in wheel_ref_list:
-            if not self.ensure_prim_has_xform_op(wheel_ref_path):
-                return False
-            
-        for wheel_mesh in mesh_wheel_paths:
-            if not self.ensure_prim_has_xform_op(wheel_mesh):
-                return False            
-            
-        try:
-            
-            if not self.set_prim_property(  veh_def_prim_path,
-                                            VEH_PHYS_VEH_ATTR,
-                                            Sdf.ValueTypeNames.String,
-                                            physx_veh_path):
-                return False
-            
-            if not self.set_prim_property(  veh_def_prim_path,
-                                            VEH_MESH_CHASSIS_ATTR,
-                                            Sdf.ValueTypeNames.String,
-                                            mesh_chassis_path):
-                return False
-            
-            if not self.set_prim_property(  veh_def_prim_path,
-                                            VEH_MESH_WHEELS_ATTR,
-                                            Sdf.ValueTypeNames.StringArray,
-                                            mesh_wheel_paths):
-                return False
-            
-        
-            self.veh_def_prim = stage.GetPrimAtPath(veh_def_prim_path)             
 
-        except Exception as inst:
-            print(f"create_definition_from_paths: {inst}")
+        if stage is None:
+            stage = omni.usd.get_context().get_stage()
+        if not create_vehicle_definitions([kwargs], stage):
             return False
-        
+        self.veh_def_prim = stage.GetPrimAtPath(kwargs['veh_def_prim_path'])
         return True
-                    
\ No newline at end of file
+
+
+# physx wheel reference prims of a vehicle: Left/Right alternating, axle by axle
+def physx_wheel_ref_paths(physx_veh_path, wheel_count):
+    is_left = True
+    axle_num = 1
+    wheel_list = [] 
+    for wr_num in range(wheel_count):
+        wheel_ref_name = "/LeftWheel" if is_left else "/RightWheel"
+        wheel_ref_name = wheel_ref_name + str(axle_num) + "References"     
+        ref_path = physx_veh_path + wheel_ref_name
+        wheel_list.append(ref_path)
+        # cue up next wheel
+        is_left = not is_left
+        if is_left:
+            axle_num += 1
+            
+    return wheel_list
+
+
+# Authors many vehicle definitions at once. specs are dicts with the VEHICLE_SPEC_KEYS:
+#
+#   create_vehicle_definitions([ { 'veh_def_prim_path' : "/World/Definitions/veh_truck_01",
+#                                  'physx_veh_path' : "/World/Trucks/truck_01",
+#                                  'mesh_chassis_path' : "/World/Meshes/truck_01/chassis",
+#                                  'mesh_wheel_paths' : ["/World/Meshes/truck_01/wheel_fl", ...] }, ... ])
+#
+# The stage is looked up and read once, up front: specs whose prims aren't all there are skipped.
+# Then everything is authored as specs in one Sdf.ChangeBlock (layer: the edit target if None):
+# a transform op on every physx and mesh prim without one, the definition prims (defined if
+# they don't exist) and their vehicle_helper: attributes.
+# Returns the definition prim paths that were authored.
+def create_vehicle_definitions(specs, stage=None, layer=None):
+    if stage is None:
+        stage = omni.usd.get_context().get_stage()
+    if stage is None:
+        print("create_vehicle_definitions: no stage")
+        return []
+    if layer is None:
+        layer = stage.GetEditTarget().GetLayer()
+
+    # prim path : its xformOpOrder when it needs a transform op, None when it has one
+    xform_op_orders = {}
+    new_prim_paths = set()
+    definitions = []
+    for spec in specs:
+        missing = [key for key in VEHICLE_SPEC_KEYS if key not in spec]
+        if missing:
+            print(f"create_vehicle_definitions: {spec.get('veh_def_prim_path')} missing {missing}")
+            continue
+
+        def_path = Sdf.Path(spec['veh_def_prim_path'])
+        physx_veh_path = spec['physx_veh_path']
+        mesh_chassis_path = spec['mesh_chassis_path']
+        mesh_wheel_paths = list(spec['mesh_wheel_paths'])
+        if not def_path.name.startswith(VEHICLE_DEF_PREFIX):
+            print(f"create_vehicle_definitions: {def_path} won't be found, the name must start with {VEHICLE_DEF_PREFIX}")
+
+        xform_paths = ( [physx_veh_path, mesh_chassis_path]
+                        + physx_wheel_ref_paths(physx_veh_path, len(mesh_wheel_paths))
+                        + mesh_wheel_paths )
+        # kept apart until the whole spec is found, a skipped spec edits nothing
+        spec_op_orders = {}
+        found = True
+        for path in xform_paths:
+            if path in xform_op_orders or path in spec_op_orders:
+                continue
+            prim = stage.GetPrimAtPath(path)
+            if not prim:
+                print(f"create_vehicle_definitions: {def_path} can't find {path}")
+                found = False
+                break
+            if prim.GetAttribute(XFORM_OP_TRANSFORM):
+                spec_op_orders[path] = None
+            else:
+                spec_op_orders[path] = list(UsdGeom.Xformable(prim).GetXformOpOrderAttr().Get() or [])
+        if not found:
+            continue
+        xform_op_orders.update(spec_op_orders)
+
+        for path in def_path.GetPrefixes():
+            if not stage.GetPrimAtPath(path):
+                new_prim_paths.add(path)
+        definitions.append((def_path, physx_veh_path, mesh_chassis_path, mesh_wheel_paths))
+
+    with Sdf.ChangeBlock():
+        # parents before children
+        for path in sorted(new_prim_paths):
+            Sdf.CreatePrimInLayer(layer, path).specifier = Sdf.SpecifierDef
+
+        for path, op_order in xform_op_orders.items():
+            if op_order is None:
+                continue
+            prim_spec = Sdf.CreatePrimInLayer(layer, path)
+            set_attribute_spec(prim_spec, XFORM_OP_TRANSFORM, Sdf.ValueTypeNames.Matrix4d, Gf.Matrix4d(1.0), custom=False)
+            order_spec = prim_spec.attributes.get(UsdGeom.Tokens.xformOpOrder)
+            if order_spec is None:
+                order_spec = Sdf.AttributeSpec(prim_spec, UsdGeom.Tokens.xformOpOrder, Sdf.ValueTypeNames.TokenArray,
+                                               Sdf.VariabilityUniform)
+            order_spec.default = op_order + [XFORM_OP_TRANSFORM]
+
+        for def_path, physx_veh_path, mesh_chassis_path, mesh_wheel_paths in definitions:
+            prim_spec = Sdf.CreatePrimInLayer(layer, def_path)
+            set_attribute_spec(prim_spec, VEH_PHYS_VEH_ATTR, Sdf.ValueTypeNames.String, physx_veh_path)
+            set_attribute_spec(prim_spec, VEH_MESH_CHASSIS_ATTR, Sdf.ValueTypeNames.String, mesh_chassis_path)
+            set_attribute_spec(prim_spec, VEH_MESH_WHEELS_ATTR, Sdf.ValueTypeNames.StringArray, mesh_wheel_paths)
+
+    return [str(definition[0]) for definition in definitions]
+
+
+def set_attribute_spec(prim_spec, attr_name, value_type, value, custom=True):
+    attr_spec = prim_spec.attributes.get(attr_name)
+    if attr_spec is None:
+        attr_spec = Sdf.AttributeSpec(prim_spec, attr_name, value_type, declaresCustom=custom)
+    attr_spec.default = value
+
+
+# vehicle specs from a JSON file: a list of specs, or { "vehicles" : [specs] }
+def load_vehicle_specs(file_path):
+    with open(file_path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("vehicles", [])
+    return data
+
+
+def import_vehicle_definitions(file_path, stage=None, layer=None):
+    try:
+        specs = load_vehicle_specs(file_path)
+    except (OSError, ValueError) as inst:
+        print(f"import_vehicle_definitions: can't read {file_path}: {inst}")
+        return []
+    created = create_vehicle_definitions(specs, stage, layer)
+    print(f"import_vehicle_definitions: {len(created)} of {len(specs)} vehicle definitions from {file_path}")
+    return created
@@ -0,0 +1,222 @@
+import os
+import json
+import hashlib
+import carb.settings
+from pxr import Sdf, Tf, Usd
+from .vehicle_definition import *
+
+__all__ = ['VehicleIndex', 'stage_fingerprint', 'index_file_path']
+
+# true: attach() reads and writes a sidecar index next to the stage file, local files only
+# (declared off in config/extension.toml, nothing is written next to the user's stages unless asked)
+INDEX_CACHE_SETTING = "/exts/omni.docs.vehicle.helper/vehicleIndexCache"
+INDEX_FILE_SUFFIX = ".vehicles.json"
+# bump when the sidecar's contents change
+INDEX_VERSION = 1
+
+
+# What the stage's definitions were read from: every file layer the stage uses, by path, size
+# and modification time (the session layer aside). None when a layer has unsaved edits or
+# isn't a local file, nothing saved can describe the stage then: layers on a server
+# (omniverse://, like the jumper's default stage) have no local realPath to stat.
+def stage_fingerprint(stage):
+    session_layer = stage.GetSessionLayer()
+    entries = []
+    for layer in stage.GetUsedLayers():
+        if layer == session_layer:
+            continue
+        if layer.anonymous or layer.dirty or not layer.realPath:
+            return None
+        try:
+            stat = os.stat(layer.realPath)
+        except OSError:
+            return None
+        entries.append((layer.identifier, stat.st_size, stat.st_mtime_ns))
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([INDEX_VERSION, sorted(entries)]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# the sidecar index next to the root layer: <stage file>.vehicles.json
+def index_file_path(stage):
+    root_layer = stage.GetRootLayer()
+    if root_layer.anonymous or not root_layer.realPath:
+        return None
+    return root_layer.realPath + INDEX_FILE_SUFFIX
+
+
+# The stage's vehicle definitions, kept up to date from USD change notices instead of
+# walking the whole stage after every edit.
+#
+#   index = VehicleIndex()
+#   index.attach(stage)         # one full walk
+#   ...
+#   if index.update():          # once per frame, re-parses what the edits since touched
+#       vehicle_list = index.vehicles()
+#
+# The notice only collects paths, update() does the work:
+# - a resynced (added, removed, re-composed) prim: definitions at or under it are dropped,
+#   its subtree is walked for definitions, and definitions pointing at prims under it re-parsed
+# - a changed vehicle_helper: attribute on a definition prim: that definition re-parsed
+# Resyncing the pseudo root (a sublayer added or removed) walks the whole stage again.
+#
+# With use_cache (the vehicleIndexCache setting, off by default) the first walk is skipped when
+# the sidecar index next to the stage file has the stage's fingerprint: the definitions are set
+# up from the paths saved there. A walk on a saved, unedited stage writes the sidecar. Only
+# stages whose layers are all local files have a fingerprint, others are always walked.
+class VehicleIndex():
+
+    def __init__(self, use_cache=None):
+        self.stage = None
+        self._listener = None
+        self._definitions = {}
+        self._dirty_paths = set()
+        self._reparse_paths = set()
+        self.full_walks = 0
+        self.cache_loads = 0
+        if use_cache is None:
+            use_cache = carb.settings.get_settings().get_as_bool(INDEX_CACHE_SETTING)
+        self.use_cache = use_cache
+
+    def attach(self, stage):
+        self.detach()
+        self.stage = stage
+        if stage is None:
+            return
+        self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+        if self.use_cache:
+            fingerprint = stage_fingerprint(stage)
+            if self.load_cache(fingerprint):
+                return
+            self.rebuild()
+            self.save_cache(fingerprint)
+        else:
+            self.rebuild()
+
+    def detach(self):
+        if self._listener is not None:
+            self._listener.Revoke()
+            self._listener = None
+        self.stage = None
+        self._definitions = {}
+        self._dirty_paths = set()
+        self._reparse_paths = set()
+
+    def rebuild(self):
+        self._dirty_paths = set()
+        self._reparse_paths = set()
+        self._definitions = {}
+        self.full_walks += 1
+        self.add_definitions_under(self.stage.GetPseudoRoot())
+
+    # sorted by definition prim path
+    def vehicles(self):
+        return [self._definitions[path] for path in sorted(self._definitions)]
+
+    def __len__(self):
+        return len(self._definitions)
+
+    def _on_objects_changed(self, notice, stage):
+        for path in notice.GetResyncedPaths():
+            if path.IsPropertyPath():
+                if path.name.startswith(VEHICLE_DEF_ATTRIBUTE):
+                    self._reparse_paths.add(path.GetPrimPath())
+            else:
+                self._dirty_paths.add(path)
+        for path in notice.GetChangedInfoOnlyPaths():
+            if path.IsPropertyPath() and path.name.startswith(VEHICLE_DEF_ATTRIBUTE):
+                self._reparse_paths.add(path.GetPrimPath())
+
+    # True if the definitions changed
+    def update(self) -> bool:
+        if self.stage is None or not (self._dirty_paths or self._reparse_paths):
+            return False
+        dirty_paths = self._dirty_paths
+        reparse_paths = self._reparse_paths
+        self._dirty_paths = set()
+        self._reparse_paths = set()
+
+        if Sdf.Path.absoluteRootPath in dirty_paths:
+            self.rebuild()
+            return True
+
+        # ancestors only, their walk covers the rest
+        roots = Sdf.Path.RemoveDescendentPaths(list(dirty_paths))
+        for root in roots:
+            for def_path in [path for path in self._definitions if path.HasPrefix(root)]:
+                del self._definitions[def_path]
+            prim = self.stage.GetPrimAtPath(root)
+            if prim:
+                self.add_definitions_under(prim)
+
+        # the prims a definition points at came or went
+        for def_path, definition in list(self._definitions.items()):
+            if any(target.HasPrefix(root) for target in definition.target_paths for root in roots):
+                reparse_paths.add(def_path)
+
+        for def_path in reparse_paths:
+            self._definitions.pop(def_path, None)
+            prim = self.stage.GetPrimAtPath(def_path)
+            if prim and prim.GetName().startswith(VEHICLE_DEF_PREFIX):
+                self.add_definition(prim)
+        return True
+
+    def add_definitions_under(self, prim):
+        for veh_prim in Usd.PrimRange(prim):
+            if veh_prim.GetName().startswith(VEHICLE_DEF_PREFIX):
+                self.add_definition(veh_prim)
+
+    # True if the sidecar index matched the fingerprint and every definition in it set up
+    def load_cache(self, fingerprint) -> bool:
+        file_path = index_file_path(self.stage)
+        if fingerprint is None or file_path is None or not os.path.exists(file_path):
+            return False
+        try:
+            with open(file_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as inst:
+            print(f"VehicleIndex: can't read {file_path}: {inst}")
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("fingerprint") != fingerprint:
+            return False
+
+        definitions = {}
+        for def_path, paths in data.get("definitions", {}).items():
+            veh_prim = self.stage.GetPrimAtPath(def_path)
+            new_veh = VehicleDefinition()
+            new_veh.definition_prim = veh_prim
+            if not veh_prim or not new_veh.setup_vehicle(self.stage, **paths):
+                print(f"VehicleIndex: {file_path} is stale at {def_path}")
+                return False
+            definitions[veh_prim.GetPath()] = new_veh
+
+        self._definitions = definitions
+        self.cache_loads += 1
+        print(f"VehicleIndex: {len(definitions)} vehicle definitions from {file_path}")
+        return True
+
+    def save_cache(self, fingerprint):
+        file_path = index_file_path(self.stage)
+        if fingerprint is None or file_path is None:
+            return
+        data = { "version": INDEX_VERSION,
+                 "fingerprint": fingerprint,
+                 "definitions": { str(def_path): { 'physx_veh_path': definition.physx_veh_path,
+                                                   'mesh_chassis_path': definition.mesh_chassis_path,
+                                                   'mesh_wheel_paths': list(definition.mesh_wheel_paths) }
+                                  for def_path, definition in sorted(self._definitions.items()) } }
+        # other processes opening the stage read it, it's replaced whole
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=1)
+            os.replace(temp_path, file_path)
+        except OSError as inst:
+            print(f"VehicleIndex: can't write {file_path}: {inst}")
+
+    def add_definition(self, veh_prim):
+        carb.log_verbose(f"found vehicle def: {veh_prim.GetPath()}")
+        new_veh = VehicleDefinition()
+        if new_veh.load_from_definition_prim(self.stage, veh_prim):
+            self._definitions[veh_prim.GetPath()] = new_veh
@@ -1 +1,12 @@
 from .extension import *
+from .headless_runner import *
+from .multi_vehicle_round import *
+from .sweep_coordinator import *
+from .torque_search import *
+from .parameter_sweep import *
+from .results_store import *
+from .round_cache import *
+from .telemetry import *
+from .telemetry_replay import *
+from .vehicle_state import *
+from .round_metrics import *
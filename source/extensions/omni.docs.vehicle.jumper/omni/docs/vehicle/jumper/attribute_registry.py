@@ -0,0 +1,95 @@
+from pxr import Gf, Sdf, Usd
+
+__all__ = ['AttributeRegistry', 'values_close']
+
+# relative, scaled by the value's size (headlight intensities are in the millions)
+DEFAULT_TOLERANCE = 1e-6
+
+
+def values_close(a, b, tolerance=DEFAULT_TOLERANCE):
+    # bools are ints to isinstance, they only ever equal a bool
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= tolerance * max(1.0, abs(a), abs(b))
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (Gf.Matrix4d, Gf.Matrix4f, Gf.Vec3d, Gf.Vec3f, Gf.Quatd, Gf.Quatf)):
+        return Gf.IsClose(a, b, tolerance)
+    return a == b
+
+
+# Attribute handles resolved once, and writes skipped when the value hasn't changed.
+#
+#   attributes = AttributeRegistry(stage, edit_layer=round_layer)
+#   attributes.set(vehicle_prim, "physxVehicleController:accelerator", 1.0)
+#   attributes.set(vehicle_prim, "physxVehicleController:accelerator", 1.0)    # no Set, no change notice
+#
+# Only remembers what it wrote itself: reset() whenever the values can have changed underneath
+# (the edit layer cleared, a new round or stage).
+#
+# With a write_queue (omni.docs.vehicle.helper.get_write_queue()) the writes that get through
+# are queued and authored at the end of the frame in one change block; flush() writes them now.
+class AttributeRegistry():
+
+    def __init__(self, stage, edit_layer=None, tolerance=DEFAULT_TOLERANCE, write_queue=None):
+        self.stage = stage
+        self.edit_layer = edit_layer
+        self.tolerance = tolerance
+        self.write_queue = write_queue
+        self.reset()
+
+    def reset(self):
+        # queued writes are stale too
+        if self.write_queue is not None and self.edit_layer is not None:
+            self.write_queue.discard(self.edit_layer)
+        self._handles = {}
+        self._written = {}
+        self.writes = 0
+        self.skipped = 0
+
+    def handle(self, prim, attr_name):
+        key = (prim.GetPath(), attr_name)
+        attr = self._handles.get(key)
+        if attr is None:
+            attr = prim.GetAttribute(attr_name)
+            self._handles[key] = attr
+        return attr
+
+    def handle_at_path(self, attr_path):
+        key = Sdf.Path(attr_path)
+        attr = self._handles.get(key)
+        if attr is None:
+            attr = self.stage.GetAttributeAtPath(key)
+            self._handles[key] = attr
+        return attr
+
+    # True if the value was written
+    def set(self, prim, attr_name, value):
+        return self.set_attribute(self.handle(prim, attr_name), value)
+
+    def set_at_path(self, attr_path, value):
+        return self.set_attribute(self.handle_at_path(attr_path), value)
+
+    def set_attribute(self, attr, value):
+        if not attr:
+            return False
+        attr_path = attr.GetPath()
+        if attr_path in self._written and values_close(self._written[attr_path], value, self.tolerance):
+            self.skipped += 1
+            return False
+
+        if self.write_queue is not None:
+            self.write_queue.set(attr, value, self.edit_layer)
+        elif self.edit_layer is not None:
+            with Usd.EditContext(self.stage, self.edit_layer):
+                attr.Set(value)
+        else:
+            attr.Set(value)
+        self._written[attr_path] = value
+        self.writes += 1
+        return True
+
+    def flush(self):
+        if self.write_queue is not None:
+            self.write_queue.flush()
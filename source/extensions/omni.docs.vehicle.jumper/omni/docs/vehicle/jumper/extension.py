@@ -12,7 +12,22 @@ from omni.physx.bindings._physx import SimulationEvent
 from pxr import PhysxSchema
 
 from .run_test_rounds import *
+from .run_test_rounds import (
+    ROUND_TIME_BUDGET,
+    STALL_SPEED,
+    STALL_STOPPED_TIME,
+    STALL_DISTANCE,
+    STALL_PROGRESS_TIME,
+    ENGINE_TORQUE_ATTR_NAME
+)
 from .vehicle_audio import VehicleAudio
+from .torque_search import AdaptiveTorqueSearch
+from .results_store import ResultsStore
+from .round_cache import RoundCache
+from .telemetry import default_telemetry_dir
+from .telemetry_replay import TelemetryReplay
+from .round_metrics import default_metrics_dir
+from . import round_cache
 
 import omni.docs.vehicle.helper
 
@@ -40,7 +55,6 @@ WHEEL_LIST = [  "/LeftWheel1References",
                 "/RightWheel2References"]
 
 
-ENGINE_TORQUE_ATTR_NAME = "physxVehicleEngine:peakTorque"
 ENGINE_MAX_ROT_SPEED_ATTR_NAME = "physxVehicleEngine:maxRotationSpeed"
 
 LANDING_RAMP_PRIM_PATH = "/World/ramp_01/ramp/ramp_surface"
@@ -79,27 +93,80 @@ JUMPER_CAMERA_PATH = "/World/jumper_cam"
 
 BUTTON_TEXT_START_TEST = "Start Test"
 BUTTON_TEXT_STOP_TEST = "STOP Test"
+BUTTON_TEXT_REPLAY = "Replay"
+BUTTON_TEXT_STOP_REPLAY = "Stop Replay"
 
 LOAD_STAGE_FLASH_PERIOD = 0.5
 TORQUE_SPREAD_DEFAULT = 30.0
+# adaptive search stops when the best torque is bracketed this tightly
+SEARCH_TOLERANCE_PCT_DEFAULT = 1.0
+
+class ValueModel():
+    # plain stand-in for ui.SimpleFloatModel / ui.SimpleIntModel when there's no UI
+    def __init__(self, value=0):
+        self._value = value
+
+    @property
+    def as_float(self):
+        return float(self._value)
+
+    @as_float.setter
+    def as_float(self, value):
+        self._value = value
+
+    @property
+    def as_int(self):
+        return int(self._value)
+
+    @as_int.setter
+    def as_int(self, value):
+        self._value = value
+
 
 class SimData():
    
-    def __init__(self):
+    def __init__(self, headless=False):
+        # headless sims use plain value models instead of ui models
+        int_model = ValueModel if headless else ui.SimpleIntModel
+        float_model = ValueModel if headless else ui.SimpleFloatModel
         # sim test params
         self.sim_torque_steps = None
         self.sim_min_torque = None
         self.sim_max_torque = None  
+        # explicit torques to test, overrides steps/min/max when set
+        self.sim_torque_list = None
+        # other stage attributes per round, list of { property path : value }
+        self.sim_round_params = None
+        # AdaptiveTorqueSearch picks torques from earlier results when set
+        self.torque_search = None
+        # end rounds as soon as a jump is predicted to miss the landing ramp
+        self.predict_landing = False
+        # ResultsStore every round is appended to when set
+        self.results_store = None
+        # RoundCache consulted before each round when set
+        self.round_cache = None
+        # folder for per-round telemetry files, nothing is recorded when None
+        self.telemetry_dir = None
+        # folder for the subscriber timings and round throughput of each test, not written when None
+        self.metrics_dir = None
+        # stuck rounds: simulated time budget per round, stall detection (m/s, m, s)
+        self.round_time_budget = ROUND_TIME_BUDGET
+        self.stall_speed = STALL_SPEED
+        self.stall_stopped_time = STALL_STOPPED_TIME
+        self.stall_distance = STALL_DISTANCE
+        self.stall_progress_time = STALL_PROGRESS_TIME
+        # run rounds in simulated time, without cosmetic waits
+        self.fast_forward = False
         # current round stats
-        self.round_step_model = ui.SimpleIntModel()
-        self.round_torque_model = ui.SimpleFloatModel()
-        self.round_largest_susp_force_model = ui.SimpleFloatModel()
-        self.round_largest_body_impulse_model = ui.SimpleFloatModel()
+        self.round_step_model = int_model()
+        self.round_torque_model = float_model()
+        self.round_largest_susp_force_model = float_model()
+        self.round_largest_body_impulse_model = float_model()
         # stats from best round
-        self.best_torque_model = ui.SimpleFloatModel()
-        self.best_landing_body_impulse_model = ui.SimpleFloatModel()
-        self.best_landing_susp_force_model = ui.SimpleFloatModel()
-        self.best_round_idx_model = ui.SimpleIntModel()        
+        self.best_torque_model = float_model()
+        self.best_landing_body_impulse_model = float_model()
+        self.best_landing_susp_force_model = float_model()
+        self.best_round_idx_model = int_model()        
         # stage prims
         self.test_stage = None
         self.vehicle_prim_path = VEHICLE_PRIM_PATH
@@ -114,6 +181,10 @@ class SimData():
         self.wheel_friction_prim_path = WHEEL_FRICTION_PRIM_PATH
         self.vehicle_camera_path = JUMPER_CAMERA_PATH
         self.vehicle_headlights = HEADLIGHTS
+        self.vehicle_audio = None
+        self.audio_win_bell_prim = None
+        self.audio_fail_prim = None
+        self.audio_start_race_prim = None
         
         
 class UI_Data():
@@ -137,6 +208,18 @@ class MyExtension(omni.ext.IExt):
         #self._test_running = False
         self._test_round = None
         self._stage_loaded = False
+        self._round_cache = None
+        self._replay = None
+
+        omni.kit.commands.register_all_commands_in_module(round_cache)
+
+        # launched by a SweepCoordinator: run our share of rounds headless, no window
+        from .sweep_coordinator import start_sweep_worker_from_settings
+        if start_sweep_worker_from_settings():
+            return
+
+        self.sim_data.results_store = ResultsStore()
+        self._round_cache = RoundCache()
         
         wr_inst = omni.docs.vehicle.helper.get_instance()
         if wr_inst:
@@ -228,6 +311,24 @@ class MyExtension(omni.ext.IExt):
                                 self.val_spread_id = self._torque_pct_spread_value_model.subscribe_end_edit_fn(self.on_end_edit_sim_param)
                                 ui.FloatField(model=self._torque_pct_spread_value_model, height=25, width=130)
 
+                            with ui.HStack():
+                                self._fast_forward_cb = ui.CheckBox(width=25)
+                                ui.Label("Fast forward (no waits)", height=25)
+
+                            with ui.HStack():
+                                self._use_round_cache_cb = ui.CheckBox(width=25)
+                                self._use_round_cache_cb.model.set_value(True)
+                                ui.Label("Use cached rounds", height=25)
+                                ui.Button("Clear", clicked_fn=self.on_click_clear_round_cache, height=25, width=50)
+
+                            with ui.HStack():
+                                self._record_telemetry_cb = ui.CheckBox(width=25)
+                                ui.Label("Record telemetry", height=25)
+
+                            with ui.HStack():
+                                self._write_metrics_cb = ui.CheckBox(width=25)
+                                ui.Label("Write timing metrics", height=25)
+
                         with ui.VStack():
                             with ui.VStack():
                                 ui.Label("Min Torque", height=25) 
@@ -239,6 +340,16 @@ class MyExtension(omni.ext.IExt):
                                 self._engine_torque_max_model = ui.SimpleFloatModel()
                                 ui.FloatField(model=self._engine_torque_max_model, height=25, width=130)
 
+                            with ui.HStack():
+                                self._adaptive_search_cb = ui.CheckBox(width=25)
+                                ui.Label("Adaptive search (steps = max rounds)", height=25)
+
+                            with ui.HStack():
+                                ui.Label("Search tolerance %", height=25, width=130)
+                                self._search_tolerance_pct_model = ui.SimpleFloatModel()
+                                self._search_tolerance_pct_model.as_float = SEARCH_TOLERANCE_PCT_DEFAULT
+                                ui.FloatField(model=self._search_tolerance_pct_model, height=25, width=60)
+
                         ui.Spacer(width=20)
  
                         self.val_changed_id = self._engine_torque_steps_model.subscribe_end_edit_fn(self.on_end_edit_sim_param)
@@ -318,6 +429,33 @@ class MyExtension(omni.ext.IExt):
                         ui.Spacer(width=10)
                         with ui.VStack():
                             pass
+
+                ###############################################################
+
+                ui.Spacer(height=10)
+                ui.Separator(height=10)
+                ui.Label(f"Replay (recorded telemetry)", height=25,alignment=ui.Alignment.CENTER)
+                ui.Spacer(height=10)
+
+                with ui.HStack(height=25):
+                    ui.Label("Round", height=25, width=50)
+                    self._replay_round_model = ui.SimpleIntModel()
+                    ui.IntField(model=self._replay_round_model, height=25, width=60)
+                    ui.Spacer(width=10)
+                    ui.Label("Speed", height=25, width=50)
+                    self._replay_speed_model = ui.SimpleFloatModel()
+                    self._replay_speed_model.as_float = 1.0
+                    self._replay_speed_sub = self._replay_speed_model.subscribe_end_edit_fn(self.on_end_edit_replay_speed)
+                    ui.FloatField(model=self._replay_speed_model, height=25, width=60)
+                    ui.Spacer(width=10)
+                    self._replay_button = ui.Button(BUTTON_TEXT_REPLAY, clicked_fn=self.on_click_replay, height=25, width=120)
+                    self._replay_pause_button = ui.Button("Pause", clicked_fn=self.on_click_replay_pause, height=25, width=80)
+
+                ui.Spacer(height=5)
+                self._replay_scrub_model = ui.SimpleFloatModel()
+                self._replay_scrub_sub = self._replay_scrub_model.subscribe_value_changed_fn(self.on_replay_scrub)
+                self._replay_scrubbing_from_replay = False
+                ui.FloatSlider(model=self._replay_scrub_model, min=0.0, max=1.0, height=25)
                         
  
                 
@@ -382,6 +520,7 @@ class MyExtension(omni.ext.IExt):
         #         inst.start_sim()
 
     def on_click_start(self): 
+        self.stop_replay()
         if self._test_round:
             #was_running = self._test_running
             was_running = self._test_round.test_running
@@ -398,7 +537,6 @@ class MyExtension(omni.ext.IExt):
         #self.ui_data.end_of_round_report_fn = self.end_of_round_report_fn
         self.ui_data.test_round_event_fn = self.test_round_event_fn
         self.ui_data.test_done_report_fn = self.test_done_report_fn
-        self.ui_data.set_stage_params_fn = self.set_stage_params_fn
         self.ui_data.engine_rpm_model = self._wheel_friction_value_model
 
         self._test_round = JumpTestRound(self.sim_data, self.ui_data)
@@ -406,6 +544,20 @@ class MyExtension(omni.ext.IExt):
         self.sim_data.sim_torque_steps = self._engine_torque_steps_model.as_int
         self.sim_data.sim_min_torque = self._engine_torque_min_model.as_float
         self.sim_data.sim_max_torque = self._engine_torque_max_model.as_float
+        self.sim_data.fast_forward = self._fast_forward_cb.model.get_value_as_bool()
+        use_cache = self._use_round_cache_cb.model.get_value_as_bool()
+        self.sim_data.round_cache = self._round_cache if use_cache else None
+        record_telemetry = self._record_telemetry_cb.model.get_value_as_bool()
+        self.sim_data.telemetry_dir = default_telemetry_dir() if record_telemetry else None
+        write_metrics = self._write_metrics_cb.model.get_value_as_bool()
+        self.sim_data.metrics_dir = default_metrics_dir() if write_metrics else None
+        self.sim_data.torque_search = None
+        if self._adaptive_search_cb.model.get_value_as_bool():
+            tolerance = self._original_torque_value_model.as_float * self._search_tolerance_pct_model.as_float * 0.01
+            self.sim_data.torque_search = AdaptiveTorqueSearch(self.sim_data.sim_min_torque,
+                                                               self.sim_data.sim_max_torque,
+                                                               tolerance,
+                                                               max_rounds=self.sim_data.sim_torque_steps)
         
         self._test_round.reset_test(self.sim_data)
         
@@ -453,6 +605,7 @@ class MyExtension(omni.ext.IExt):
     
     ######################################################################            
 
+    @omni.docs.vehicle.helper.timed("JumperExtension.tick_update_ui")
     def tick_update_ui(self, e: carb.events.IEvent):       
         if self._stage_loaded == True:
             self._pop_event_stream_sub_id = None
@@ -496,7 +649,7 @@ class MyExtension(omni.ext.IExt):
                 report_text = "Test Failed..."
                 
         self.test_round_event_fn(report_text, good_test)
-        self.restore_default_stage_values()
+        self._replay_round_model.as_int = max(1, self.sim_data.best_round_idx_model.as_int)
                     
                 
     # def end_of_round_report_fn(self):
@@ -514,14 +667,19 @@ class MyExtension(omni.ext.IExt):
         print("[omni.docs.vehicle.jumper] MyExtension shutdown")
         if self._test_round:
             self._test_round.on_shutdown()
+        if self.sim_data.results_store is not None:
+            self.sim_data.results_store.close()
+            self.sim_data.results_store = None
+        self.stop_replay()
+        self.sim_data.round_cache = None
+        if self._round_cache is not None:
+            self._round_cache.close()
+            self._round_cache = None
+        omni.kit.commands.unregister_module_commands(round_cache)
     
 
     ######################## STAGE FUNCTIONS #############################
     
-    def restore_default_stage_values(self):
-        self._engine_torque_value.Set(self._original_torque_value_model.as_float)
-            
-
     def populate_fields_from_stage(self):
         
         self._wheel_friction_prim_path_value_model.as_string = WHEEL_FRICTION_PRIM_PATH
@@ -542,6 +700,69 @@ class MyExtension(omni.ext.IExt):
    
         self._original_torque_value_model.as_float = round(self._engine_torque_value.Get(),0)
         
+    ######################## REPLAY #############################
+
+    def on_click_replay(self):
+        if self._replay is not None:
+            self.stop_replay()
+            return
+        if self._test_round is None or self._test_round.test_running:
+            self.test_round_event_fn("Replay: run a test with 'Record telemetry' first")
+            return
+
+        round_idx = self._replay_round_model.as_int
+        telemetry_path = None
+        for result in self._test_round.round_results:
+            if result.round_idx == round_idx:
+                telemetry_path = result.telemetry_path
+        if telemetry_path is None:
+            self.test_round_event_fn(f"Replay: no telemetry for round #{round_idx}")
+            return
+
+        self._replay = TelemetryReplay( telemetry_path,
+                                        self.sim_data.test_stage,
+                                        self.sim_data.vehicle_prim_path,
+                                        vehicle_camera=self._test_round.vehicle_camera,
+                                        vehicle_audio=self.sim_data.vehicle_audio,
+                                        on_frame_fn=self.on_replay_frame)
+        self._replay.play(self._replay_speed_model.as_float)
+        self._replay_button.text = BUTTON_TEXT_STOP_REPLAY
+        self.test_round_event_fn(f"Replaying round #{round_idx}", True)
+
+    def on_click_replay_pause(self):
+        if self._replay is None:
+            return
+        if self._replay.playing:
+            self._replay.pause()
+        else:
+            self._replay.play()
+
+    def on_end_edit_replay_speed(self, model):
+        if self._replay is not None:
+            self._replay.set_speed(model.as_float)
+
+    def on_replay_frame(self, replay_time):
+        if self._replay is None or self._replay.duration <= 0:
+            return
+        self._replay_scrubbing_from_replay = True
+        self._replay_scrub_model.as_float = (replay_time - self._replay.start_time) / self._replay.duration
+        self._replay_scrubbing_from_replay = False
+
+    def on_replay_scrub(self, model):
+        if self._replay is None or self._replay_scrubbing_from_replay:
+            return
+        self._replay.seek_fraction(model.as_float)
+
+    def stop_replay(self):
+        if self._replay is None:
+            return
+        self._replay.stop()
+        self._replay = None
+        self._replay_button.text = BUTTON_TEXT_REPLAY
+
+    def on_click_clear_round_cache(self):
+        omni.kit.commands.execute("InvalidateRoundCache", db_path=self._round_cache.db_path)
+
     def on_click_set_torque_to_stage(self):
         eng_prim = self.sim_data.test_stage.GetPrimAtPath(VEHICLE_PRIM_PATH)
         float_val = round(self._original_torque_value_model.as_float,0) 
@@ -549,15 +770,6 @@ class MyExtension(omni.ext.IExt):
         self.populate_fields_from_stage()
         self.populate_default_test_params()
  
-    def set_new_stage_values(self):
-        eng_prim = self.sim_data.test_stage.GetPrimAtPath(VEHICLE_PRIM_PATH)
-        float_val = round(self.sim_data.round_torque_model.as_float,0) 
-        eng_prim.GetAttribute(ENGINE_TORQUE_ATTR_NAME).Set(float_val)
- 
-
-    def set_stage_params_fn(self, **kwargs): 
-        self.set_new_stage_values()
- 
     def populate_default_test_params(self):
         steps = self._engine_torque_steps_model.as_int
         if steps < 1:
@@ -0,0 +1,147 @@
+import asyncio
+import omni.usd
+import omni.timeline
+
+from .run_test_rounds import JumpTestRound
+from .multi_vehicle_round import MultiVehicleRound, LAYOUT_SHARED_COURSE
+from .extension import SimData, UI_Data, MY_STAGE_NAME
+
+import omni.docs.vehicle.helper
+
+__all__ = ['HeadlessSweepRunner']
+
+
+# Runs a torque sweep through JumpTestRound without the jump test window:
+# no camera, audio, headlights or ui models, only the round logic and physics.
+#
+#   runner = HeadlessSweepRunner(sim_torque_steps=21, sim_min_torque=3000, sim_max_torque=9000)
+#   results = await runner.run_async()
+#
+# sim_torque_list tests exactly those torques instead of the min..max steps,
+# torque_search (AdaptiveTorqueSearch) picks each torque from the earlier rounds,
+# sim_round_params sets other stage attributes per round ({ property path : value } per round),
+# results_store (ResultsStore) keeps every round on disk,
+# round_cache (RoundCache) skips rounds that have run before with the same stage and settings,
+# telemetry_dir records every round tick by tick to a .npz file in that folder,
+# metrics_dir gets the subscriber timings and round throughput (JSON and Prometheus text) at the end.
+# concurrent_vehicles > 1 tests that many torques per simulation (MultiVehicleRound, with lane_layout,
+# tile_offset and course_prim_paths), not with torque_search, round_cache or telemetry.
+# Round edits go to a session sublayer (see JumpTestRound), the authored stage is left as it was.
+class HeadlessSweepRunner():
+
+    def __init__(self, sim_torque_steps=1, sim_min_torque=None, sim_max_torque=None, sim_torque_list=None,
+                 torque_search=None, sim_round_params=None, stage=None, stage_path=MY_STAGE_NAME,
+                 fast_forward=True, predict_landing=True, results_store=None, round_cache=None,
+                 telemetry_dir=None, metrics_dir=None, concurrent_vehicles=1, lane_layout=LAYOUT_SHARED_COURSE,
+                 tile_offset=None, course_prim_paths=None):
+        self.sim_data = SimData(headless=True)
+        self.sim_data.sim_torque_steps = sim_torque_steps
+        self.sim_data.sim_min_torque = sim_min_torque
+        self.sim_data.sim_max_torque = sim_max_torque
+        self.sim_data.sim_torque_list = sim_torque_list
+        self.sim_data.torque_search = torque_search
+        self.sim_data.sim_round_params = sim_round_params
+        self.sim_data.fast_forward = fast_forward
+        self.sim_data.predict_landing = predict_landing
+        self.sim_data.results_store = results_store
+        self.sim_data.round_cache = round_cache
+        self.sim_data.telemetry_dir = telemetry_dir
+        self.sim_data.metrics_dir = metrics_dir
+        self.sim_data.test_stage = stage
+        self.stage_path = stage_path
+        self.concurrent_vehicles = concurrent_vehicles
+        self.lane_layout = lane_layout
+        self.tile_offset = tile_offset
+        self.course_prim_paths = course_prim_paths
+
+        self.ui_data = UI_Data()
+        self.ui_data.test_done_report_fn = self.test_done_report_fn
+
+        self.results = []
+        self.test_running = False
+        self._test_round = None
+        self._on_done_fn = None
+        # the vehicle helper's headless flag before the sweep, None when not suspended
+        self._helper_headless = None
+
+    def run(self, on_done_fn=None):
+        if self.test_running:
+            print("HeadlessSweepRunner: sweep already running")
+            return False
+
+        self._on_done_fn = on_done_fn
+        if self.sim_data.test_stage is None:
+            usd_context = omni.usd.get_context()
+            usd_context.open_stage(self.stage_path)
+            self.sim_data.test_stage = usd_context.get_stage()
+
+        if self.sim_data.test_stage is None:
+            print(f"HeadlessSweepRunner: can't open stage {self.stage_path}")
+            return False
+
+        self.suspend_helper()
+        self.results = []
+        self.test_running = True
+        self._test_round = self.create_test_round()
+        self._test_round.reset_test(self.sim_data)
+        self._test_round.start_test()
+        return True
+
+    def create_test_round(self):
+        if self.concurrent_vehicles <= 1:
+            return JumpTestRound(self.sim_data, self.ui_data, headless=True)
+        if self.sim_data.torque_search is not None:
+            print("HeadlessSweepRunner: the torque search picks one torque at a time, running one vehicle")
+            return JumpTestRound(self.sim_data, self.ui_data, headless=True)
+        return MultiVehicleRound(self.sim_data, self.ui_data, self.concurrent_vehicles,
+                                 layout=self.lane_layout,
+                                 tile_offset=self.tile_offset,
+                                 course_prim_paths=self.course_prim_paths)
+
+    async def run_async(self):
+        future = asyncio.get_event_loop().create_future()
+        if not self.run(on_done_fn=future.set_result):
+            return []
+        return await future
+
+    def stop(self):
+        if self._test_round is not None and self._test_round.test_running:
+            self._test_round.finish_test()
+        self.resume_helper()
+
+    # mesh sync in the vehicle helper is presentation only too, it stays off for the whole sweep:
+    # the stage we just opened still sends ASSETS_LOADED, which would restart it
+    def suspend_helper(self):
+        wr_inst = omni.docs.vehicle.helper.get_instance()
+        if wr_inst and self._helper_headless is None:
+            self._helper_headless = wr_inst.headless
+            wr_inst.headless = True
+            wr_inst.suspend_sync()
+
+    def resume_helper(self):
+        wr_inst = omni.docs.vehicle.helper.get_instance()
+        if wr_inst and self._helper_headless is not None:
+            wr_inst.headless = self._helper_headless
+            wr_inst.resume_sync()
+        self._helper_headless = None
+
+    @property
+    def best_result(self):
+        best_idx = self.sim_data.best_round_idx_model.as_int
+        for result in self.results:
+            if result.round_idx == best_idx:
+                return result
+        return None
+
+    ######################## JumpTestRound callbacks ########################
+
+    def test_done_report_fn(self):
+        self.results = list(self._test_round.round_results)
+        self.test_running = False
+        self._test_round = None
+        self.resume_helper()
+
+        if self._on_done_fn is not None:
+            on_done_fn = self._on_done_fn
+            self._on_done_fn = None
+            on_done_fn(self.results)
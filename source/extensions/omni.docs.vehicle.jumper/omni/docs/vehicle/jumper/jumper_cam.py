@@ -5,6 +5,8 @@ import omni.usd
 import carb
 from pxr import Usd, UsdLux, UsdGeom, UsdShade, Sdf, Gf, UsdPhysics
 import numpy as np
+from .attribute_registry import AttributeRegistry
+from omni.docs.vehicle.helper import get_write_queue, timed
 
 PREFERED_X_OFFSET = 4000.0
 PREFERED_Y_OFFSET = 1500.0
@@ -25,7 +27,8 @@ MID_RAMPS_X_ADDED_OFFSET = 800
 # VEL_Y_MAX 
 
 CAM_VEL = 500.0
-CAM_LERP_STRENGTH = 0.7275
+# the camera used to ease twice per tick at 0.7275, now it's once at the same overall rate
+CAM_LERP_STRENGTH = 0.7275 * 0.7275
 
 class JumperCam():
    
@@ -34,6 +37,13 @@ class JumperCam():
         self.camera_prim = None
         self.camera_target_pos = Gf.Vec3d()
         self.car_started_moving = False
+        # vehicle transform comes from USD, or from this when set (VehicleState, TelemetryReplay)
+        self.state_source = None
+
+    def get_vehicle_transform(self):
+        if self.state_source is not None:
+            return self.state_source.get_vehicle_transform()
+        return UsdGeom.Xformable(self.vehicle_prim).GetLocalTransformation()
 
     def setup_camera(self, **kwargs): 
         
@@ -52,6 +62,7 @@ class JumperCam():
 
         if self.stage is not None:
             self.camera_prim = self.stage.GetPrimAtPath(self.camera_prim_path)
+            self.attributes = AttributeRegistry(self.stage, write_queue=get_write_queue())
             
             
         viewport = get_active_viewport()
@@ -65,6 +76,7 @@ class JumperCam():
         
     def set_initial_position(self):
         
+        # the reset start pose in USD, physics hasn't stepped this round yet
         vehicle_mat = UsdGeom.Xformable(self.vehicle_prim).GetLocalTransformation()
         vehicle_pos = vehicle_mat.ExtractTranslation()
  
@@ -82,29 +94,39 @@ class JumperCam():
         
         
         
-        vehicle_mat = UsdGeom.Xformable(self.vehicle_prim).GetLocalTransformation()
+        vehicle_mat = self.get_vehicle_transform()
         vehicle_pos = vehicle_mat.ExtractTranslation()
  
         camera_pos = self.camera_target_pos 
         
         new_cam_mat = Gf.Matrix4d(1.0)
         new_cam_mat.SetLookAt(camera_pos, vehicle_pos, Gf.Vec3d(0,1,0))
-        destXformAttr = self.camera_prim.GetAttribute('xformOp:transform')
-        destXformAttr.Set(new_cam_mat.GetInverse())
+        self.attributes.set(self.camera_prim, 'xformOp:transform', new_cam_mat.GetInverse())
                         
     
+    def get_target_position(self):
+        vehicle_mat = self.get_vehicle_transform()
+        vehicle_pos = vehicle_mat.ExtractTranslation() 
+        new_pos = Gf.Vec3d(vehicle_pos + PREFERED_OFFSET) 
+        
+        if new_pos[2] > MID_RAMPS_Z:
+            new_pos[2] = MID_RAMPS_Z
+            new_pos[0] += MID_RAMPS_X_ADDED_OFFSET
+            new_pos[1] += MID_RAMPS_Y_ADDED_OFFSET                     
+        return new_pos
+
+    # jump straight to where the camera is heading (replay scrubbing)
+    def snap_to_target(self):
+        self.camera_target_pos = self.get_target_position()
+        self.set_view()
+
+    @timed("JumperCam.update_camera")
     def update_camera(self, e: carb.events.IEvent):
-        if self.car_started_moving == True:
-            vehicle_mat = UsdGeom.Xformable(self.vehicle_prim).GetLocalTransformation()
-            vehicle_pos = vehicle_mat.ExtractTranslation() 
-            new_pos = Gf.Vec3d(vehicle_pos + PREFERED_OFFSET) 
-            
-            if new_pos[2] > MID_RAMPS_Z:
-                new_pos[2] = MID_RAMPS_Z
-                new_pos[0] += MID_RAMPS_X_ADDED_OFFSET
-                new_pos[1] += MID_RAMPS_Y_ADDED_OFFSET                     
+        self.step_camera(e.payload["dt"])
 
-            dt = e.payload["dt"]
+    def step_camera(self, dt):
+        if self.car_started_moving == True:
+            new_pos = self.get_target_position()
             exp = 1.0 - (CAM_LERP_STRENGTH ** dt)
             amt = Gf.Lerp(exp, 0, 1.0)
             to_vect = new_pos - self.camera_target_pos
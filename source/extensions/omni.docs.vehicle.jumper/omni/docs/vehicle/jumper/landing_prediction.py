@@ -0,0 +1,121 @@
+from pxr import Usd, UsdGeom, UsdShade, UsdPhysics, Gf
+
+__all__ = ['LandingPredictor']
+
+# how far ahead a jump is followed
+PREDICTION_MAX_TIME = 10.0
+PREDICTION_MAX_STEP = 0.05
+PREDICTION_MIN_STEP = 0.001
+# extra room around the ramp on top of the vehicle's own size
+RAMP_MARGIN_SCALE = 1.25
+
+DEFAULT_GRAVITY = 9.81
+
+
+# Predicts where an airborne vehicle comes down, against geometry pulled from the stage once per test:
+# - world bounds of the landing ramp, grown by the vehicle's size (so a wheel clipping the edge still counts)
+# - world bounds of every collider bound to the out-of-bounds physics material
+# - world bounds of every other static collider (road, takeoff ramp, walls), rigid bodies left out
+#
+# predict_miss() follows the ballistic arc from the takeoff pose and velocity. It's a miss only when
+# the arc reaches out-of-bounds geometry before it gets anywhere near the ramp or hits anything else,
+# so anything unclear is left to the simulation.
+class LandingPredictor():
+
+    def __init__(self, stage, vehicle_prim, landing_ramp_prim_path, material_out_of_bounds):
+        self.stage = stage
+        self.vehicle_prim = vehicle_prim
+        bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_, UsdGeom.Tokens.render])
+
+        vehicle_size = bbox_cache.ComputeWorldBound(vehicle_prim).ComputeAlignedRange().GetSize()
+        self.margin = max(vehicle_size) * 0.5 * RAMP_MARGIN_SCALE
+
+        self.ramp_range = None
+        ramp_prim = stage.GetPrimAtPath(landing_ramp_prim_path)
+        if ramp_prim:
+            ramp_range = bbox_cache.ComputeWorldBound(ramp_prim).ComputeAlignedRange()
+            margin_vec = Gf.Vec3d(self.margin)
+            self.ramp_range = Gf.Range3d(ramp_range.GetMin() - margin_vec, ramp_range.GetMax() + margin_vec)
+        else:
+            print(f"LandingPredictor: can't find landing ramp {landing_ramp_prim_path}")
+
+        self.out_of_bounds_ranges, self.collider_ranges = self.find_collider_ranges(bbox_cache, material_out_of_bounds)
+        self.gravity = self.find_gravity()
+
+    # (colliders bound to material_path, every other static collider)
+    def find_collider_ranges(self, bbox_cache, material_path):
+        material_ranges = []
+        other_ranges = []
+        it = iter(self.stage.Traverse())
+        for prim in it:
+            # the vehicles and anything else that moves, their bounds now say nothing about later
+            if prim.HasAPI(UsdPhysics.RigidBodyAPI):
+                it.PruneChildren()
+                continue
+            if not prim.HasAPI(UsdPhysics.CollisionAPI):
+                continue
+            prim_range = bbox_cache.ComputeWorldBound(prim).ComputeAlignedRange()
+            material, _ = UsdShade.MaterialBindingAPI(prim).ComputeBoundMaterial("physics")
+            if material and str(material.GetPath()) == material_path:
+                material_ranges.append(prim_range)
+            else:
+                other_ranges.append(prim_range)
+        return material_ranges, other_ranges
+
+    def find_gravity(self) -> Gf.Vec3d:
+        for prim in self.stage.Traverse():
+            if prim.IsA(UsdPhysics.Scene):
+                scene = UsdPhysics.Scene(prim)
+                direction = Gf.Vec3d(scene.GetGravityDirectionAttr().Get() or Gf.Vec3d(0.0))
+                magnitude = scene.GetGravityMagnitudeAttr().Get()
+                break
+        else:
+            direction, magnitude = Gf.Vec3d(0.0), None
+
+        # unauthored: down the stage up axis, standard gravity in stage units
+        if direction.GetLength() == 0:
+            up_axis = UsdGeom.GetStageUpAxis(self.stage)
+            direction = Gf.Vec3d(0, 0, -1) if up_axis == UsdGeom.Tokens.z else Gf.Vec3d(0, -1, 0)
+        if magnitude is None or magnitude < 0 or magnitude > 1e30:
+            magnitude = DEFAULT_GRAVITY / UsdGeom.GetStageMetersPerUnit(self.stage)
+
+        return direction.GetNormalized() * magnitude
+
+    def predict_miss(self, position, velocity) -> bool:
+        if self.ramp_range is None or not self.out_of_bounds_ranges:
+            return False
+
+        pos = Gf.Vec3d(position)
+        vel = Gf.Vec3d(velocity)
+        # geometry we're already inside (big ground volumes, the takeoff ramp's box) can't tell us anything
+        oob_ranges = [r for r in self.out_of_bounds_ranges if not r.Contains(pos)]
+        if not oob_ranges:
+            return False
+        collider_ranges = [r for r in self.collider_ranges if not r.Contains(pos)]
+
+        step_dist = self.margin * 0.5
+        t = 0.0
+        while t < PREDICTION_MAX_TIME:
+            cur_vel = vel + self.gravity * t
+            dt = min(PREDICTION_MAX_STEP, max(PREDICTION_MIN_STEP, step_dist / max(cur_vel.GetLength(), 1e-6)))
+            t += dt
+            cur_pos = pos + vel * t + self.gravity * (0.5 * t * t)
+
+            if self.ramp_range.Contains(cur_pos):
+                return False
+            # the road or the takeoff ramp is in the way, the simulation knows what happens next
+            for collider_range in collider_ranges:
+                if collider_range.Contains(cur_pos):
+                    return False
+            for oob_range in oob_ranges:
+                if oob_range.Contains(cur_pos):
+                    return True
+
+        return False
+
+    def predict_vehicle_miss(self) -> bool:
+        world_mat = UsdGeom.Xformable(self.vehicle_prim).ComputeLocalToWorldTransform(Usd.TimeCode.Default())
+        velocity = self.vehicle_prim.GetAttribute(UsdPhysics.Tokens.physicsVelocity).Get()
+        if velocity is None:
+            return False
+        return self.predict_miss(world_mat.ExtractTranslation(), velocity)
@@ -0,0 +1,394 @@
+import time
+import omni.kit.app
+import omni.timeline
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdPhysics, PhysxSchema, PhysicsSchemaTools
+
+from omni.docs.vehicle.helper import timed
+from .run_test_rounds import JumpTestRound, RoundVehicle, RoundResult, ENGINE_TORQUE_ATTR_NAME, delay_after_round
+from .vehicle_state import VehicleState
+
+__all__ = ['MultiVehicleRound', 'LAYOUT_SHARED_COURSE', 'LAYOUT_TILES']
+
+# every lane drives the authored course, the vehicles filtered from each other
+LAYOUT_SHARED_COURSE = "shared_course"
+# every lane gets its own copy of the course, side by side
+LAYOUT_TILES = "tiles"
+
+# the clones, in a session sublayer that lasts for the test
+LANES_LAYER_TAG = "jump_test_lanes"
+LANES_ROOT_PATH = "/VehicleLanes"
+# tiles are this much wider than the course, when no tile_offset is given
+TILE_SPACING = 1.5
+
+
+class VehicleLane(RoundVehicle):
+    # one vehicle of a MultiVehicleRound: lane 0 is the authored vehicle, the others are clones
+    def __init__(self, index, prefixes, offset):
+        super().__init__(offset)
+        self.index = index
+        # (authored root path, lane root path) for everything cloned into this lane
+        self.prefixes = prefixes
+        self.result = None
+        self.params = {}
+
+    # authored path to the same prim or property in this lane, paths not cloned are shared
+    def map_path(self, path):
+        path = Sdf.Path(str(path))
+        for source, target in self.prefixes:
+            if path.HasPrefix(source):
+                return path.ReplacePrefix(source, target)
+        return path
+
+    def start_round(self, result, params):
+        super().start_round()
+        self.result = result
+        self.params = params
+
+
+# Tests several torques in one simulation: the vehicle is cloned into lanes, each lane gets the
+# next torque of the sweep, and a round (a batch of lanes) lasts until every lane's round is over.
+#
+#   test_round = MultiVehicleRound(sim_data, ui_data, num_vehicles=8)
+#   test_round.reset_test(sim_data)
+#   test_round.start_test()
+#
+# Layouts:
+# - LAYOUT_SHARED_COURSE: every clone starts where the vehicle is, the vehicles are filtered
+#   from each other (FilteredPairsAPI) so they drive through one another
+# - LAYOUT_TILES: course_prim_paths are cloned with the vehicle, a lane every tile_offset
+#   (stage units, default: next to each other across the course)
+# Clones join the collision groups the authored prims are in, so wheel queries ignore
+# every chassis the way they ignore the authored one.
+#
+# Every lane goes through the end of round checks of JumpTestRound (step_vehicle, and
+# vehicle_contacts for its part of each contact report). Burnouts and restored engine values
+# go to every lane, torques and sim_round_params to their own lane, so swept attributes have
+# to be on a cloned prim. Headless only, torque_search, round_cache and telemetry aren't used.
+class MultiVehicleRound(JumpTestRound):
+
+    def __init__(self, sim_data, ui_data, num_vehicles, layout=LAYOUT_SHARED_COURSE, tile_offset=None,
+                 course_prim_paths=None):
+        super().__init__(sim_data, ui_data, headless=True)
+        if layout not in (LAYOUT_SHARED_COURSE, LAYOUT_TILES):
+            raise ValueError(f"MultiVehicleRound: unknown layout {layout}")
+        if layout == LAYOUT_TILES and not course_prim_paths:
+            raise ValueError("MultiVehicleRound: tiles need the course_prim_paths to clone")
+        self.num_vehicles = max(1, int(num_vehicles))
+        self.layout = layout
+        self.tile_offset = None if tile_offset is None else Gf.Vec3d(*tile_offset)
+        self.course_prim_paths = list(course_prim_paths or [])
+        self.lanes = []
+        self._active_lanes = []
+        self._lanes_layer = None
+        self._lane_prims = {}
+
+    def reset_test(self, sim_data):
+        if sim_data.torque_search is not None:
+            raise ValueError("MultiVehicleRound: an adaptive torque search runs one round at a time")
+        super().reset_test(sim_data)
+        if self.telemetry is not None:
+            print("MultiVehicleRound: telemetry isn't recorded for concurrent rounds")
+            self.telemetry.close()
+            self.telemetry = None
+        if sim_data.round_cache is not None:
+            print("MultiVehicleRound: the round cache isn't used for concurrent rounds")
+        self.build_lanes()
+        self.check_round_params()
+
+    def finish_test(self):
+        omni.timeline.get_timeline_interface().stop()
+        self.detach_lanes_layer()
+        super().finish_test()
+
+    ############################### Lanes ################################
+
+    def build_lanes(self):
+        self.detach_lanes_layer()
+        roots = [Sdf.Path(self.sim_data.vehicle_prim_path)]
+        offset = Gf.Vec3d(0.0)
+        if self.layout == LAYOUT_TILES:
+            roots += [Sdf.Path(path) for path in self.course_prim_paths]
+            offset = self.tile_offset if self.tile_offset is not None else self.default_tile_offset(roots)
+
+        stage = self.sim_data.test_stage
+        self._lanes_layer = Sdf.Layer.CreateAnonymous(LANES_LAYER_TAG)
+        session_layer = stage.GetSessionLayer()
+        # under the round layer: round edits win over the clones
+        round_layer_idx = list(session_layer.subLayerPaths).index(self._round_layer.identifier)
+        session_layer.subLayerPaths.insert(round_layer_idx + 1, self._lanes_layer.identifier)
+
+        xform_cache = UsdGeom.XformCache()
+        self.lanes = [VehicleLane(0, [], Gf.Vec3d(0.0))]
+        with Usd.EditContext(stage, self._lanes_layer):
+            UsdGeom.Scope.Define(stage, LANES_ROOT_PATH)
+            for lane_idx in range(1, self.num_vehicles):
+                lane_path = Sdf.Path(LANES_ROOT_PATH).AppendChild(f"lane_{lane_idx}")
+                lane_offset = offset * lane_idx
+                UsdGeom.Xform.Define(stage, lane_path).AddTranslateOp().Set(lane_offset)
+                prefixes = []
+                for root_idx, root in enumerate(roots):
+                    # same world transform as the authored root, plus the lane offset
+                    holder = UsdGeom.Xform.Define(stage, lane_path.AppendChild(f"root_{root_idx}"))
+                    holder.AddTransformOp().Set(xform_cache.GetParentToWorldTransform(stage.GetPrimAtPath(root)))
+                    clone_path = holder.GetPath().AppendChild(root.name)
+                    stage.DefinePrim(clone_path).GetReferences().AddInternalReference(root)
+                    prefixes.append((root, clone_path))
+                self.lanes.append(VehicleLane(lane_idx, prefixes, lane_offset))
+
+            for lane in self.lanes:
+                self.resolve_lane(lane)
+            self.add_lanes_to_collision_groups()
+            if self.layout == LAYOUT_SHARED_COURSE:
+                self.filter_lanes()
+
+        # lane 0 is the authored vehicle
+        self.vehicle = self.lanes[0]
+        self.index_vehicles(self.lanes)
+        self._lane_prims = {}
+        self._active_lanes = []
+
+    def detach_lanes_layer(self):
+        if self._lanes_layer is None:
+            return
+        session_layer = self.sim_data.test_stage.GetSessionLayer()
+        if self._lanes_layer.identifier in session_layer.subLayerPaths:
+            session_layer.subLayerPaths.remove(self._lanes_layer.identifier)
+        self._lanes_layer = None
+        self.lanes = []
+        self._active_lanes = []
+        self._lane_prims = {}
+
+    # lanes side by side across the course, along the narrower horizontal axis
+    def default_tile_offset(self, roots):
+        stage = self.sim_data.test_stage
+        bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_, UsdGeom.Tokens.render])
+        course_range = Gf.Range3d()
+        for root in roots:
+            course_range.UnionWith(bbox_cache.ComputeWorldBound(stage.GetPrimAtPath(root)).ComputeAlignedRange())
+        if course_range.IsEmpty():
+            raise ValueError("MultiVehicleRound: the course has no bounds, pass a tile_offset")
+        size = course_range.GetSize()
+        axes = [0, 1] if UsdGeom.GetStageUpAxis(stage) == UsdGeom.Tokens.z else [0, 2]
+        axis = min(axes, key=lambda a: size[a])
+        offset = Gf.Vec3d(0.0)
+        offset[axis] = size[axis] * TILE_SPACING
+        return offset
+
+    def resolve_lane(self, lane):
+        stage = self.sim_data.test_stage
+        to_id = lambda path: PhysicsSchemaTools.sdfPathToInt(lane.map_path(path))
+        lane.vehicle_path = lane.map_path(self.sim_data.vehicle_prim_path)
+        lane.vehicle_prim = stage.GetPrimAtPath(lane.vehicle_path)
+        lane.collision_path = lane.map_path(self.sim_data.vehicle_collision_prim_path)
+        lane.goal_path = lane.map_path(self.sim_data.end_goal_prim_path)
+        lane.vehicle_id = to_id(self.sim_data.vehicle_prim_path)
+        lane.goal_id = to_id(self.sim_data.end_goal_prim_path)
+        lane.ramp_id = to_id(self.sim_data.landing_ramp_prim_path)
+        lane.roof_id = to_id(self.sim_data.vehicle_roof_prim_path)
+        lane.state = VehicleState(lane.vehicle_prim,
+                                  [str(lane.map_path(self.sim_data.vehicle_prim_path + wheel)) for wheel in self.sim_data.wheel_list],
+                                  self._physxInterface,
+                                  pose_from_physx=True)
+
+    def add_lanes_to_collision_groups(self):
+        for prim in self.sim_data.test_stage.Traverse():
+            if not prim.IsA(UsdPhysics.CollisionGroup):
+                continue
+            includes = UsdPhysics.CollisionGroup(prim).GetCollidersCollectionAPI().GetIncludesRel()
+            targets = includes.GetTargets()
+            for lane in self.lanes[1:]:
+                for target in targets:
+                    lane_target = lane.map_path(target)
+                    if lane_target != target:
+                        includes.AddTarget(lane_target)
+
+    def filter_lanes(self):
+        for lane in self.lanes:
+            filtered_pairs = UsdPhysics.FilteredPairsAPI.Apply(lane.vehicle_prim).CreateFilteredPairsRel()
+            for other in self.lanes:
+                if other is not lane:
+                    filtered_pairs.AddTarget(other.vehicle_path)
+
+    # a swept attribute shared by the lanes can only have one value per batch
+    def check_round_params(self):
+        if len(self.lanes) < 2 or not self.sim_data.sim_round_params:
+            return
+        for attr_path in set().union(*self.sim_data.sim_round_params):
+            if self.lanes[1].map_path(attr_path) != Sdf.Path(attr_path):
+                continue
+            values = {repr(params.get(attr_path)) for params in self.sim_data.sim_round_params}
+            if len(values) > 1:
+                raise ValueError(f"MultiVehicleRound: {attr_path} isn't on the vehicle, it can't differ per lane")
+
+    # the same prim in every lane of the batch (shared prims once)
+    def lane_prims(self, prim):
+        path = prim.GetPath()
+        lane_prims = self._lane_prims.get(path)
+        if lane_prims is None:
+            lane_prims = []
+            lane_paths = set()
+            for lane in self.lanes:
+                lane_path = lane.map_path(path)
+                if lane_path not in lane_paths:
+                    lane_paths.add(lane_path)
+                    lane_prims.append((lane, self.sim_data.test_stage.GetPrimAtPath(lane_path)))
+            self._lane_prims[path] = lane_prims
+        return lane_prims
+
+    ############################ Round Values ############################
+
+    # burnouts, brakes, throttle and restored engine values go to every lane in the batch
+    def set_round_value(self, prim, attr_name, value):
+        for lane, lane_prim in self.lane_prims(prim):
+            if lane.result is not None:
+                self.attributes.set(lane_prim, attr_name, value)
+
+    # the lane's own vehicle only
+    def set_vehicle_value(self, vehicle, attr_name, value):
+        self.attributes.set(vehicle.vehicle_prim, attr_name, value)
+
+    def apply_round_params(self):
+        for lane in self._active_lanes:
+            for attr_path, value in lane.params.items():
+                self.attributes.set_at_path(lane.map_path(attr_path), value)
+
+    ############################### Rounds ###############################
+
+    def start_next_round(self):
+        if self.is_test_done():
+            self.finish_test()
+            return
+
+        self._round_layer.Clear()
+        self.attributes.reset()
+
+        # the next torques of the sweep, a lane each
+        batch_steps = []
+        while len(batch_steps) < len(self.lanes) and not self.is_test_done():
+            self._cur_test_step += 1
+            batch_steps.append(self._cur_test_step)
+        self._active_lanes = self.lanes[:len(batch_steps)]
+        for lane in self.lanes[len(batch_steps):]:
+            lane.result = None
+            lane.round_over = True
+
+        stage = self.sim_data.test_stage
+        self._trigger_states = {}
+        with Usd.EditContext(stage, self._round_layer):
+            for lane in self._active_lanes:
+                if lane.goal_path not in self._trigger_states:
+                    goal_prim = stage.GetPrimAtPath(lane.goal_path)
+                    UsdPhysics.CollisionAPI.Apply(goal_prim)
+                    PhysxSchema.PhysxTriggerAPI.Apply(goal_prim)
+                    self._trigger_states[lane.goal_path] = PhysxSchema.PhysxTriggerStateAPI.Apply(goal_prim)
+                contactReportAPI = PhysxSchema.PhysxContactReportAPI.Apply(lane.vehicle_prim)
+                contactReportAPI.CreateThresholdAttr().Set(1000)
+
+        for lane, step in zip(self._active_lanes, batch_steps):
+            params = {}
+            if self.sim_data.sim_round_params:
+                params = self.sim_data.sim_round_params[step - 1]
+            result = RoundResult(step, self.torque_for_step(step))
+            result.params = dict(params)
+            lane.start_round(result, params)
+            self.set_vehicle_value(lane, ENGINE_TORQUE_ATTR_NAME, round(result.torque, 0))
+
+        self.start_countdown()
+        # waiting to start, lanes without a torque this batch stay put
+        self.set_throttle(1)
+        self.set_brake0(.01)
+        self.set_brake1(0)
+        for lane in self.lanes[len(batch_steps):]:
+            self.set_vehicle_value(lane, "physxVehicleController:accelerator", 0.0)
+            self.set_vehicle_value(lane, "physxVehicleController:brake0", 1.0)
+
+        self._round_over = False
+        self.report_round_event("")
+        self.sim_data.round_step_model.as_int = batch_steps[-1]
+        self.sim_data.round_torque_model.as_float = self._active_lanes[0].result.torque
+        self._round_start_wall_time = time.perf_counter()
+
+        # the round's inputs are on the stage before physics starts
+        self.attributes.flush()
+        self.play_round()
+
+    @timed("MultiVehicleRound.physics_step")
+    def physics_step(self, dt):
+        self._sim_time += dt
+        for lane in self._active_lanes:
+            lane.state.sample(self._sim_time)
+        self.step_round(dt)
+        self.attributes.flush()
+
+    def step_round(self, dt):
+        if self._wait_for_go_time_remaining > 0:
+            self.pre_race_burnouts(dt)
+            if self._wait_for_go_time_remaining <= 0:
+                self.start_race()
+
+        if self._skip_first_step:
+            self._skip_first_step = False
+            return
+
+        if self._round_over:
+            return
+
+        triggered = set()
+        for trigger_state in self._trigger_states.values():
+            triggered.update(trigger_state.GetTriggeredCollisionsRel().GetTargets())
+
+        for lane in self._active_lanes:
+            if not lane.round_over:
+                self.step_vehicle(lane, triggered)
+
+    ############################ End of Round ############################
+
+    # one lane's round is over, the batch when it's the last one
+    def end_vehicle_round(self, lane, hit_goal, fail_str=""):
+        if lane.round_over:
+            return
+        lane.round_over = True
+        self.set_vehicle_value(lane, "physxVehicleController:accelerator", 0.0)
+
+        success = False
+        if hit_goal:
+            if lane.wheels_touched_ramp:
+                out_str = "Success!"
+                success = True
+            else:
+                out_str = "FAILED: missed landing ramp"
+        else:
+            out_str = "FAILED: " + fail_str
+
+        result = lane.result
+        result.success = success
+        result.outcome = out_str
+        result.largest_body_impulse = lane.largest_body_impulse
+        result.largest_susp_force = lane.largest_susp_force
+        result.sim_time = self._sim_time - self._round_start_sim_time
+        # the lanes share the wall time
+        result.wall_time = (time.perf_counter() - self._round_start_wall_time) / len(self._active_lanes)
+        self.report_round_event(f"torque {result.torque:.0f}: {out_str}", success)
+
+        if all(other.round_over for other in self._active_lanes):
+            self.end_batch()
+
+    def end_batch(self):
+        self._round_over = True
+        # in round order, the best round is the one a sequential test picks
+        for lane in self._active_lanes:
+            result = lane.result
+            self.add_round_result(result)
+            if self.sim_data.results_store is not None:
+                self.sim_data.results_store.append(result, self._sweep_id)
+            self.update_best_round(result)
+        last = self._active_lanes[-1].result
+        self.sim_data.round_largest_body_impulse_model.as_float = last.largest_body_impulse
+        self.sim_data.round_largest_susp_force_model.as_float = last.largest_susp_force
+
+        # start countdown to next round
+        if self._end_of_round_update_sub_id is None:
+            update_stream = omni.kit.app.get_app().get_update_event_stream()
+            self._end_of_round_update_sub_id = update_stream.create_subscription_to_pop(self.end_of_round_update, name="EndRound")
+            self._sim_running = True
+            self._update_wait_remaining = 0.0 if self.sim_data.fast_forward else delay_after_round
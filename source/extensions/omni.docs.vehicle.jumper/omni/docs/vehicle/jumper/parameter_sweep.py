@@ -0,0 +1,157 @@
+import math
+import random
+import omni.usd
+from pxr import Sdf
+
+from .headless_runner import HeadlessSweepRunner
+from .extension import (
+    MY_STAGE_NAME,
+    VEHICLE_PRIM_PATH,
+    WHEEL_FRICTION_PRIM_PATH,
+    ENGINE_TORQUE_ATTR_NAME,
+    ENGINE_MAX_ROT_SPEED_ATTR_NAME
+)
+
+__all__ = ['SweepParameter', 'ParameterSweep', 'latin_hypercube', 'halton', 'LATIN_HYPERCUBE', 'HALTON',
+           'TORQUE_ATTR_PATH', 'MAX_ROT_SPEED_ATTR_PATH', 'DAMPING_FULL_THROTTLE_ATTR_PATH', 'FRICTION_ATTR_PATH',
+           'REAR_LEFT_STIFFNESS_ATTR_PATH', 'REAR_RIGHT_STIFFNESS_ATTR_PATH']
+
+LATIN_HYPERCUBE = "latin_hypercube"
+HALTON = "halton"
+
+# property paths of the usual tuning attributes
+TORQUE_ATTR_PATH = VEHICLE_PRIM_PATH + "." + ENGINE_TORQUE_ATTR_NAME
+MAX_ROT_SPEED_ATTR_PATH = VEHICLE_PRIM_PATH + "." + ENGINE_MAX_ROT_SPEED_ATTR_NAME
+DAMPING_FULL_THROTTLE_ATTR_PATH = VEHICLE_PRIM_PATH + ".physxVehicleEngine:dampingRateFullThrottle"
+FRICTION_ATTR_PATH = WHEEL_FRICTION_PRIM_PATH + ".defaultFrictionValue"
+REAR_LEFT_STIFFNESS_ATTR_PATH = VEHICLE_PRIM_PATH + "/LeftWheel2References.physxVehicleTire:longitudinalStiffness"
+REAR_RIGHT_STIFFNESS_ATTR_PATH = VEHICLE_PRIM_PATH + "/RightWheel2References.physxVehicleTire:longitudinalStiffness"
+
+HALTON_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53]
+# first Halton points are strongly correlated across dimensions
+HALTON_SKIP = 20
+
+
+# one swept stage attribute, e.g. SweepParameter(FRICTION_ATTR_PATH, 0.6, 1.2)
+# log_scale samples evenly in log space (stiffness, damping ...)
+# linked_paths get the same value (e.g. both rear tires)
+class SweepParameter():
+
+    def __init__(self, attr_path, low, high, log_scale=False, linked_paths=None):
+        self.attr_path = str(attr_path)
+        self.low = low
+        self.high = high
+        self.log_scale = log_scale
+        self.linked_paths = [str(p) for p in linked_paths] if linked_paths else []
+
+    def value_at(self, unit):
+        # unit in [0, 1) -> value in range
+        if self.log_scale:
+            log_low = math.log(self.low)
+            return math.exp(log_low + unit * (math.log(self.high) - log_low))
+        return self.low + unit * (self.high - self.low)
+
+
+# num_samples points in the unit cube, one point in every 1/num_samples slice of each dimension
+def latin_hypercube(num_samples, num_dims, rng=None):
+    rng = rng or random.Random()
+    columns = []
+    for _ in range(num_dims):
+        column = [(slot + rng.random()) / num_samples for slot in range(num_samples)]
+        rng.shuffle(column)
+        columns.append(column)
+    return [[column[idx] for column in columns] for idx in range(num_samples)]
+
+
+def radical_inverse(index, base):
+    inv_base = 1.0 / base
+    factor = inv_base
+    result = 0.0
+    while index > 0:
+        index, digit = divmod(index, base)
+        result += digit * factor
+        factor *= inv_base
+    return result
+
+
+# low discrepancy sequence, later points fill the gaps of earlier ones so designs can be extended
+def halton(num_samples, num_dims, skip=HALTON_SKIP):
+    if num_dims > len(HALTON_PRIMES):
+        raise ValueError(f"halton: at most {len(HALTON_PRIMES)} dimensions")
+    return [[radical_inverse(idx + skip, HALTON_PRIMES[dim]) for dim in range(num_dims)]
+            for idx in range(num_samples)]
+
+
+# Space filling sweep over any set of stage attributes, each round a sample of the design.
+#
+#   sweep = ParameterSweep([ SweepParameter(TORQUE_ATTR_PATH, 4000, 8000),
+#                            SweepParameter(FRICTION_ATTR_PATH, 0.6, 1.2),
+#                            SweepParameter(MAX_ROT_SPEED_ATTR_PATH, 600, 1000) ], num_samples=24)
+#   results = await sweep.run_async()
+#
+# Rounds use the stage's peakTorque unless the design sweeps it.
+class ParameterSweep():
+
+    def __init__(self, parameters, num_samples, method=LATIN_HYPERCUBE, seed=None,
+                 stage=None, stage_path=MY_STAGE_NAME, fast_forward=True, results_store=None):
+        self.parameters = parameters
+        self.num_samples = num_samples
+        self.method = method
+        self.seed = seed
+        self.stage = stage
+        self.stage_path = stage_path
+        self.fast_forward = fast_forward
+        self.results_store = results_store
+        self.results = []
+        self.runner = None
+
+    def make_design(self):
+        num_dims = len(self.parameters)
+        if self.method == HALTON:
+            units = halton(self.num_samples, num_dims)
+        elif self.method == LATIN_HYPERCUBE:
+            units = latin_hypercube(self.num_samples, num_dims, random.Random(self.seed))
+        else:
+            raise ValueError(f"ParameterSweep: unknown sampling method {self.method}")
+
+        design = []
+        for sample in units:
+            round_params = {}
+            for param, unit in zip(self.parameters, sample):
+                value = param.value_at(unit)
+                for attr_path in [param.attr_path] + param.linked_paths:
+                    round_params[attr_path] = value
+            design.append(round_params)
+        return design
+
+    def make_runner(self, stage):
+        design = self.make_design()
+        # torque goes through the round's own torque handling
+        torque_attr = stage.GetAttributeAtPath(Sdf.Path(TORQUE_ATTR_PATH))
+        stage_torque = torque_attr.Get() if torque_attr else 0.0
+        torques = [round_params.pop(TORQUE_ATTR_PATH, stage_torque) for round_params in design]
+
+        for attr_path in design[0].keys() if design else []:
+            if not stage.GetAttributeAtPath(Sdf.Path(attr_path)):
+                print(f"ParameterSweep: no attribute {attr_path} on stage, it won't be swept")
+
+        return HeadlessSweepRunner( sim_torque_list=torques,
+                                    sim_round_params=design,
+                                    stage=stage,
+                                    fast_forward=self.fast_forward,
+                                    results_store=self.results_store)
+
+    async def run_async(self):
+        stage = self.stage
+        if stage is None:
+            usd_context = omni.usd.get_context()
+            usd_context.open_stage(self.stage_path)
+            stage = usd_context.get_stage()
+
+        self.runner = self.make_runner(stage)
+        self.results = await self.runner.run_async()
+        return self.results
+
+    @property
+    def best_result(self):
+        return self.runner.best_result if self.runner else None
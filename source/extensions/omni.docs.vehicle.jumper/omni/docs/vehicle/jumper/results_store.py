@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+import numpy as np
+import carb
+import carb.tokens
+
+from .run_test_rounds import RoundResult
+
+__all__ = ['ResultsStore', 'default_results_path', 'stage_identity', 'new_sweep_id']
+
+RESULTS_FILE_NAME = "jump_results.db"
+
+# rounds written per transaction, the writer also flushes whatever is queued when it goes idle
+WRITE_BATCH_SIZE = 256
+WRITE_IDLE_PERIOD = 0.5
+
+ROUND_COLUMNS = [
+    ("sweep_id", "TEXT"),
+    ("stage", "TEXT"),
+    ("round_idx", "INTEGER"),
+    ("torque", "REAL"),
+    ("success", "INTEGER"),
+    ("outcome", "TEXT"),
+    ("largest_body_impulse", "REAL"),
+    ("largest_susp_force", "REAL"),
+    ("sim_time", "REAL"),
+    ("wall_time", "REAL"),
+    ("recorded_at", "REAL"),
+    # other swept stage attributes, json { property path : value }
+    ("params", "TEXT"),
+]
+COLUMN_NAMES = [name for name, _ in ROUND_COLUMNS]
+TEXT_COLUMNS = {name for name, col_type in ROUND_COLUMNS if col_type == "TEXT"}
+
+
+def default_results_path():
+    data_folder = carb.tokens.get_tokens_interface().resolve("${data}")
+    return os.path.join(data_folder, "omni.docs.vehicle.jumper", RESULTS_FILE_NAME)
+
+
+# the stage a round ran on, its root layer file (or identifier for in memory stages)
+def stage_identity(stage):
+    if stage is None:
+        return ""
+    root_layer = stage.GetRootLayer()
+    return root_layer.realPath or root_layer.identifier
+
+
+def new_sweep_id():
+    return time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+
+
+# Every round of every sweep, in a SQLite file.
+#
+#   store = ResultsStore()
+#   sweep_id = store.start_sweep(stage)
+#   store.append(result, sweep_id)    # any thread, returns right away
+#   cols = store.query(["torque", "largest_susp_force"], param_paths=[FRICTION_ATTR_PATH], success=True)
+#   plot(cols["torque"], cols[FRICTION_ATTR_PATH])
+#
+# Rows are written in batches by a writer thread, query() waits for the queued rows first.
+# After close() the store can still be read, appended rows are dropped.
+class ResultsStore():
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_results_path()
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        conn = self.connect()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{name} {col_type}" for name, col_type in ROUND_COLUMNS)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS rounds (id INTEGER PRIMARY KEY, {columns})")
+            conn.execute("CREATE INDEX IF NOT EXISTS rounds_sweep ON rounds (sweep_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS rounds_stage ON rounds (stage)")
+        conn.close()
+
+        self._sweep_stages = {}
+        self._closed = False
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self.write_loop, name="ResultsStore writer", daemon=True)
+        self._writer.start()
+
+    def connect(self):
+        # wait on other processes (sweep workers, other Kit sessions) writing the same file
+        return sqlite3.connect(self.db_path, timeout=30.0)
+
+    ############################ Writing ############################
+
+    # stage is a Usd.Stage or the stage path, the sweep id tags every round appended for it
+    def start_sweep(self, stage):
+        sweep_id = new_sweep_id()
+        self._sweep_stages[sweep_id] = stage if isinstance(stage, str) else stage_identity(stage)
+        return sweep_id
+
+    def append(self, result, sweep_id):
+        if self._closed:
+            carb.log_warn(f"ResultsStore: closed, round {result.round_idx} of {sweep_id} not recorded")
+            return
+        row = ( sweep_id,
+                self._sweep_stages.get(sweep_id, ""),
+                result.round_idx,
+                float(result.torque),
+                int(result.success),
+                result.outcome,
+                float(result.largest_body_impulse),
+                float(result.largest_susp_force),
+                float(result.sim_time),
+                float(result.wall_time),
+                time.time(),
+                json.dumps(result.params) )
+        self._queue.put(row)
+
+    def append_all(self, results, sweep_id):
+        for result in results:
+            self.append(result, sweep_id)
+
+    def write_loop(self):
+        conn = self.connect()
+        closing = False
+        while not closing:
+            try:
+                rows = [self._queue.get(timeout=WRITE_IDLE_PERIOD)]
+            except queue.Empty:
+                continue
+            while len(rows) < WRITE_BATCH_SIZE:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # None is the close marker, an Event is a flush() waiting for the rows before it
+            closing = None in rows
+            flushes = [row for row in rows if isinstance(row, threading.Event)]
+            rows_to_write = [row for row in rows if isinstance(row, tuple)]
+            if rows_to_write:
+                try:
+                    with conn:
+                        placeholders = ", ".join("?" * len(COLUMN_NAMES))
+                        conn.executemany(f"INSERT INTO rounds ({', '.join(COLUMN_NAMES)}) VALUES ({placeholders})",
+                                         rows_to_write)
+                except sqlite3.Error as e:
+                    carb.log_error(f"ResultsStore: couldn't write {len(rows_to_write)} rounds to {self.db_path}: {e}")
+            for flushed in flushes:
+                flushed.set()
+        conn.close()
+
+    # blocks until every appended round is in the file, or the writer is gone
+    def flush(self):
+        if not self._writer.is_alive():
+            return
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        while not flushed.wait(WRITE_IDLE_PERIOD):
+            if not self._writer.is_alive():
+                return
+
+    def close(self):
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    ############################ Reading ############################
+
+    def select_rows(self, columns, stage=None, sweep_id=None, success=None):
+        where = []
+        args = []
+        if stage is not None:
+            where.append("stage = ?")
+            args.append(stage)
+        if sweep_id is not None:
+            where.append("sweep_id = ?")
+            args.append(sweep_id)
+        if success is not None:
+            where.append("success = ?")
+            args.append(int(success))
+
+        sql = f"SELECT {', '.join(columns)} FROM rounds"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+
+        self.flush()
+        conn = self.connect()
+        try:
+            return conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+    # { column : array } for the matching rounds, in the order they were recorded
+    # param_paths adds a column per swept property path, NaN for rounds that didn't sweep it
+    def query(self, columns=None, param_paths=None, stage=None, sweep_id=None, success=None):
+        columns = list(columns) if columns else [name for name in COLUMN_NAMES if name != "params"]
+        for name in columns:
+            if name not in COLUMN_NAMES:
+                raise ValueError(f"ResultsStore: unknown column {name}")
+        param_paths = list(param_paths) if param_paths else []
+
+        select_columns = columns + (["params"] if param_paths and "params" not in columns else [])
+        rows = self.select_rows(select_columns, stage, sweep_id, success)
+
+        arrays = {}
+        for col_idx, name in enumerate(columns):
+            values = [row[col_idx] for row in rows]
+            arrays[name] = np.array(values, dtype=object if name in TEXT_COLUMNS else np.float64)
+
+        if param_paths:
+            params_idx = select_columns.index("params")
+            params = [json.loads(row[params_idx] or "{}") for row in rows]
+            for attr_path in param_paths:
+                arrays[attr_path] = np.array([p.get(attr_path, np.nan) for p in params], dtype=np.float64)
+        return arrays
+
+    def load_results(self, stage=None, sweep_id=None, success=None):
+        rows = self.select_rows(COLUMN_NAMES, stage, sweep_id, success)
+        results = []
+        for row in rows:
+            data = dict(zip(COLUMN_NAMES, row))
+            result = RoundResult(data["round_idx"], data["torque"])
+            result.success = bool(data["success"])
+            result.outcome = data["outcome"]
+            result.largest_body_impulse = data["largest_body_impulse"]
+            result.largest_susp_force = data["largest_susp_force"]
+            result.sim_time = data["sim_time"]
+            result.wall_time = data["wall_time"]
+            result.params = json.loads(data["params"] or "{}")
+            results.append(result)
+        return results
+
+    def sweep_ids(self, stage=None):
+        rows = self.select_rows(["sweep_id"], stage=stage)
+        return list(dict.fromkeys(row[0] for row in rows))
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import carb
+import carb.settings
+import carb.tokens
+import omni.kit.commands
+from pxr import Usd, UsdGeom
+
+__all__ = ['RoundCache', 'stage_digest', 'physics_prim_data', 'round_key', 'default_cache_path', 'InvalidateRoundCacheCommand']
+
+CACHE_FILE_NAME = "round_cache.db"
+# bump when the round logic or the digest changes in a way that changes outcomes
+CACHE_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_AGE_DAYS = 30.0
+
+# settings trees that change how the simulation steps
+PHYSICS_SETTINGS_PATHS = ["/physics", "/persistent/physics"]
+
+# prims with these types or applied schemas are simulated
+PHYSICS_SCHEMA_PREFIXES = ("Physics", "Physx")
+# properties PhysX reads (relationships too: filtered pairs, collision groups, material bindings)
+PHYSICS_PROPERTY_PREFIXES = ("physics:", "physx", "material:binding:physics")
+
+# outcome fields kept per round
+CACHED_FIELDS = ["success", "outcome", "largest_body_impulse", "largest_susp_force", "sim_time"]
+
+
+def default_cache_path():
+    data_folder = carb.tokens.get_tokens_interface().resolve("${data}")
+    return os.path.join(data_folder, "omni.docs.vehicle.jumper", CACHE_FILE_NAME)
+
+
+# Digest of everything a round's outcome depends on besides its own torque and params:
+# - every simulated prim on the composed stage (physics type or applied schema): its path,
+#   schemas, world transform and physics properties, and all the geometry of colliders
+# - the physics settings trees
+# - extra, any other settings of the test (fast forward, time budget ...)
+# Presentation edits (camera, audio, mesh transform sync, lights) don't touch simulated prims,
+# so they don't change the digest, whatever layer they went to.
+def stage_digest(stage, extra=None):
+    digest = hashlib.sha256()
+    xform_cache = UsdGeom.XformCache()
+    for prim in stage.Traverse(Usd.TraverseInstanceProxies()):
+        prim_data = physics_prim_data(prim, xform_cache)
+        if prim_data is not None:
+            digest.update(prim_data.encode("utf-8"))
+
+    settings = carb.settings.get_settings()
+    physics_settings = {path: settings.get(path) for path in PHYSICS_SETTINGS_PATHS}
+    digest.update(json.dumps([CACHE_VERSION, physics_settings, extra], sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# what the simulation reads from a prim, as text, None if it isn't simulated
+def physics_prim_data(prim, xform_cache):
+    type_name = str(prim.GetTypeName())
+    schemas = [name for name in prim.GetAppliedSchemas() if name.startswith(PHYSICS_SCHEMA_PREFIXES)]
+    if not schemas and not type_name.startswith(PHYSICS_SCHEMA_PREFIXES):
+        return None
+
+    collider = "PhysicsCollisionAPI" in schemas
+    properties = []
+    for prop in prim.GetProperties():
+        name = prop.GetName()
+        if name.startswith(PHYSICS_PROPERTY_PREFIXES):
+            pass
+        elif not collider or name.startswith(("primvars:", "xformOp")):
+            # collider shape is all of its geometry, its placement the world transform below
+            continue
+        if isinstance(prop, Usd.Relationship):
+            value = [str(target) for target in prop.GetTargets()]
+        else:
+            value = prop.Get()
+        properties.append((name, str(value)))
+
+    world = xform_cache.GetLocalToWorldTransform(prim) if prim.IsA(UsdGeom.Xformable) else None
+    return json.dumps([str(prim.GetPath()), type_name, schemas, str(world), properties])
+
+
+# torque as written to the stage, params as { property path : value }
+def round_key(digest, torque, params):
+    key_data = [digest, round(torque, 0), sorted((str(path), value) for path, value in params.items())]
+    return hashlib.sha256(json.dumps(key_data, default=str).encode("utf-8")).hexdigest()
+
+
+# Outcomes of rounds already simulated, by round_key(), in a SQLite file.
+# JumpTestRound looks a round up before starting it and takes the cached outcome instead of
+# simulating it. Least recently used entries past max_entries, and entries not used for
+# max_age_days, are evicted. invalidate() (or the InvalidateRoundCache command) clears it.
+class RoundCache():
+
+    def __init__(self, db_path=None, max_entries=DEFAULT_MAX_ENTRIES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.db_path = db_path or default_cache_path()
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, timeout=30.0)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS rounds "
+                               "(key TEXT PRIMARY KEY, stage_digest TEXT, result TEXT, last_used REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS rounds_last_used ON rounds (last_used)")
+        self.evict()
+
+    def get(self, key):
+        row = self._conn.execute("SELECT result FROM rounds WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute("UPDATE rounds SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, digest, result):
+        data = {name: getattr(result, name) for name in CACHED_FIELDS}
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?)",
+                               (key, digest, json.dumps(data), time.time()))
+
+    def evict(self):
+        with self._conn:
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 24 * 3600
+                self._conn.execute("DELETE FROM rounds WHERE last_used < ?", (cutoff,))
+            if self.max_entries is not None:
+                self._conn.execute("DELETE FROM rounds WHERE key NOT IN "
+                                   "(SELECT key FROM rounds ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+
+    # drops every entry, or only the ones for one stage digest, returns how many went
+    def invalidate(self, digest=None):
+        with self._conn:
+            if digest is None:
+                cursor = self._conn.execute("DELETE FROM rounds")
+            else:
+                cursor = self._conn.execute("DELETE FROM rounds WHERE stage_digest = ?", (digest,))
+        print(f"RoundCache: dropped {cursor.rowcount} cached rounds")
+        return cursor.rowcount
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM rounds").fetchone()[0]
+
+    def close(self):
+        if self._conn is not None:
+            self.evict()
+            self._conn.close()
+            self._conn = None
+
+
+# omni.kit.commands.execute("InvalidateRoundCache") clears the default cache file,
+# db_path for another cache file
+class InvalidateRoundCacheCommand(omni.kit.commands.Command):
+
+    def __init__(self, db_path=None):
+        self._db_path = db_path
+
+    def do(self):
+        cache = RoundCache(self._db_path)
+        count = cache.invalidate()
+        cache.close()
+        return count
+
+    def undo(self):
+        carb.log_warn("InvalidateRoundCache can't be undone")
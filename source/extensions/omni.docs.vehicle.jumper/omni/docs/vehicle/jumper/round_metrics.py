@@ -0,0 +1,32 @@
+import os
+import carb.tokens
+from omni.docs.vehicle.helper import get_tick_metrics
+
+__all__ = ['round_throughput', 'write_test_metrics', 'default_metrics_dir']
+
+
+def default_metrics_dir():
+    data_folder = carb.tokens.get_tokens_interface().resolve("${data}")
+    return os.path.join(data_folder, "omni.docs.vehicle.jumper", "metrics")
+
+
+# rounds per hour of wall-clock test time, and simulated time per wall-clock second of the
+# simulated rounds (cached rounds take no sim time)
+def round_throughput(results, test_wall_time):
+    simulated = [r for r in results if not r.cached]
+    sim_time = sum(r.sim_time for r in simulated)
+    round_wall_time = sum(r.wall_time for r in simulated)
+    return { "jumper_rounds": len(results),
+             "jumper_cached_rounds": len(results) - len(simulated),
+             "jumper_test_wall_seconds": test_wall_time,
+             "jumper_rounds_per_hour": len(results) * 3600.0 / test_wall_time if test_wall_time > 0 else 0.0,
+             "jumper_sim_to_wall_ratio": sim_time / round_wall_time if round_wall_time > 0 else 0.0 }
+
+
+# <tag>_metrics.json and <tag>_metrics.prom in folder: subscriber timings and round throughput
+def write_test_metrics(folder, tag, results, test_wall_time):
+    throughput = round_throughput(results, test_wall_time)
+    metrics = get_tick_metrics()
+    base_path = os.path.join(folder, f"{tag}_metrics")
+    return ( metrics.write_json(base_path + ".json", throughput),
+             metrics.write_prometheus(base_path + ".prom", throughput) )
@@ -5,13 +5,28 @@ from omni.physx import get_physx_simulation_interface
 from omni.physx.scripts.physicsUtils import *
 import omni.usd
 from pxr import PhysicsSchemaTools, UsdPhysics, PhysxSchema
+from pxr import Sdf, Usd
 import omni.kit.app
+import carb.settings
+import time
+import os
+import math
+import numpy as np
+from operator import attrgetter
 
 from .jumper_cam import *
+from .landing_prediction import LandingPredictor
+from .round_cache import stage_digest, round_key
+from .telemetry import TelemetryRecorder
+from .vehicle_state import VehicleState
+from .attribute_registry import AttributeRegistry
+from omni.docs.vehicle.helper import get_write_queue, get_tick_metrics, timed
+from .round_metrics import write_test_metrics
 
 from omni.physx.bindings._physx import (
     VEHICLE_WHEEL_STATE_GROUND_MATERIAL,
-    VEHICLE_WHEEL_STATE_SUSPENSION_FORCE
+    VEHICLE_WHEEL_STATE_SUSPENSION_FORCE,
+    VEHICLE_WHEEL_STATE_IS_ON_GROUND
 )
 
 contact_sensitivity = 100.0
@@ -20,15 +35,197 @@ delay_after_round = 2.5
 STARTING_GUN_DELAY = 5.0
 STARTING_GUN_PRE_DELAY = 4.0
 
-__all__ = ['JumpTestRound']
+ENGINE_TORQUE_ATTR_NAME = "physxVehicleEngine:peakTorque"
+# engine damping while holding back between burnouts
+BURNOUT_HOLD_DAMPING_FULL_THROTTLE = 8496
+
+# every edit a round makes goes into this layer, under the session layer
+ROUND_LAYER_TAG = "jump_test_round"
+
+# fast forward: timeline steps a fixed frame per app update, as fast as the app can update
+FAST_FORWARD_FRAME_RATE = 60.0
+RATE_LIMIT_SETTING = "/app/runLoops/main/rateLimitEnabled"
+
+# stuck rounds (defaults for SimData), times are simulated seconds
+ROUND_TIME_BUDGET = 45.0
+STALL_SPEED = 0.5           # m/s, slower than this counts as stopped
+STALL_STOPPED_TIME = 3.0    # stopped this long after the start
+STALL_DISTANCE = 2.0        # m, must get this much further within STALL_PROGRESS_TIME
+STALL_PROGRESS_TIME = 8.0
+
+# end of round checks, per vehicle
+UPSIDE_DOWN_UP = -0.5               # the vehicle's up axis (y of its second row) below this is upside down
+THROTTLE_CUTOFF_HEIGHT = 3100.0     # stage z, the throttle is halved once the vehicle is higher
+
+# fewer contact points than this are cheaper in a plain loop than through numpy arrays
+BULK_CONTACTS_MIN = 16
+
+_get_impulse = attrgetter("impulse")
+_get_material1 = attrgetter("material1")
+
+__all__ = ['JumpTestRound', 'RoundVehicle', 'RoundResult', 'is_better_round', 'select_best_round', 'linear_sweep_torque']
+
+
+# torque for round 'step' (1 based) of an evenly spaced min..max sweep
+def linear_sweep_torque(step, torque_steps, min_torque, max_torque):
+    torque_range = max_torque - min_torque
+    if torque_steps == 1:
+        # special case: use midpoint of range (for testing original torque)
+        return min_torque + torque_range / 2.0
+    torque_inc = torque_range / float(torque_steps - 1)
+    return min_torque + (float(step - 1) * torque_inc)
+
+
+# (largest impulse magnitude, any point on material_id) of the contact points in the
+# (offset, count) ranges, each range is one slice of the contact data
+def summarize_contacts(contact_data, ranges, material_id):
+    contacts = []
+    for offset, count in ranges:
+        contacts += contact_data[offset:offset + count]
+
+    if len(contacts) < BULK_CONTACTS_MIN:
+        big_impulse_sq = 0.0
+        on_material = False
+        for contact in contacts:
+            impulse = contact.impulse
+            impulse_sq = impulse[0] * impulse[0] + impulse[1] * impulse[1] + impulse[2] * impulse[2]
+            if impulse_sq > big_impulse_sq:
+                big_impulse_sq = impulse_sq
+            if contact.material1 == material_id:
+                on_material = True
+        return math.sqrt(big_impulse_sq), on_material
+
+    # impulses are carb.Float3, converted to tuples for numpy
+    impulses = np.array([(i[0], i[1], i[2]) for i in map(_get_impulse, contacts)], dtype=np.float64)
+    materials = np.fromiter(map(_get_material1, contacts), dtype=np.uint64, count=len(contacts))
+    big_impulse = float(np.sqrt(np.einsum("ij,ij->i", impulses, impulses).max()))
+    return big_impulse, bool(np.any(materials == material_id))
+
+
+class RoundVehicle():
+    # one vehicle in a round: what the end of round checks read, and what they keep track of
+    def __init__(self, offset=(0.0, 0.0, 0.0)):
+        # where the vehicle's course is, relative to the authored one
+        self.offset = Gf.Vec3d(*offset)
+        self.vehicle_prim = None
+        self.state = None
+        # contact report ids of the vehicle, its roof, the goal and the landing ramp
+        self.vehicle_id = None
+        self.roof_id = None
+        self.goal_id = None
+        self.ramp_id = None
+        # the vehicle collider, as the goal trigger reports it
+        self.collision_path = None
+        self.round_over = True
+
+    def start_round(self):
+        self.round_over = False
+        self.reduced_throttle = False
+        # wheels, not body
+        self.wheels_touched_ramp = False
+        self.wheels_touched_dead_zone = False
+        # landing is predicted once per jump
+        self.jump_predicted = False
+        self.largest_body_impulse = 0.0
+        self.largest_susp_force = 0.0
+        self.stopped_since = None
+        self.progress_pos = None
+        self.progress_time = 0.0
+
+
+class VehicleContacts():
+    # what one contact report says about one vehicle
+    def __init__(self):
+        self.hit_roof = False
+        self.found_goal = False
+        self.hit_ramp = False
+        # (offset, count) of the contact points of every contact pair of the vehicle
+        self.ranges = []
+
+
+class RoundResult():
+    # outcome of a single test round, kept for every round (not just the best)
+    def __init__(self, round_idx, torque):
+        self.round_idx = round_idx
+        self.torque = torque
+        self.success = False
+        self.outcome = ""
+        self.largest_body_impulse = 0.0
+        self.largest_susp_force = 0.0
+        self.sim_time = 0.0
+        self.wall_time = 0.0
+        # other swept stage attributes, property path : value
+        self.params = {}
+        # taken from the RoundCache instead of simulated
+        self.cached = False
+        # per-tick .npz of the round when telemetry is recorded
+        self.telemetry_path = None
+
+    @property
+    def soft_landing(self):
+        return self.success and self.largest_body_impulse == 0
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return f"RoundResult(#{self.round_idx} torque={self.torque} {self.outcome})"
+
+    @staticmethod
+    def from_dict(data):
+        result = RoundResult(data['round_idx'], data['torque'])
+        result.__dict__.update(data)
+        return result
+
+
+# best round criteria in this order
+# best suspension force : soft landing, with least susp force
+# best body impulse : body hit something
+def is_better_round(result, best_result) -> bool:
+    if not result.success:
+        return False
+    if best_result is None:
+        return True
+    if result.soft_landing:
+        # take first soft landing or the best soft landing (we can have smaller suspension force from hard landings)
+        return not best_result.soft_landing or result.largest_susp_force < best_result.largest_susp_force
+    # use body impulse if others rounds aren't soft
+    if best_result.soft_landing:
+        return False
+    return result.largest_body_impulse < best_result.largest_body_impulse
+
+
+# same pick as a sequential test, so results are walked in round order
+def select_best_round(results):
+    best_result = None
+    for result in sorted(results, key=lambda r: r.round_idx):
+        if is_better_round(result, best_result):
+            best_result = result
+    return best_result
+
 
 class JumpTestRound:
 
-    def __init__(self, sim_data, ui_data):
+    def __init__(self, sim_data, ui_data, headless=False):
         self.sim_data = sim_data
         self.ui_data = ui_data
+        # headless: no camera, audio, headlights or sounds, only the round logic
+        self.headless = headless
         self._end_of_round_update_sub_id = None
         self._physxInterface = omni.physx.get_physx_interface()
+        self.vehicle_camera = None
+        self.landing_predictor = None
+        self.telemetry = None
+        self.vehicle = None
+        self.vehicle_state = None
+        self.round_results = []
+        self._cur_round_result = None
+        self._saved_timeline_state = None
+        self._round_params = {}
+        self._round_layer = None
+        self.attributes = None
+        self._stage_digest = None
+        self._round_cache_key = None
 
         # sim started per round
         self._sim_running = False
@@ -47,7 +244,8 @@ class JumpTestRound:
     def kill_subscriptions(self):
         sub_list = ['_end_of_round_update_sub_id',
                     '_contact_report_sub',
-                    '_physics_tick_update_sub_id',
+                    '_physics_step_sub',
+                    '_presentation_update_sub_id',
                     '_timeline_subscription' ]
         
         for sub_key in sub_list:
@@ -58,37 +256,77 @@ class JumpTestRound:
         
     def reset_test(self, sim_data):
         self._cur_test_step = 0
+        if self.sim_data.torque_search is not None:
+            # adaptive search picks each torque from earlier results, steps only cap the rounds
+            self.sim_data.torque_search.reset()
+            self.sim_data.sim_torque_steps = self.sim_data.torque_search.max_rounds
+        elif self.sim_data.sim_torque_list:
+            # explicit torques (e.g. one sweep worker's share) instead of min..max steps
+            self.sim_data.sim_torque_steps = len(self.sim_data.sim_torque_list)
+            self.sim_data.sim_min_torque = min(self.sim_data.sim_torque_list)
+            self.sim_data.sim_max_torque = max(self.sim_data.sim_torque_list)
         self.sim_data.round_torque_model.as_float = self.sim_data.sim_min_torque
 
         self.vehicle_prim = sim_data.test_stage.GetPrimAtPath(self.sim_data.vehicle_prim_path)
+        self.round_results = []
         
-        cam_args = {
-            'camera_prim_path' : sim_data.vehicle_camera_path,
-            'vehicle_prim' : self.vehicle_prim,
-            'stage' : sim_data.test_stage }
-            
-        self.vehicle_camera = JumperCam()
-        self.vehicle_camera.setup_camera(**cam_args)
+        if not self.headless:
+            cam_args = {
+                'camera_prim_path' : sim_data.vehicle_camera_path,
+                'vehicle_prim' : self.vehicle_prim,
+                'stage' : sim_data.test_stage }
+                
+            self.vehicle_camera = JumperCam()
+            self.vehicle_camera.setup_camera(**cam_args)
         
        
         self.goal_prim = sim_data.test_stage.GetPrimAtPath(self.sim_data.end_goal_prim_path)
 
         self.wheel_friction_prim = sim_data.test_stage.GetPrimAtPath(self.sim_data.wheel_friction_prim_path)
 
-        self._audio = omni.usd.audio.get_stage_audio_interface() 
-        
-        # self._engine_moi = self.vehicle_prim.GetAttribute("physxVehicleEngine:moi").Get()
-        # self._damp_full_throttle = self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateFullThrottle").Get()
-        # self._damp_no_throttle_clutch_engaged = self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateZeroThrottleClutchEngaged").Get()
-        #self._engine_moi = 24275
-        self._engine_moi = 24275
-        self._damp_full_throttle = 3641
-        self._damp_no_throttle_clutch_engaged = 48551
+        self.landing_predictor = None
+        if self.sim_data.predict_landing:
+            self.landing_predictor = LandingPredictor(  sim_data.test_stage,
+                                                        self.vehicle_prim,
+                                                        self.sim_data.landing_ramp_prim_path,
+                                                        self.sim_data.material_out_of_bounds)
+
+        if self.telemetry is not None:
+            self.telemetry.close()
+        self.telemetry = None
+        if self.sim_data.telemetry_dir:
+            self.telemetry = TelemetryRecorder(self.sim_data.wheel_list)
+
+        self._audio = None if self.headless else omni.usd.audio.get_stage_audio_interface() 
         
+        self._units_per_meter = 1.0 / UsdGeom.GetStageMetersPerUnit(sim_data.test_stage)
+
         self.rear_left_prim = sim_data.test_stage.GetPrimAtPath(self.sim_data.vehicle_prim_path + "/LeftWheel2References")
         self.rear_right_prim = sim_data.test_stage.GetPrimAtPath(self.sim_data.vehicle_prim_path + "/RightWheel2References")
+
+        # values as authored on the stage, the burnouts put these back for the start
+        self._engine_moi = self.vehicle_prim.GetAttribute("physxVehicleEngine:moi").Get()
+        self._damp_full_throttle = self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateFullThrottle").Get()
+        self._damp_no_throttle_clutch_engaged = self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateZeroThrottleClutchEngaged").Get()
+        self._default_friction = self.wheel_friction_prim.GetAttribute("defaultFrictionValue").Get()
+        self._rear_left_stiffness = self.rear_left_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Get()
+        self._rear_right_stiffness = self.rear_right_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Get()
+
+        self.attach_round_layer()
+
+        # sampled once per physics step, for the round logic, audio and camera
+        self.vehicle_state = VehicleState(self.vehicle_prim,
+                                          [self.sim_data.vehicle_prim_path + wheel for wheel in self.sim_data.wheel_list],
+                                          self._physxInterface,
+                                          pose_from_physx=True)
+        self.vehicle = RoundVehicle()
+        self.vehicle.vehicle_prim = self.vehicle_prim
+        self.vehicle.state = self.vehicle_state
+        self.resolve_contact_path_ids()
         
         self.headlight_prims = []
+        if self.headless:
+            return
         for headlight in self.sim_data.vehicle_headlights:
             light_prim = sim_data.test_stage.GetPrimAtPath(headlight)
             if light_prim:
@@ -106,13 +344,31 @@ class JumpTestRound:
         self.sim_data.best_landing_susp_force_model.as_float = 0
         self.sim_data.best_round_idx_model.as_int = -1
         
-        self._best_round_was_soft_landing = False
+        self._best_round_result = None
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.state_source = self.vehicle_state
+        if self.sim_data.vehicle_audio is not None:
+            self.sim_data.vehicle_audio.state_source = self.vehicle_state
+        self._sweep_id = None
+        if self.sim_data.results_store is not None:
+            self._sweep_id = self.sim_data.results_store.start_sweep(self.sim_data.test_stage)
+        self._stage_digest = None
+        if self.sim_data.round_cache is not None:
+            test_settings = [ self.sim_data.fast_forward,
+                              self.sim_data.predict_landing,
+                              self.sim_data.round_time_budget,
+                              self.sim_data.stall_speed,
+                              self.sim_data.stall_stopped_time,
+                              self.sim_data.stall_distance,
+                              self.sim_data.stall_progress_time ]
+            self._stage_digest = stage_digest(self.sim_data.test_stage, test_settings)
+        # names the telemetry and metrics files of this test
+        self._telemetry_tag = self._sweep_id or time.strftime("%Y%m%d-%H%M%S")
+        # subscriber timings cover this test only
+        get_tick_metrics().reset()
+        self._test_start_wall_time = time.perf_counter()
         self.test_running = True
-
-        UsdPhysics.CollisionAPI.Apply(self.goal_prim)
-        PhysxSchema.PhysxTriggerAPI.Apply(self.goal_prim)
-        self.triggerStateAPI = PhysxSchema.PhysxTriggerStateAPI.Apply(self.goal_prim)
-
+        self.set_fast_forward_timeline(self.sim_data.fast_forward)
 
         self.start_next_round()
         
@@ -121,34 +377,39 @@ class JumpTestRound:
         if self.is_test_done():
             self.finish_test()
             return
+
+        # drop everything the last round changed in one go
+        self._round_layer.Clear()
+        self.attributes.reset()
+        with Usd.EditContext(self.sim_data.test_stage, self._round_layer):
+            UsdPhysics.CollisionAPI.Apply(self.goal_prim)
+            PhysxSchema.PhysxTriggerAPI.Apply(self.goal_prim)
+            self.triggerStateAPI = PhysxSchema.PhysxTriggerStateAPI.Apply(self.goal_prim)
+            #	enginePrim = stage.GetPrimAtPath(engine_prim_path)
+            contactReportAPI = PhysxSchema.PhysxContactReportAPI.Apply(self.vehicle_prim)
+            contactReportAPI.CreateThresholdAttr().Set(1000)
         
         # self._start_race_sound = self._audio.spawn_voice(self.sim_data.audio_start_race_prim)
-        self.vehicle_camera.car_started_moving = False
-        self.vehicle_camera.set_initial_position()
-        self._wait_for_go_time_remaining = STARTING_GUN_DELAY 
-        self.wait_gas_flip_last_num = round(STARTING_GUN_DELAY * 3 )
-        self.wait_gas_flip_b = False
-        
-        self._wait_to_start_countdown_sound = STARTING_GUN_PRE_DELAY
+        # the cached pose is still the last round's final physics step
+        self.vehicle_state.sample()
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.car_started_moving = False
+            self.vehicle_camera.set_initial_position()
+        self.start_countdown()
 
         # waiting to start
         self.set_throttle(1)
         self.set_brake0(.01)
         self.set_brake1(0)
 
-        self.sim_data.vehicle_audio.killed_throttle = False
-        self.reduced_throttle = False
+        if self.sim_data.vehicle_audio is not None:
+            self.sim_data.vehicle_audio.killed_throttle = False
       
                 
         self._round_over = False 
-        self.ui_data.test_round_event_fn("")           
+        self.vehicle.start_round()
+        self.report_round_event("")           
  
-        # wheels, not body
-        self._wheels_touched_ramp = False 
-        self._wheels_touched_dead_zone = False
-        #self._largest_round_jounce = 0.0
-        self._round_largest_body_impulse = 0.0
-        self._round_largest_susp_force = 0.0
         self.sim_data.round_largest_susp_force_model.as_float = 0.0
         self.sim_data.round_largest_body_impulse_model.as_float = 0.0
 
@@ -156,84 +417,211 @@ class JumpTestRound:
         if self._cur_test_step > self.sim_data.sim_torque_steps:
             self._cur_test_step = 0
         
-        torque_range = self.sim_data.sim_max_torque - self.sim_data.sim_min_torque
-        if self.sim_data.sim_torque_steps == 1:
-            # special case: use midpoint of range (for testing original torque)
-            torque_inc = torque_range / 2.0
-            self.current_test_torque = self.sim_data.sim_min_torque + torque_inc
+        if self.sim_data.torque_search is not None:
+            self.current_test_torque = self.sim_data.torque_search.next_torque()
         else:
-            torque_inc = torque_range / float(self.sim_data.sim_torque_steps - 1)
-            self.current_test_torque = self.sim_data.sim_min_torque + (float(self._cur_test_step - 1) * torque_inc)
-
-        # torque_inc = torque_range / float(self.sim_data.sim_torque_steps - 1)
-        # self.current_test_torque = self.sim_data.sim_min_torque + (float(self._cur_test_step - 1) * torque_inc)
+            self.current_test_torque = self.torque_for_step(self._cur_test_step)
 
 
         self.sim_data.round_torque_model.as_float = self.current_test_torque
-        self.ui_data.set_stage_params_fn(torque=self.current_test_torque)
+        self.set_round_value(self.vehicle_prim, ENGINE_TORQUE_ATTR_NAME, round(self.current_test_torque, 0))
+        if self.ui_data.set_stage_params_fn is not None:
+            self.ui_data.set_stage_params_fn(torque=self.current_test_torque)
+
+        self._round_params = {}
+        if self.sim_data.sim_round_params:
+            self._round_params = self.sim_data.sim_round_params[self._cur_test_step - 1]
+        self.apply_round_params()
+
+        self._cur_round_result = RoundResult(self._cur_test_step, self.current_test_torque)
+        self._cur_round_result.params = dict(self._round_params)
+        self._round_start_wall_time = time.perf_counter()
 
         
         # update ui round stats
         self.sim_data.round_step_model.as_int = self._cur_test_step
-        
-        #	enginePrim = stage.GetPrimAtPath(engine_prim_path)
-        contactReportAPI = PhysxSchema.PhysxContactReportAPI.Apply(self.vehicle_prim)
-        contactReportAPI.CreateThresholdAttr().Set(1000)
 
+        # the round's inputs are on the stage before physics starts
+        self.attributes.flush()
+
+        if self.take_cached_round():
+            return
+
+        if self.telemetry is not None:
+            self.telemetry.reset()
+
+        self.play_round()
+
+    def start_countdown(self):
+        self._wait_for_go_time_remaining = STARTING_GUN_DELAY 
+        self.wait_gas_flip_last_num = round(STARTING_GUN_DELAY * 3 )
+        self.wait_gas_flip_b = False
+        
+        # starting sound is cosmetic, skip it when fast forwarding
+        self._wait_to_start_countdown_sound = 0 if self.sim_data.fast_forward else STARTING_GUN_PRE_DELAY
+
+    # torque of round 'step' (1 based) from the torque list or the min..max steps
+    def torque_for_step(self, step):
+        if self.sim_data.sim_torque_list:
+            return self.sim_data.sim_torque_list[step - 1]
+        return linear_sweep_torque( step,
+                                    self.sim_data.sim_torque_steps,
+                                    self.sim_data.sim_min_torque,
+                                    self.sim_data.sim_max_torque)
+
+    def play_round(self):
         self._contact_report_sub = get_physx_simulation_interface().subscribe_contact_report_events(self._on_contact_report_event)
         self._skip_first_update_event = True
-        self.sim_data.vehicle_audio.start_audio() 
-        omni.timeline.get_timeline_interface().play(1,1500,False)
+        if self.sim_data.vehicle_audio is not None:
+            self.sim_data.vehicle_audio.start_audio() 
+        timeline = omni.timeline.get_timeline_interface()
+        # the timeline must outlast the round's time budget, if it stops first nothing ends the round
+        end_time_code = max(1500, int((self.sim_data.round_time_budget + 1.0) * timeline.get_time_codes_per_seconds()))
+        timeline.play(1,end_time_code,False)
+        self._round_start_sim_time = timeline.get_current_time()
+        # advanced by the physics steps
+        self._sim_time = self._round_start_sim_time
        
  
 
+    ########################## Round Layer ###############################
+
+    # anonymous layer in the session layer: the authored stage is never edited,
+    # and clearing the layer resets every round edit at once
+    def attach_round_layer(self):
+        self.detach_round_layer()
+        self._round_layer = Sdf.Layer.CreateAnonymous(ROUND_LAYER_TAG)
+        session_layer = self.sim_data.test_stage.GetSessionLayer()
+        session_layer.subLayerPaths.insert(0, self._round_layer.identifier)
+        # round writes, each attribute looked up once and only written when it changes,
+        # authored at the end of the frame with the camera, audio and vehicle mesh writes
+        self.attributes = AttributeRegistry(self.sim_data.test_stage, self._round_layer, write_queue=get_write_queue())
+
+    def detach_round_layer(self):
+        if self._round_layer is None:
+            return
+        self.attributes.reset()
+        session_layer = self.sim_data.test_stage.GetSessionLayer()
+        if self._round_layer.identifier in session_layer.subLayerPaths:
+            session_layer.subLayerPaths.remove(self._round_layer.identifier)
+        self._round_layer = None
+
+    def set_round_value(self, prim, attr_name, value):
+        self.attributes.set(prim, attr_name, value)
+
+    # swept stage attributes for this round, keyed by property path ("/prim/path.attrName")
+    def apply_round_params(self):
+        for attr_path, value in self._round_params.items():
+            self.attributes.set_at_path(attr_path, value)
+
     def set_throttle(self, throttle_amount):
-        self.vehicle_prim.GetAttribute("physxVehicleController:accelerator").Set(throttle_amount)
+        self.set_round_value(self.vehicle_prim, "physxVehicleController:accelerator", throttle_amount)
 
     def set_brake0(self, brake_amount):
-        self.vehicle_prim.GetAttribute("physxVehicleController:brake0").Set(brake_amount)
+        self.set_round_value(self.vehicle_prim, "physxVehicleController:brake0", brake_amount)
     def set_brake1(self, brake_amount):
-        self.vehicle_prim.GetAttribute("physxVehicleController:brake1").Set(brake_amount)
+        self.set_round_value(self.vehicle_prim, "physxVehicleController:brake1", brake_amount)
  
          
 
  
     def is_test_done(self):
+        if self.sim_data.torque_search is not None:
+            return self.sim_data.torque_search.is_done()
         return self._cur_test_step >= self.sim_data.sim_torque_steps
     
 
     def finish_test(self):
         omni.timeline.get_timeline_interface().stop()
         self.kill_subscriptions()
+        self.set_fast_forward_timeline(False)
+        self.detach_round_layer()
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.state_source = None
+        if self.sim_data.vehicle_audio is not None:
+            self.sim_data.vehicle_audio.state_source = None
+        if self.telemetry is not None:
+            # waits for the last round's file
+            self.telemetry.close()
+            self.telemetry = None
+        if self.sim_data.metrics_dir:
+            self.write_metrics()
         self._round_over = True
         self._sim_running = False
         self.test_running = False
         #self.test_done = True
-        self.ui_data.test_done_report_fn()
+        if self.ui_data.test_done_report_fn is not None:
+            self.ui_data.test_done_report_fn()
+
+    def write_metrics(self):
+        test_wall_time = time.perf_counter() - self._test_start_wall_time
+        for file_path in write_test_metrics(self.sim_data.metrics_dir, self._telemetry_tag,
+                                            self.round_results, test_wall_time):
+            print(f"JumpTestRound: metrics written to {file_path}")
+
+    def report_round_event(self, out_str, success=False):
+        if self.ui_data.test_round_event_fn is not None:
+            self.ui_data.test_round_event_fn(out_str, success)
+
+    def set_fast_forward_timeline(self, enable):
+        timeline = omni.timeline.get_timeline_interface()
+        settings = carb.settings.get_settings()
+        if enable:
+            if self._saved_timeline_state is None:
+                self._saved_timeline_state = (  timeline.get_play_every_frame(),
+                                                timeline.get_target_framerate(),
+                                                settings.get_as_bool(RATE_LIMIT_SETTING) )
+            timeline.set_play_every_frame(True)
+            timeline.set_target_framerate(FAST_FORWARD_FRAME_RATE)
+            settings.set_bool(RATE_LIMIT_SETTING, False)
+        elif self._saved_timeline_state is not None:
+            play_every_frame, target_framerate, rate_limit = self._saved_timeline_state
+            self._saved_timeline_state = None
+            timeline.set_play_every_frame(play_every_frame)
+            timeline.set_target_framerate(target_framerate)
+            settings.set_bool(RATE_LIMIT_SETTING, rate_limit)
+
+    def spawn_sound(self, sound_prim):
+        # sounds are presentation only
+        if self._audio is None or sound_prim is None:
+            return None
+        return self._audio.spawn_voice(sound_prim)
 
 
 
    
     def timeline_event(self, event):
         if event.type == int(omni.timeline.TimelineEventType.PLAY):
-            update_stream = omni.kit.app.get_app().get_update_event_stream()
-            self._physics_tick_update_sub_id = update_stream.create_subscription_to_pop(self.physics_tick_update, name="tickupdate_sim")
+            # round logic per physics step (fixed dt, however many steps a frame takes),
+            # camera, audio and lights per rendered frame
+            self._physics_step_sub = self._physxInterface.subscribe_physics_step_events(self.physics_step)
+            self._skip_first_step = True
+            if not self.headless:
+                update_stream = omni.kit.app.get_app().get_update_event_stream()
+                self._presentation_update_sub_id = update_stream.create_subscription_to_pop(self.presentation_update, name="tickupdate_presentation")
             self._skip_first_update_event = True            
-            self.sim_data.vehicle_audio.start_audio()  
+            if self.sim_data.vehicle_audio is not None:
+                self.sim_data.vehicle_audio.start_audio()  
 
         if event.type == int(omni.timeline.TimelineEventType.STOP):
             print("timeline STOPPED")
-            self._physics_tick_update_sub_id = None
+            self.stop_round_ticks()
+
+    def stop_round_ticks(self):
+        self._physics_step_sub = None
+        self._presentation_update_sub_id = None
        
 
     ########################## End of Round ###############################
 
     def finalize_end_of_round(self):
-        self.sim_data.vehicle_audio.stop_audio()    
-        self._physics_tick_update_sub_id = None    
+        if self.sim_data.vehicle_audio is not None:
+            self.sim_data.vehicle_audio.stop_audio()    
+        self.stop_round_ticks()
         self.start_next_round()
 
     # End of Round countdown, delay to restart sim 
+    @timed("JumpTestRound.end_of_round_update")
     def end_of_round_update(self, e: carb.events.IEvent):
  
         self._update_wait_remaining -= e.payload["dt"]
@@ -241,25 +629,66 @@ class JumpTestRound:
         if self._update_wait_remaining < 0.5 and self._sim_running:
             self._sim_running = False
             omni.timeline.get_timeline_interface().stop()
+            # let the stop go through before the round layer is cleared
+            return
 
         if self._update_wait_remaining <= 0:
             self._end_of_round_update_sub_id = None
             self.finalize_end_of_round()
             
 
+    # a round with the same stage, settings, torque and params has run before: take its outcome
+    def take_cached_round(self) -> bool:
+        self._round_cache_key = None
+        if self.sim_data.round_cache is None:
+            return False
+        self._round_cache_key = round_key(self._stage_digest, self.current_test_torque, self._round_params)
+        cached = self.sim_data.round_cache.get(self._round_cache_key)
+        if cached is None:
+            return False
+
+        result = self._cur_round_result
+        self._cur_round_result = None
+        result.__dict__.update(cached)
+        result.cached = True
+        self._round_over = True
+        self.vehicle.round_over = True
+        self.sim_data.round_largest_body_impulse_model.as_float = result.largest_body_impulse
+        self.sim_data.round_largest_susp_force_model.as_float = result.largest_susp_force
+        self.report_round_event(result.outcome + " (cached)", result.success)
+        self.add_round_result(result)
+        self.update_best_round(result)
+
+        # nothing to wind down, next round on the next update
+        self._sim_running = False
+        self._update_wait_remaining = 0.0
+        update_stream = omni.kit.app.get_app().get_update_event_stream()
+        self._end_of_round_update_sub_id = update_stream.create_subscription_to_pop(self.end_of_round_update, name="EndRound")
+        return True
+
+    def update_best_round(self, result):
+        if result is not None and is_better_round(result, self._best_round_result):
+            self._best_round_result = result
+            self.sim_data.best_torque_model.as_float = result.torque
+            self.sim_data.best_landing_body_impulse_model.as_float = result.largest_body_impulse
+            self.sim_data.best_landing_susp_force_model.as_float = result.largest_susp_force
+            self.sim_data.best_round_idx_model.as_int = result.round_idx
+
     def end_current_round(self, hit_goal, fail_str=""):     
         
         self._round_over = True
+        self.vehicle.round_over = True
          
         if not hit_goal:
-            self._fail_sound = self._audio.spawn_voice(self.sim_data.audio_fail_prim)
+            self._fail_sound = self.spawn_sound(self.sim_data.audio_fail_prim)
         
         self.set_throttle(0.0)
-        self.sim_data.vehicle_audio.killed_throttle = True
+        if self.sim_data.vehicle_audio is not None:
+            self.sim_data.vehicle_audio.killed_throttle = True
         
         success = False
         if hit_goal:
-            if self._wheels_touched_ramp:
+            if self.vehicle.wheels_touched_ramp:
                 out_str = "Success!" # add if best round 
                 success = True
             else: 
@@ -267,120 +696,134 @@ class JumpTestRound:
         else:
             out_str = "FAILED: " + fail_str
     
-        self.ui_data.test_round_event_fn(out_str, success)
-
-        self._wheels_touched_ramp = False 
-        self._wheels_touched_dead_zone = False
+        self.report_round_event(out_str, success)
+        result = self.record_round_result(success, out_str)
 
         # Process success results
         if success:
-            self._win_sound = self._audio.spawn_voice(self.sim_data.audio_win_bell_prim)
-
-            # best round critia in this order
-            # best suspension force : soft landing, with least susp force
-            # best body impulse : body hit something
-            bestround = False
-            soft_landing = self._round_largest_body_impulse == 0
-            if soft_landing:
-                # take first soft landing or the best soft landing (we can have smaller suspension force from hard landings)
-                if not self._best_round_was_soft_landing or self._round_largest_susp_force < self.sim_data.best_landing_susp_force_model.as_float:
-                    bestround = True 
-                    self._best_round_was_soft_landing = True
-                
-            # use body impulse if others rounds aren't soft
-            elif not self._best_round_was_soft_landing:
-                if self.sim_data.best_landing_body_impulse_model.as_float == 0:
-                    bestround = True
-                elif self._round_largest_body_impulse < self.sim_data.best_landing_body_impulse_model.as_float:                    
-                    bestround = True
-
-            if bestround:
-                self.sim_data.best_torque_model.as_float = self.sim_data.round_torque_model.as_float
-                self.sim_data.best_landing_body_impulse_model.as_float = 0 if self._best_round_was_soft_landing else self._round_largest_body_impulse
-                self.sim_data.best_landing_susp_force_model.as_float = self._round_largest_susp_force
-                self.sim_data.best_round_idx_model.as_int = self.sim_data.round_step_model.as_int
+            self._win_sound = self.spawn_sound(self.sim_data.audio_win_bell_prim)
+            self.update_best_round(result)
                     
         # start countdown to next round
         if self._end_of_round_update_sub_id is None:
             self.set_throttle(0.0)
-            self.sim_data.vehicle_audio.killed_throttle = True
+            if self.sim_data.vehicle_audio is not None:
+                self.sim_data.vehicle_audio.killed_throttle = True
             update_stream = omni.kit.app.get_app().get_update_event_stream()
             self._end_of_round_update_sub_id = update_stream.create_subscription_to_pop(self.end_of_round_update, name="EndRound")
             
             self._sim_running = True
-            self._update_wait_remaining = delay_after_round
-            
+            # the round is decided, only wind down for show when not fast forwarding
+            self._update_wait_remaining = 0.0 if self.sim_data.fast_forward else delay_after_round
+
+    # a vehicle's round is over, with the one vehicle of a JumpTestRound that's the round
+    def end_vehicle_round(self, vehicle, hit_goal, fail_str=""):
+        if not vehicle.round_over:
+            self.end_current_round(hit_goal, fail_str)
+
+    def record_round_result(self, success, out_str):
+        # only the first end of a round counts, a round can be ended again while it winds down
+        result = self._cur_round_result
+        if result is None:
+            return None
+        self._cur_round_result = None
+
+        result.success = success
+        result.outcome = out_str
+        result.largest_body_impulse = self.vehicle.largest_body_impulse
+        result.largest_susp_force = self.vehicle.largest_susp_force
+        result.sim_time = self._sim_time - self._round_start_sim_time
+        result.wall_time = time.perf_counter() - self._round_start_wall_time
+        if self.telemetry is not None:
+            result.telemetry_path = os.path.join(self.sim_data.telemetry_dir,
+                                                 f"{self._telemetry_tag}_round_{result.round_idx:04d}.npz")
+            self.telemetry.flush(result.telemetry_path, result.to_dict())
+        if self.sim_data.round_cache is not None and self._round_cache_key is not None:
+            self.sim_data.round_cache.put(self._round_cache_key, self._stage_digest, result)
+        self.add_round_result(result)
+        # simulated rounds only, cached ones are in the store from when they ran
+        if self.sim_data.results_store is not None:
+            self.sim_data.results_store.append(result, self._sweep_id)
+        return result
+
+    def add_round_result(self, result):
+        self.round_results.append(result)
+        if self.sim_data.torque_search is not None:
+            self.sim_data.torque_search.report_result(result)
 
     ############################### Physics ###############################
 
+    # contact paths compared as the ints the contact report carries, resolved once per test
+    def resolve_contact_path_ids(self):
+        to_id = lambda path: PhysicsSchemaTools.sdfPathToInt(Sdf.Path(str(path)))
+        self.vehicle.vehicle_id = to_id(self.sim_data.vehicle_prim_path)
+        self.vehicle.goal_id = to_id(self.sim_data.end_goal_prim_path)
+        self.vehicle.ramp_id = to_id(self.sim_data.landing_ramp_prim_path)
+        self.vehicle.roof_id = to_id(self.sim_data.vehicle_roof_prim_path)
+        self.vehicle.collision_path = Sdf.Path(self.sim_data.vehicle_collision_prim_path)
+        self._out_of_bounds_material_id = to_id(self.sim_data.material_out_of_bounds)
+        self.index_vehicles([self.vehicle])
+
+    # the vehicles contact reports are sorted out for, by the ids of their body and roof
+    def index_vehicles(self, vehicles):
+        self._vehicle_by_id = {vehicle.vehicle_id: vehicle for vehicle in vehicles}
+        self._vehicle_by_roof_id = {vehicle.roof_id: vehicle for vehicle in vehicles}
+
+    @timed("JumpTestRound.contact_report")
     def _on_contact_report_event(self, contact_headers, contact_data):
-        # dont spam 'end_current_round'
-        # if self._round_over:
-        #     return
-
-        big_impulse = float(0.0)
-        hit_ramp = False
-        hit_roof = False
-        found_goal = False
-        out_of_bounds = False
-        for contact_header in contact_headers:
-            act0_path = str(PhysicsSchemaTools.intToSdfPath(contact_header.actor0))
-            act1_path = str(PhysicsSchemaTools.intToSdfPath(contact_header.actor1))
+        big_impulse = 0.0
+        for vehicle, contacts in self.sort_contacts(contact_headers).items():
+            big_impulse = max(big_impulse, self.vehicle_contacts(vehicle, contacts, contact_data))
 
-            cur_collider = str(PhysicsSchemaTools.intToSdfPath(contact_header.collider0))
-            
-           
-            if cur_collider == self.sim_data.vehicle_roof_prim_path:
-                hit_roof = True
-
-            if act0_path == self.sim_data.vehicle_prim_path:
-                # reached end goal?
-                if act1_path == self.sim_data.end_goal_prim_path:
-                    #if not self._round_over:
-                    found_goal = True
-
-                if act1_path == self.sim_data.landing_ramp_prim_path:
-                    hit_ramp = True
-            
-                contact_data_offset = contact_header.contact_data_offset
-                num_contact_data = contact_header.num_contact_data
-                for index in range(contact_data_offset, contact_data_offset + num_contact_data, 1):
-                    cur_contact = contact_data[index]
-                    cur_impulse =  cur_contact.impulse[0] * cur_contact.impulse[0]
-                    cur_impulse += cur_contact.impulse[1] * cur_contact.impulse[1]
-                    cur_impulse += cur_contact.impulse[2] * cur_contact.impulse[2]
-                    cur_impulse = math.sqrt(cur_impulse)
-                    
-                    if not self._round_over:
-                        cur_material = str(PhysicsSchemaTools.intToSdfPath(cur_contact.material1))
-                        if(cur_material == self.sim_data.material_out_of_bounds):
-                            out_of_bounds = True  
- 
-                    if big_impulse < cur_impulse:
-                        big_impulse = cur_impulse
-                    
-        big_impulse = round(big_impulse,0)
         if self.sim_data.vehicle_audio is not None:
             self.sim_data.vehicle_audio.impact(big_impulse)
- 
-        if not self._round_over:
-            if hit_roof:
-                self.end_current_round(False, "Hit Roof!")
+        if self.vehicle.largest_body_impulse > self.sim_data.round_largest_body_impulse_model.as_float:
+            self.sim_data.round_largest_body_impulse_model.as_float = self.vehicle.largest_body_impulse
+
+    # contact headers of the report, per vehicle they're about
+    def sort_contacts(self, contact_headers):
+        vehicle_contacts = {}
+        for contact_header in contact_headers:
+            roof_vehicle = self._vehicle_by_roof_id.get(contact_header.collider0)
+            if roof_vehicle is not None:
+                vehicle_contacts.setdefault(roof_vehicle, VehicleContacts()).hit_roof = True
+
+            vehicle = self._vehicle_by_id.get(contact_header.actor0)
+            if vehicle is None:
+                continue
+            contacts = vehicle_contacts.setdefault(vehicle, VehicleContacts())
+            # reached end goal?
+            if contact_header.actor1 == vehicle.goal_id:
+                contacts.found_goal = True
+            if contact_header.actor1 == vehicle.ramp_id:
+                contacts.hit_ramp = True
+            contacts.ranges.append((contact_header.contact_data_offset, contact_header.num_contact_data))
+        return vehicle_contacts
+
+    # one vehicle's part of a contact report: ends its round, tracks the landing impulse,
+    # returns the largest impulse
+    def vehicle_contacts(self, vehicle, contacts, contact_data):
+        big_impulse, out_of_bounds = summarize_contacts(contact_data, contacts.ranges, self._out_of_bounds_material_id)
+        big_impulse = round(big_impulse, 0)
+
+        # dont spam 'end_current_round'
+        if not vehicle.round_over:
+            if contacts.hit_roof:
+                self.end_vehicle_round(vehicle, False, "Hit Roof!")
             elif out_of_bounds:
-                self.end_current_round(False, "Left Safe Area")   
-            elif found_goal:
-                self.end_current_round(True)
- 
-        if hit_ramp:
-            if big_impulse > self._round_largest_body_impulse:
-                self._round_largest_body_impulse = big_impulse
-                self.sim_data.round_largest_body_impulse_model.as_float = big_impulse
+                self.end_vehicle_round(vehicle, False, "Left Safe Area")
+            elif contacts.found_goal:
+                self.end_vehicle_round(vehicle, True)
+
+        if contacts.hit_ramp:
+            vehicle.largest_body_impulse = max(vehicle.largest_body_impulse, big_impulse)
+        return big_impulse
 
     def restore_engine_params(self):
-        self.wheel_friction_prim.GetAttribute("defaultFrictionValue").Set(1)
-        self.vehicle_prim.GetAttribute("physxVehicleEngine:moi").Set(self._engine_moi)
-        self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateFullThrottle").Set(self._damp_full_throttle)
-        self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateZeroThrottleClutchEngaged").Set(self._damp_no_throttle_clutch_engaged)  
+        self.set_round_value(self.wheel_friction_prim, "defaultFrictionValue", self._default_friction)
+        self.set_round_value(self.vehicle_prim, "physxVehicleEngine:moi", self._engine_moi)
+        self.set_round_value(self.vehicle_prim, "physxVehicleEngine:dampingRateFullThrottle", self._damp_full_throttle)
+        self.set_round_value(self.vehicle_prim, "physxVehicleEngine:dampingRateZeroThrottleClutchEngaged", self._damp_no_throttle_clutch_engaged)
         
     def pre_race_burnouts(self, dt):
            
@@ -391,152 +834,208 @@ class JumpTestRound:
         
         if self.wait_gas_flip_b:
             # STOP burning out
-            self.vehicle_prim.GetAttribute("physxVehicleController:targetGear").Set(1)
-            self.wheel_friction_prim.GetAttribute("defaultFrictionValue").Set(1)
-            self.rear_left_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Set(1023209)
-            self.rear_right_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Set(1023209)
+            self.set_round_value(self.vehicle_prim, "physxVehicleController:targetGear", 1)
+            self.set_round_value(self.wheel_friction_prim, "defaultFrictionValue", self._default_friction)
+            self.set_round_value(self.rear_left_prim, "physxVehicleTire:longitudinalStiffness", self._rear_left_stiffness)
+            self.set_round_value(self.rear_right_prim, "physxVehicleTire:longitudinalStiffness", self._rear_right_stiffness)
             self.set_brake0(1)
             self.set_throttle(0.0)
-            self.vehicle_prim.GetAttribute("physxVehicleEngine:moi").Set(24275)
-            self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateFullThrottle").Set(8496)
-            self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateZeroThrottleClutchEngaged").Set(48551)
+            self.set_round_value(self.vehicle_prim, "physxVehicleEngine:moi", self._engine_moi)
+            self.set_round_value(self.vehicle_prim, "physxVehicleEngine:dampingRateFullThrottle", BURNOUT_HOLD_DAMPING_FULL_THROTTLE)
+            self.set_round_value(self.vehicle_prim, "physxVehicleEngine:dampingRateZeroThrottleClutchEngaged", self._damp_no_throttle_clutch_engaged)
         else:
             # START burning out
-            self.vehicle_prim.GetAttribute("physxVehicleController:targetGear").Set(1)
+            self.set_round_value(self.vehicle_prim, "physxVehicleController:targetGear", 1)
             # self.wheel_friction_prim.GetAttribute("defaultFrictionValue").Set(.001)            
             # self.rear_left_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Set(0.01)
             # self.rear_right_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Set(0.01) 
              
             self.set_brake0(1)
             self.set_throttle(1)
-            self.vehicle_prim.GetAttribute("physxVehicleEngine:moi").Set(24275)
-            self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateFullThrottle").Set(3641)
-            self.vehicle_prim.GetAttribute("physxVehicleEngine:dampingRateZeroThrottleClutchEngaged").Set(48551)
+            self.set_round_value(self.vehicle_prim, "physxVehicleEngine:moi", self._engine_moi)
+            self.set_round_value(self.vehicle_prim, "physxVehicleEngine:dampingRateFullThrottle", self._damp_full_throttle)
+            self.set_round_value(self.vehicle_prim, "physxVehicleEngine:dampingRateZeroThrottleClutchEngaged", self._damp_no_throttle_clutch_engaged)
               
                 
         self._wait_for_go_time_remaining -= dt
      
-    def reduce_throttle(self):
-        self.set_throttle(0.5) 
-        self.reduced_throttle = True 
-
-    def physics_tick_update(self, e: carb.events.IEvent):
+    # stalled before the ramp, or at rest somewhere that doesn't end the round
+    def check_stuck(self, vehicle, pos):
+        sim_time = vehicle.state.time
+
+        vel = vehicle.state.velocity
+        speed = vel.GetLength() / self._units_per_meter if vel is not None else 0.0
+        if speed >= self.sim_data.stall_speed:
+            vehicle.stopped_since = None
+        elif vehicle.stopped_since is None:
+            vehicle.stopped_since = sim_time
+        elif sim_time - vehicle.stopped_since > self.sim_data.stall_stopped_time:
+            self.end_vehicle_round(vehicle, False, "Stalled, vehicle stopped")
+            return
 
-        self.vehicle_camera.update_camera(e)
+        # moving but not getting anywhere (rocking, wheel spin against something)
+        if vehicle.progress_pos is None or (pos - vehicle.progress_pos).GetLength() > self.sim_data.stall_distance * self._units_per_meter:
+            vehicle.progress_pos = Gf.Vec3d(pos)
+            vehicle.progress_time = sim_time
+        elif sim_time - vehicle.progress_time > self.sim_data.stall_progress_time:
+            self.end_vehicle_round(vehicle, False, "Stalled, no progress")
+
+    # GO! restore wheel frictions, throttle and brake
+    def start_race(self):
+        self.set_round_value(self.vehicle_prim, "physxVehicleController:targetGear", 255)
+        self.restore_engine_params()
+        self.set_throttle(1)
+        self.set_brake0(0)
+        self.set_brake1(0)
+        self.set_round_value(self.rear_left_prim, "physxVehicleTire:longitudinalStiffness", self._rear_left_stiffness)
+        self.set_round_value(self.rear_right_prim, "physxVehicleTire:longitudinalStiffness", self._rear_right_stiffness)
+        # swept values win over the restored defaults
+        self.apply_round_params()
+
+    def reduce_throttle(self, vehicle):
+        self.set_vehicle_value(vehicle, "physxVehicleController:accelerator", 0.5)
+        vehicle.reduced_throttle = True 
+
+    def set_vehicle_value(self, vehicle, attr_name, value):
+        self.set_round_value(vehicle.vehicle_prim, attr_name, value)
+
+    def record_telemetry_tick(self):
+        state = self.vehicle_state
+        round_sim_time = state.time - self._round_start_sim_time
+        self.telemetry.record_tick(round_sim_time, state.transform, state.velocity, state.engine_rpm)
+        for wheel_idx in range(len(self.sim_data.wheel_list)):
+            wheelState = state.wheel_state(wheel_idx)
+            if wheelState:
+                self.telemetry.record_wheel(wheel_idx, wheelState)
+
+    # PhysX step event: the round logic, once per simulation step with the step's fixed dt
+    @timed("JumpTestRound.physics_step")
+    def physics_step(self, dt):
+        self._sim_time += dt
+        self.vehicle_state.sample(self._sim_time)
+        self.step_round(dt)
+        # this step's inputs are on the stage for the next one
+        self.attributes.flush()
+
+    # app update: camera, audio, headlights and sounds, once per rendered frame
+    @timed("JumpTestRound.presentation_update")
+    def presentation_update(self, e: carb.events.IEvent):
 
-        # burnouts before start 
-        if self._wait_for_go_time_remaining > 0:
-            
-            self.pre_race_burnouts(e.payload["dt"])
-            if self._wait_for_go_time_remaining <= 0:
-                # GO! restore wheel frictions, throttle and brake
-                self.wheel_friction_prim.GetAttribute("defaultFrictionValue").Set(1)
-                self.vehicle_prim.GetAttribute("physxVehicleController:targetGear").Set(255)
-                self.restore_engine_params()
-                self.set_throttle(1)
-                self.set_brake0(0)
-                self.set_brake1(0)
-                self.rear_left_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Set(1023209)
-                self.rear_right_prim.GetAttribute("physxVehicleTire:longitudinalStiffness").Set(1023209)
-                
-                self.vehicle_camera.car_started_moving = True
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.update_camera(e)
 
         # starting sound (may differ from car's start)        
         if self._wait_to_start_countdown_sound > 0:
             self._wait_to_start_countdown_sound -= e.payload["dt"]
             if self._wait_to_start_countdown_sound <= 0:
-                self._start_race_sound = self._audio.spawn_voice(self.sim_data.audio_start_race_prim)
+                self._start_race_sound = self.spawn_sound(self.sim_data.audio_start_race_prim)
 
         if self._skip_first_update_event:
             self._skip_first_update_event = False
-            self.last_time = int(omni.timeline.get_timeline_interface().get_current_time()*3)
-            return     
-           
+            return
+
         if self.sim_data.vehicle_audio is not None:
             self.sim_data.vehicle_audio.update_audio(e)
-            
-        if self.vehicle_camera is not None:
-            self.vehicle_camera.update_camera(e)    
                     
         # brighten headlights when engine rev's
-        rev_amount = self.ui_data.engine_rpm_model.as_float
-        for h_light in self.headlight_prims:
-            light_amt = 2000000.0 + (1500000.0 * rev_amount)
-            h_light.GetAttribute("intensity").Set(light_amt)
+        if self.headlight_prims:
+            rev_amount = self.ui_data.engine_rpm_model.as_float
+            for h_light in self.headlight_prims:
+                light_amt = 2000000.0 + (1500000.0 * rev_amount)
+                self.set_round_value(h_light, "intensity", light_amt)
+
+    def step_round(self, dt):
+
+        # burnouts before start (these set up the launch, so fast forward still simulates them)
+        if self._wait_for_go_time_remaining > 0:
+            
+            self.pre_race_burnouts(dt)
+            if self._wait_for_go_time_remaining <= 0:
+                self.start_race()
+                
+                if self.vehicle_camera is not None:
+                    self.vehicle_camera.car_started_moving = True
+
+        if self._skip_first_step:
+            self._skip_first_step = False
+            return     
                 
         # dont spam 'end_current_round'
         if self._round_over:
             return        
-             
-        triggerColliders = self.triggerStateAPI.GetTriggeredCollisionsRel().GetTargets()
-        if len(triggerColliders) > 0:
-            if self.sim_data.vehicle_collision_prim_path == triggerColliders[0]:
-                self.end_current_round(True)   
 
-        if omni.timeline.get_timeline_interface().is_playing():
-            out_result = False
-            
-            new_time = int(omni.timeline.get_timeline_interface().get_current_time()*3)
-            if new_time > self.last_time:
-                self.last_time = new_time
-                out_result = False
+        if self.telemetry is not None:
+            self.record_telemetry_tick()
 
-            # check upside down...
-            if self.vehicle_prim:
-                
-                local_mat = UsdGeom.Xformable(self.vehicle_prim).GetLocalTransformation()
-                up = local_mat.GetRow3(1)
-                upness = up[1]
-                
-                if out_result:
-                    print(f"upness: {upness}")
-                    
-                if upness < -0.5:
-                    self.end_current_round(False, "Upside down...")
-                    
-                pos = local_mat.ExtractTranslation()
-                if pos[2] > 3100.0:
-                    #print(f"*******************************vehicle Z: {pos[2]}")
-                    if self.reduced_throttle == False:
-                        pass
-                        self.reduce_throttle()
-              
+        triggered = set(self.triggerStateAPI.GetTriggeredCollisionsRel().GetTargets())
+        self.step_vehicle(self.vehicle, triggered)
 
+        if self.vehicle.largest_susp_force > self.sim_data.round_largest_susp_force_model.as_float:
+            self.sim_data.round_largest_susp_force_model.as_float = self.vehicle.largest_susp_force
 
-            found_ramp = False
-            found_dead_zone = False          
-   
-            for curWheel in self.sim_data.wheel_list:
+    # end of round checks of one vehicle, once per physics step while its round runs;
+    # 'triggered' are the colliders in the goal trigger
+    def step_vehicle(self, vehicle, triggered):
+        if vehicle.collision_path in triggered:
+            self.end_vehicle_round(vehicle, True)
 
-                CurWheelPath = self.sim_data.vehicle_prim_path + curWheel
-                wheelState = self._physxInterface.get_wheel_state(CurWheelPath)
-                if wheelState: 
-                    wheel_mat = wheelState[VEHICLE_WHEEL_STATE_GROUND_MATERIAL]
-                    
-                    wheel_on_ramp = wheel_mat == self.sim_data.material_safe_ramp
-                    found_ramp = found_ramp or wheel_on_ramp
-                    
-                    # keep tracking forces even after touching ramp
-                    if found_ramp:
-         
-                        suspension_force = wheelState[VEHICLE_WHEEL_STATE_SUSPENSION_FORCE]
-
-                        f_mag = math.sqrt(  suspension_force[0] * suspension_force[0] + 
-                                            suspension_force[1] * suspension_force[1] + 
-                                            suspension_force[2] * suspension_force[2])
-                        
-                        if self._round_largest_susp_force < f_mag:
-                            self._round_largest_susp_force = f_mag
-                            self.sim_data.round_largest_susp_force_model.as_float = f_mag
- 
+        # check upside down...
+        transform = vehicle.state.transform
+        if transform.GetRow3(1)[1] < UPSIDE_DOWN_UP:
+            self.end_vehicle_round(vehicle, False, "Upside down...")
 
-                    if out_result:
-                        print(f"wheel_mat : {wheel_mat}")                            
-                    
-                    found_dead_zone = found_dead_zone or wheel_mat == self.sim_data.material_out_of_bounds
-                    
-            self._wheels_touched_ramp = self._wheels_touched_ramp or found_ramp
-            self._wheels_touched_dead_zone = self._wheels_touched_dead_zone or found_dead_zone
-            
-            if self._wheels_touched_dead_zone:
-                self.end_current_round(False, "Left Safe Area")
+        # where the vehicle is on its own course
+        pos = transform.ExtractTranslation() - vehicle.offset
+        if pos[2] > THROTTLE_CUTOFF_HEIGHT and not vehicle.reduced_throttle:
+            self.reduce_throttle(vehicle)
+
+        racing = self._wait_for_go_time_remaining <= 0
+        if racing and not vehicle.round_over:
+            self.check_stuck(vehicle, pos)
+
+        if not vehicle.round_over:
+            round_sim_time = vehicle.state.time - self._round_start_sim_time
+            if round_sim_time > self.sim_data.round_time_budget:
+                self.end_vehicle_round(vehicle, False, "Round timed out")
+
+        found_ramp = False
+        found_dead_zone = False          
+        found_wheel_state = False
+        any_wheel_on_ground = False
+   
+        for wheel_idx in range(len(self.sim_data.wheel_list)):
+
+            wheelState = vehicle.state.wheel_state(wheel_idx)
+            if not wheelState:
+                continue
+            found_wheel_state = True
+            any_wheel_on_ground = any_wheel_on_ground or wheelState[VEHICLE_WHEEL_STATE_IS_ON_GROUND]
+            wheel_mat = wheelState[VEHICLE_WHEEL_STATE_GROUND_MATERIAL]
+            found_ramp = found_ramp or wheel_mat == self.sim_data.material_safe_ramp
+                
+            # keep tracking forces even after touching ramp
+            if found_ramp:
+                suspension_force = wheelState[VEHICLE_WHEEL_STATE_SUSPENSION_FORCE]
+                f_mag = math.sqrt(  suspension_force[0] * suspension_force[0] + 
+                                    suspension_force[1] * suspension_force[1] + 
+                                    suspension_force[2] * suspension_force[2])
+                vehicle.largest_susp_force = max(vehicle.largest_susp_force, f_mag)
+
+            found_dead_zone = found_dead_zone or wheel_mat == self.sim_data.material_out_of_bounds
+                
+        vehicle.wheels_touched_ramp = vehicle.wheels_touched_ramp or found_ramp
+        vehicle.wheels_touched_dead_zone = vehicle.wheels_touched_dead_zone or found_dead_zone
+        
+        if vehicle.wheels_touched_dead_zone:
+            self.end_vehicle_round(vehicle, False, "Left Safe Area")
+
+        # all wheels just left the ground after the start: end obvious misses right away,
+        # the predictor knows the authored course, the pose is moved onto it
+        if self.landing_predictor is not None and found_wheel_state and racing:
+            if any_wheel_on_ground:
+                vehicle.jump_predicted = False
+            elif not vehicle.jump_predicted and not vehicle.round_over:
+                vehicle.jump_predicted = True
+                velocity = vehicle.state.velocity
+                if velocity is not None and self.landing_predictor.predict_miss(pos, velocity):
+                    self.end_vehicle_round(vehicle, False, "missed landing ramp")
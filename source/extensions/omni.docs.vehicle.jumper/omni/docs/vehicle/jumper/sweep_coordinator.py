@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import shutil
+import asyncio
+import tempfile
+import subprocess
+import carb
+import carb.settings
+import carb.tokens
+import omni.kit.app
+
+from .run_test_rounds import RoundResult, select_best_round, linear_sweep_torque
+from .headless_runner import HeadlessSweepRunner
+from .extension import MY_STAGE_NAME
+
+__all__ = ['SweepCoordinator', 'default_worker_count', 'start_sweep_worker_from_settings']
+
+EXT_NAME = "omni.docs.vehicle.jumper"
+
+# worker processes are this extension started with these settings
+WORKER_SETTINGS_PATH = "/exts/omni.docs.vehicle.jumper/worker"
+WORKER_TORQUES_SETTING = WORKER_SETTINGS_PATH + "/torques"
+WORKER_RESULT_PATH_SETTING = WORKER_SETTINGS_PATH + "/resultPath"
+WORKER_STAGE_PATH_SETTING = WORKER_SETTINGS_PATH + "/stagePath"
+
+# cores given to each worker (PhysX threads), the rest of a Kit process is mostly idle
+WORKER_CORES = 2
+WORKER_POLL_PERIOD = 0.5
+
+
+def default_worker_count(num_rounds):
+    workers = max(1, (os.cpu_count() or 1) // WORKER_CORES)
+    return max(1, min(workers, num_rounds))
+
+
+# interleave rounds across workers so every worker gets a spread of the torque range
+# (misses at one end of the range are much shorter than landings)
+def split_rounds(torques, num_workers):
+    chunks = []
+    for worker_idx in range(num_workers):
+        round_indices = list(range(worker_idx + 1, len(torques) + 1, num_workers))
+        if round_indices:
+            chunks.append((round_indices, [torques[idx - 1] for idx in round_indices]))
+    return chunks
+
+
+# Splits a torque sweep across several Kit worker processes, each running a
+# HeadlessSweepRunner on its share of the rounds, then merges the results.
+#
+#   coordinator = SweepCoordinator(sim_torque_steps=21, sim_min_torque=3000, sim_max_torque=9000)
+#   results = await coordinator.run_async()
+#   best = coordinator.best_result
+#
+class SweepCoordinator():
+
+    def __init__(self, sim_torque_steps, sim_min_torque, sim_max_torque, num_workers=None,
+                 stage_path=MY_STAGE_NAME, kit_exe=None, app_file=None, results_store=None):
+        self.torques = [linear_sweep_torque(step, sim_torque_steps, sim_min_torque, sim_max_torque)
+                        for step in range(1, sim_torque_steps + 1)]
+        self.num_workers = num_workers if num_workers else default_worker_count(len(self.torques))
+        self.stage_path = stage_path
+        self.kit_exe = kit_exe
+        # optional .kit app for the workers, otherwise a bare Kit with this extension enabled
+        self.app_file = app_file
+        # merged rounds are appended here, the workers don't write it
+        self.results_store = results_store
+
+        self.results = []
+        self.best_result = None
+        self._processes = []
+
+    def get_kit_exe(self):
+        if self.kit_exe:
+            return self.kit_exe
+        kit_folder = carb.tokens.get_tokens_interface().resolve("${kit}")
+        return os.path.join(kit_folder, "kit.exe" if sys.platform == "win32" else "kit")
+
+    def make_worker_args(self, torques, result_path):
+        ext_manager = omni.kit.app.get_app().get_extension_manager()
+        ext_path = ext_manager.get_extension_path_by_module(__name__)
+        # folder holding this extension and the vehicle helper
+        ext_folder = os.path.dirname(ext_path)
+
+        args = [self.get_kit_exe()]
+        if self.app_file:
+            args.append(self.app_file)
+        args += [   "--no-window",
+                    "--ext-folder", ext_folder,
+                    "--enable", EXT_NAME,
+                    f"--/persistent/physics/numThreads={WORKER_CORES}",
+                    f"--{WORKER_TORQUES_SETTING}=" + ",".join(str(t) for t in torques),
+                    f"--{WORKER_RESULT_PATH_SETTING}={result_path}",
+                    f"--{WORKER_STAGE_PATH_SETTING}={self.stage_path}" ]
+        return args
+
+    async def run_async(self):
+        if self._processes:
+            print("SweepCoordinator: sweep already running")
+            return []
+
+        work_dir = tempfile.mkdtemp(prefix="jump_sweep_")
+        chunks = split_rounds(self.torques, self.num_workers)
+        print(f"SweepCoordinator: {len(self.torques)} rounds on {len(chunks)} workers")
+
+        workers = []
+        for worker_idx, (round_indices, torques) in enumerate(chunks):
+            result_path = os.path.join(work_dir, f"worker_{worker_idx}.json")
+            proc = subprocess.Popen(self.make_worker_args(torques, result_path))
+            self._processes.append(proc)
+            workers.append((proc, round_indices, result_path))
+
+        while any(proc.poll() is None for proc in self._processes):
+            await asyncio.sleep(WORKER_POLL_PERIOD)
+
+        self.results = []
+        for proc, round_indices, result_path in workers:
+            self.results += self.read_worker_results(round_indices, result_path, proc.returncode)
+
+        self._processes = []
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.results.sort(key=lambda r: r.round_idx)
+        self.best_result = select_best_round(self.results)
+        if self.results_store is not None:
+            self.results_store.append_all(self.results, self.results_store.start_sweep(self.stage_path))
+        return self.results
+
+    def read_worker_results(self, round_indices, result_path, return_code):
+        if not os.path.exists(result_path):
+            carb.log_error(f"SweepCoordinator: worker exited ({return_code}) without results for rounds {round_indices}")
+            return []
+
+        with open(result_path, "r") as f:
+            data = json.load(f)
+
+        results = []
+        for result_data in data["results"]:
+            result = RoundResult.from_dict(result_data)
+            # worker rounds are numbered 1..n within the worker, map back to the whole sweep
+            result.round_idx = round_indices[result.round_idx - 1]
+            results.append(result)
+        return results
+
+    def stop(self):
+        for proc in self._processes:
+            if proc.poll() is None:
+                proc.terminate()
+
+
+########################## Worker side ##########################
+
+_worker_runner = None
+
+# called at extension startup, returns True if this process is a sweep worker
+def start_sweep_worker_from_settings() -> bool:
+    global _worker_runner
+    settings = carb.settings.get_settings()
+    result_path = settings.get_as_string(WORKER_RESULT_PATH_SETTING)
+    if not result_path:
+        return False
+
+    torques = [float(t) for t in settings.get_as_string(WORKER_TORQUES_SETTING).split(",") if t]
+    stage_path = settings.get_as_string(WORKER_STAGE_PATH_SETTING) or MY_STAGE_NAME
+
+    def on_done_fn(results):
+        global _worker_runner
+        _worker_runner = None
+        with open(result_path, "w") as f:
+            json.dump({"torques": torques, "results": [r.to_dict() for r in results]}, f)
+        omni.kit.app.get_app().post_quit()
+
+    print(f"[{EXT_NAME}] sweep worker: {len(torques)} rounds")
+    _worker_runner = HeadlessSweepRunner(sim_torque_list=torques, stage_path=stage_path)
+    if not _worker_runner.run(on_done_fn=on_done_fn):
+        _worker_runner = None
+        omni.kit.app.get_app().post_quit(1)
+    return True
@@ -0,0 +1,150 @@
+import os
+import json
+import numpy as np
+import carb.tokens
+from concurrent.futures import ThreadPoolExecutor
+
+from omni.physx.bindings._physx import (
+    VEHICLE_WHEEL_STATE_GROUND_MATERIAL,
+    VEHICLE_WHEEL_STATE_SUSPENSION_FORCE,
+    VEHICLE_WHEEL_STATE_IS_ON_GROUND,
+    VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP,
+    VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP
+)
+
+__all__ = ['TelemetryRecorder', 'load_telemetry', 'default_telemetry_dir']
+
+# ticks kept per round, the oldest are overwritten past this
+# (60 Hz fast forward: 45 s time budget plus the burnouts fits with room to spare)
+DEFAULT_CAPACITY = 4096
+
+
+def default_telemetry_dir():
+    data_folder = carb.tokens.get_tokens_interface().resolve("${data}")
+    return os.path.join(data_folder, "omni.docs.vehicle.jumper", "telemetry")
+
+
+# Per-tick trajectory of a round in preallocated ring buffers, one compressed .npz per round.
+#
+#   time            (n,)            round sim time
+#   transform       (n, 4, 4)       vehicle local transform
+#   velocity        (n, 3)          vehicle linear velocity
+#   engine_rpm      (n,)            engine rotation speed
+#   susp_force      (n, wheels, 3)
+#   long_slip       (n, wheels)
+#   lat_slip        (n, wheels)
+#   on_ground       (n, wheels)
+#   ground_material (n, wheels)     index into materials, 0 for none
+#
+# The round logic already reads the pose and wheel states each tick and hands them over,
+# so recording is only array stores. Files are written by a background thread.
+class TelemetryRecorder():
+
+    def __init__(self, wheel_names, capacity=DEFAULT_CAPACITY):
+        self.wheel_names = list(wheel_names)
+        self.capacity = capacity
+        num_wheels = len(self.wheel_names)
+
+        self.time = np.zeros(capacity, dtype=np.float64)
+        self.transform = np.zeros((capacity, 4, 4), dtype=np.float64)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.engine_rpm = np.zeros(capacity, dtype=np.float32)
+        self.susp_force = np.zeros((capacity, num_wheels, 3), dtype=np.float32)
+        self.long_slip = np.zeros((capacity, num_wheels), dtype=np.float32)
+        self.lat_slip = np.zeros((capacity, num_wheels), dtype=np.float32)
+        self.on_ground = np.zeros((capacity, num_wheels), dtype=np.bool_)
+        self.ground_material = np.zeros((capacity, num_wheels), dtype=np.int16)
+
+        # ground material path -> small int, kept across rounds
+        self.materials = [""]
+        self._material_ids = {None: 0, "": 0}
+
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TelemetryWriter")
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._cur = -1
+
+    # starts a tick, the wheels of the same tick follow with record_wheel()
+    def record_tick(self, sim_time, transform, velocity, engine_rpm):
+        cur = self.count % self.capacity
+        self._cur = cur
+        self.count += 1
+        self.time[cur] = sim_time
+        self.transform[cur] = transform
+        if velocity is not None:
+            self.velocity[cur] = velocity
+        else:
+            self.velocity[cur] = 0.0
+        self.engine_rpm[cur] = engine_rpm
+
+        self.susp_force[cur] = 0.0
+        self.long_slip[cur] = 0.0
+        self.lat_slip[cur] = 0.0
+        self.on_ground[cur] = False
+        self.ground_material[cur] = 0
+
+    def record_wheel(self, wheel_idx, wheel_state):
+        cur = self._cur
+        if cur < 0:
+            return
+        self.susp_force[cur, wheel_idx] = wheel_state[VEHICLE_WHEEL_STATE_SUSPENSION_FORCE]
+        self.long_slip[cur, wheel_idx] = wheel_state[VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP]
+        self.lat_slip[cur, wheel_idx] = wheel_state[VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP]
+        self.on_ground[cur, wheel_idx] = wheel_state[VEHICLE_WHEEL_STATE_IS_ON_GROUND]
+
+        material = wheel_state[VEHICLE_WHEEL_STATE_GROUND_MATERIAL]
+        material_id = self._material_ids.get(material)
+        if material_id is None:
+            material_id = len(self.materials)
+            self.materials.append(str(material))
+            self._material_ids[material] = material_id
+        self.ground_material[cur, wheel_idx] = material_id
+
+    # recorded ticks, oldest first (copies, the buffers are reused next round)
+    def snapshot(self):
+        num_ticks = min(self.count, self.capacity)
+        if self.count <= self.capacity:
+            order = np.arange(num_ticks)
+        else:
+            order = (np.arange(num_ticks) + self.count) % self.capacity
+        return { "time": self.time[order],
+                 "transform": self.transform[order],
+                 "velocity": self.velocity[order],
+                 "engine_rpm": self.engine_rpm[order],
+                 "susp_force": self.susp_force[order],
+                 "long_slip": self.long_slip[order],
+                 "lat_slip": self.lat_slip[order],
+                 "on_ground": self.on_ground[order],
+                 "ground_material": self.ground_material[order] }
+
+    # writes the round to file_path in the background, returns the future
+    def flush(self, file_path, metadata=None):
+        arrays = self.snapshot()
+        arrays["materials"] = np.array(self.materials)
+        arrays["wheel_names"] = np.array(self.wheel_names)
+        arrays["metadata"] = np.array(json.dumps(metadata or {}, default=str))
+        self.reset()
+        return self._writer.submit(write_telemetry, file_path, arrays)
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+
+
+def write_telemetry(file_path, arrays):
+    folder = os.path.dirname(file_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    np.savez_compressed(file_path, **arrays)
+    return file_path
+
+
+# { name : array } of a recorded round, metadata as a dict
+def load_telemetry(file_path):
+    with np.load(file_path) as data:
+        telemetry = {name: data[name] for name in data.files}
+    telemetry["metadata"] = json.loads(str(telemetry["metadata"]))
+    telemetry["materials"] = [str(m) for m in telemetry["materials"]]
+    telemetry["wheel_names"] = [str(w) for w in telemetry["wheel_names"]]
+    return telemetry
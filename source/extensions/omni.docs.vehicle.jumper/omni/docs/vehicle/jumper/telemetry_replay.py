@@ -0,0 +1,191 @@
+import numpy as np
+import carb
+import omni.kit.app
+import omni.timeline
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from omni.physx.bindings._physx import (
+    VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED,
+    VEHICLE_WHEEL_STATE_GROUND_MATERIAL,
+    VEHICLE_WHEEL_STATE_SUSPENSION_FORCE,
+    VEHICLE_WHEEL_STATE_IS_ON_GROUND,
+    VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP,
+    VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP
+)
+
+from .telemetry import load_telemetry
+from omni.docs.vehicle.helper import get_write_queue, get_instance
+
+__all__ = ['TelemetryReplay']
+
+REPLAY_LAYER_TAG = "jump_test_replay"
+MIN_SPEED = 0.05
+MAX_SPEED = 16.0
+
+
+# Plays a recorded round (TelemetryRecorder .npz) back on the stage without PhysX:
+# the vehicle transform is written to a session sublayer each update, and the JumperCam and
+# VehicleAudio run their usual logic on the recorded state (the replay is their state source).
+# The timeline stays stopped, so a replay doesn't compete with a running sweep for the physics engine.
+#
+#   replay = TelemetryReplay(result.telemetry_path, stage, VEHICLE_PRIM_PATH, vehicle_camera, vehicle_audio)
+#   replay.play(speed=0.5)
+#   replay.seek(2.0)        # scrub, seconds into the round
+#   replay.stop()           # the stage is back as it was
+#
+# Only the vehicle body is posed, the wheels aren't in the telemetry.
+class TelemetryReplay():
+
+    def __init__(self, telemetry, stage, vehicle_prim_path, vehicle_camera=None, vehicle_audio=None,
+                 on_frame_fn=None):
+        # a file path or what load_telemetry returned
+        self.telemetry = load_telemetry(telemetry) if isinstance(telemetry, str) else telemetry
+        self.stage = stage
+        self.vehicle_prim_path = vehicle_prim_path
+        self.vehicle_prim = stage.GetPrimAtPath(vehicle_prim_path)
+        self.vehicle_camera = vehicle_camera
+        self.vehicle_audio = vehicle_audio
+        # called with the replay time after every frame (ui scrub bar)
+        self.on_frame_fn = on_frame_fn
+
+        self.times = self.telemetry["time"]
+        self.wheel_paths = [vehicle_prim_path + wheel for wheel in self.telemetry["wheel_names"]]
+        self.materials = self.telemetry["materials"]
+
+        self.speed = 1.0
+        self.playing = False
+        self.current_time = self.start_time
+        self._frame = 0
+        self._update_sub = None
+        self._replay_layer = None
+        self._transform_op = None
+        self._write_queue = get_write_queue()
+
+    @property
+    def start_time(self):
+        return float(self.times[0]) if len(self.times) else 0.0
+
+    @property
+    def end_time(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def attach(self):
+        if self._replay_layer is not None:
+            return
+        omni.timeline.get_timeline_interface().stop()
+        self._replay_layer = Sdf.Layer.CreateAnonymous(REPLAY_LAYER_TAG)
+        self.stage.GetSessionLayer().subLayerPaths.insert(0, self._replay_layer.identifier)
+        with Usd.EditContext(self.stage, self._replay_layer):
+            self._transform_op = UsdGeom.Xformable(self.vehicle_prim).MakeMatrixXform()
+
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.car_started_moving = True
+            self.vehicle_camera.state_source = self
+        if self.vehicle_audio is not None:
+            self.vehicle_audio.state_source = self
+            self.vehicle_audio.start_audio()
+
+    def play(self, speed=None):
+        if not len(self.times):
+            carb.log_warn("TelemetryReplay: no recorded ticks")
+            return
+        self.attach()
+        if speed is not None:
+            self.set_speed(speed)
+        if self.current_time >= self.end_time:
+            self.seek(self.start_time)
+        self.playing = True
+        if self._update_sub is None:
+            update_stream = omni.kit.app.get_app().get_update_event_stream()
+            self._update_sub = update_stream.create_subscription_to_pop(self.on_update, name="TelemetryReplay")
+
+    def pause(self):
+        self.playing = False
+        if self.vehicle_audio is not None:
+            self.vehicle_audio.stop_audio()
+
+    def set_speed(self, speed):
+        self.speed = min(MAX_SPEED, max(MIN_SPEED, speed))
+
+    # scrub to round time t, the camera jumps there instead of easing in
+    def seek(self, t):
+        self.attach()
+        self.current_time = min(self.end_time, max(self.start_time, t))
+        self.apply_frame()
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.snap_to_target()
+        if self.vehicle_audio is not None:
+            self.vehicle_audio.start_audio()
+
+    # fraction of the round, 0..1
+    def seek_fraction(self, fraction):
+        self.seek(self.start_time + fraction * self.duration)
+
+    def stop(self):
+        self.playing = False
+        self._update_sub = None
+        if self.vehicle_audio is not None:
+            self.vehicle_audio.stop_audio()
+            self.vehicle_audio.state_source = None
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.state_source = None
+        if self._replay_layer is not None:
+            self._write_queue.discard(self._replay_layer)
+            session_layer = self.stage.GetSessionLayer()
+            if self._replay_layer.identifier in session_layer.subLayerPaths:
+                session_layer.subLayerPaths.remove(self._replay_layer.identifier)
+            self._replay_layer = None
+            self._transform_op = None
+
+    def on_update(self, e: carb.events.IEvent):
+        if not self.playing:
+            return
+        dt = e.payload["dt"] * self.speed
+        self.current_time = min(self.end_time, self.current_time + dt)
+        self.apply_frame()
+        if self.vehicle_camera is not None:
+            self.vehicle_camera.step_camera(dt)
+        if self.vehicle_audio is not None:
+            self.vehicle_audio.step_audio(dt)
+        if self.current_time >= self.end_time:
+            self.pause()
+
+    def apply_frame(self):
+        # last recorded tick at or before the replay time
+        self._frame = max(0, int(np.searchsorted(self.times, self.current_time, side="right")) - 1)
+        self._write_queue.set(self._transform_op.GetAttr(), self.get_vehicle_transform(), self._replay_layer)
+        # the timeline is stopped, the helper only syncs the meshes when asked
+        helper = get_instance()
+        if helper is not None:
+            helper.request_sync()
+        if self.on_frame_fn is not None:
+            self.on_frame_fn(self.current_time)
+
+    ################ state source for VehicleAudio / JumperCam (same calls as physx) ################
+
+    def get_vehicle_transform(self):
+        return Gf.Matrix4d(self.telemetry["transform"][self._frame].tolist())
+
+    def get_wheel_state(self, wheel_path):
+        if wheel_path not in self.wheel_paths:
+            return None
+        wheel_idx = self.wheel_paths.index(wheel_path)
+        frame = self._frame
+        return { VEHICLE_WHEEL_STATE_SUSPENSION_FORCE: self.telemetry["susp_force"][frame, wheel_idx],
+                 VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP: float(self.telemetry["long_slip"][frame, wheel_idx]),
+                 VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP: float(self.telemetry["lat_slip"][frame, wheel_idx]),
+                 VEHICLE_WHEEL_STATE_IS_ON_GROUND: bool(self.telemetry["on_ground"][frame, wheel_idx]),
+                 VEHICLE_WHEEL_STATE_GROUND_MATERIAL: self.materials[self.telemetry["ground_material"][frame, wheel_idx]] }
+
+    def get_vehicle_drive_state(self, vehicle_path):
+        return { VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED: float(self.telemetry["engine_rpm"][self._frame]) }
+
+    def get_vehicle_velocity(self):
+        return self.telemetry["velocity"][self._frame]
+
+    def get_time(self):
+        return self.current_time
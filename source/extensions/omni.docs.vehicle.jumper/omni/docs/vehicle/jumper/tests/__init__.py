@@ -1 +1,8 @@
-from .test_hello_world import *
\ No newline at end of file
+from .test_hello_world import *
+from .test_torque_search import *
+from .test_parameter_sweep import *
+from .test_results_store import *
+from .test_round_cache import *
+from .test_telemetry import *
+from .test_landing_prediction import *
+from .test_attribute_registry import *
\ No newline at end of file
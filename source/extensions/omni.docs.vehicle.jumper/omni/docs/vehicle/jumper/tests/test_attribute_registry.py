@@ -0,0 +1,105 @@
+import omni.kit.test
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from omni.docs.vehicle.jumper.attribute_registry import AttributeRegistry, values_close
+from omni.docs.vehicle.helper.usd_write_queue import UsdWriteQueue
+
+ACCELERATOR_ATTR = "physxVehicleController:accelerator"
+GEAR_ATTR = "physxVehicleController:targetGear"
+ENABLED_ATTR = "physxVehicle:vehicleEnabled"
+
+
+def make_stage():
+    stage = Usd.Stage.CreateInMemory()
+    vehicle = UsdGeom.Xform.Define(stage, "/World/vehicle").GetPrim()
+    vehicle.CreateAttribute(ACCELERATOR_ATTR, Sdf.ValueTypeNames.Float).Set(0.0)
+    vehicle.CreateAttribute(GEAR_ATTR, Sdf.ValueTypeNames.Int).Set(0)
+    vehicle.CreateAttribute(ENABLED_ATTR, Sdf.ValueTypeNames.Bool).Set(False)
+    return stage, vehicle
+
+
+class TestValuesClose(omni.kit.test.AsyncTestCase):
+
+    async def test_numbers(self):
+        self.assertTrue(values_close(1.0, 1.0 + 1e-9))
+        self.assertFalse(values_close(1.0, 1.0 + 1e-4))
+        # relative to the size of the values
+        self.assertTrue(values_close(2.0e6, 2.0e6 + 1.0))
+        self.assertFalse(values_close(2.0e6, 2.0e6 + 100.0))
+        self.assertTrue(values_close(3, 3.0))
+        self.assertTrue(values_close(1.0, 1.01, tolerance=0.1))
+
+    async def test_bools(self):
+        self.assertTrue(values_close(True, True))
+        self.assertFalse(values_close(True, False))
+        # not numbers: True isn't 1, either way round
+        self.assertFalse(values_close(True, 1))
+        self.assertFalse(values_close(1, True))
+        self.assertFalse(values_close(0.0, False))
+
+    async def test_gf_values(self):
+        self.assertTrue(values_close(Gf.Vec3d(1.0, 2.0, 3.0), Gf.Vec3d(1.0, 2.0, 3.0 + 1e-9)))
+        self.assertFalse(values_close(Gf.Vec3d(1.0, 2.0, 3.0), Gf.Vec3d(1.0, 2.0, 3.1)))
+        self.assertFalse(values_close(Gf.Vec3d(1.0, 2.0, 3.0), Gf.Vec3f(1.0, 2.0, 3.0)))
+        self.assertTrue(values_close(Gf.Matrix4d(1.0), Gf.Matrix4d(1.0)))
+        self.assertTrue(values_close("a", "a"))
+        self.assertFalse(values_close("a", None))
+
+
+class TestAttributeRegistry(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self.stage, self.vehicle = make_stage()
+        self.layer = Sdf.Layer.CreateAnonymous()
+        self.stage.GetSessionLayer().subLayerPaths.append(self.layer.identifier)
+
+    def layer_value(self, attr_name):
+        spec = self.layer.GetAttributeAtPath(self.vehicle.GetPath().AppendProperty(attr_name))
+        return spec.default if spec else None
+
+    async def test_skip_unchanged(self):
+        attributes = AttributeRegistry(self.stage, edit_layer=self.layer)
+        self.assertTrue(attributes.set(self.vehicle, ACCELERATOR_ATTR, 1.0))
+        self.assertFalse(attributes.set(self.vehicle, ACCELERATOR_ATTR, 1.0 + 1e-9))
+        self.assertTrue(attributes.set(self.vehicle, ACCELERATOR_ATTR, 0.5))
+        self.assertTrue(attributes.set(self.vehicle, ENABLED_ATTR, True))
+        self.assertFalse(attributes.set_at_path(f"/World/vehicle.{ENABLED_ATTR}", True))
+        self.assertEqual((attributes.writes, attributes.skipped), (3, 2))
+        # written to the edit layer only
+        self.assertEqual(self.layer_value(ACCELERATOR_ATTR), 0.5)
+        self.assertEqual(self.stage.GetRootLayer().GetAttributeAtPath(f"/World/vehicle.{ACCELERATOR_ATTR}").default, 0.0)
+
+    async def test_missing_attribute(self):
+        attributes = AttributeRegistry(self.stage)
+        self.assertFalse(attributes.set(self.vehicle, "no:such:attribute", 1.0))
+        self.assertEqual(attributes.writes, 0)
+
+    async def test_reset(self):
+        attributes = AttributeRegistry(self.stage, edit_layer=self.layer)
+        attributes.set(self.vehicle, GEAR_ATTR, 1)
+        # the layer is cleared underneath, only a reset makes the registry write again
+        self.layer.Clear()
+        self.assertFalse(attributes.set(self.vehicle, GEAR_ATTR, 1))
+        attributes.reset()
+        self.assertEqual((attributes.writes, attributes.skipped), (0, 0))
+        self.assertTrue(attributes.set(self.vehicle, GEAR_ATTR, 1))
+        self.assertEqual(self.layer_value(GEAR_ATTR), 1)
+
+    async def test_write_queue(self):
+        write_queue = UsdWriteQueue()
+        write_queue.start()
+        try:
+            attributes = AttributeRegistry(self.stage, edit_layer=self.layer, write_queue=write_queue)
+            attributes.set(self.vehicle, GEAR_ATTR, 2)
+            self.assertIsNone(self.layer_value(GEAR_ATTR))
+            attributes.flush()
+            self.assertEqual(self.layer_value(GEAR_ATTR), 2)
+
+            # reset drops what's still queued for the edit layer
+            attributes.set(self.vehicle, GEAR_ATTR, 3)
+            attributes.reset()
+            self.assertEqual(len(write_queue), 0)
+            attributes.flush()
+            self.assertEqual(self.layer_value(GEAR_ATTR), 2)
+        finally:
+            write_queue.stop()
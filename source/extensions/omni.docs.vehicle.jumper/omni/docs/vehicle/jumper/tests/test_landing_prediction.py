@@ -0,0 +1,71 @@
+import omni.kit.test
+from pxr import Gf, Usd, UsdGeom, UsdPhysics, UsdShade
+
+from omni.docs.vehicle.jumper.landing_prediction import LandingPredictor
+
+OOB_MATERIAL_PATH = "/World/Materials/out_of_bounds"
+LANDING_RAMP_PATH = "/World/landing_ramp"
+START_POS = Gf.Vec3d(0.0, 0.0, 100.0)
+
+
+def add_collider(stage, path, center, half_size, material=None):
+    cube = UsdGeom.Cube.Define(stage, path)
+    cube.AddTranslateOp().Set(Gf.Vec3d(*center))
+    cube.AddScaleOp().Set(Gf.Vec3f(*half_size))
+    UsdPhysics.CollisionAPI.Apply(cube.GetPrim())
+    if material is not None:
+        UsdShade.MaterialBindingAPI.Apply(cube.GetPrim()).Bind(material, UsdShade.Tokens.weakerThanDescendants, "physics")
+    return cube
+
+
+# a course in cm, z up: the vehicle at the takeoff, a gap of out of bounds ground, the landing ramp
+def make_course():
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    UsdPhysics.Scene.Define(stage, "/World/physicsScene")
+    material = UsdShade.Material.Define(stage, OOB_MATERIAL_PATH)
+
+    vehicle = UsdGeom.Xform.Define(stage, "/World/vehicle")
+    vehicle.AddTranslateOp().Set(START_POS)
+    UsdPhysics.RigidBodyAPI.Apply(vehicle.GetPrim())
+    add_collider(stage, "/World/vehicle/chassis", (0.0, 0.0, 0.0), (50.0, 50.0, 50.0))
+
+    add_collider(stage, LANDING_RAMP_PATH, (3000.0, 0.0, 0.0), (500.0, 500.0, 100.0))
+    add_collider(stage, "/World/dead_zone", (1450.0, 0.0, -200.0), (950.0, 500.0, 50.0), material)
+    return stage
+
+
+def make_predictor(stage):
+    return LandingPredictor(stage, stage.GetPrimAtPath("/World/vehicle"), LANDING_RAMP_PATH, OOB_MATERIAL_PATH)
+
+
+class TestLandingPrediction(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self.stage = make_course()
+
+    async def test_course_bounds(self):
+        predictor = make_predictor(self.stage)
+        self.assertEqual(len(predictor.out_of_bounds_ranges), 1)
+        # the landing ramp, the vehicle's own collider isn't part of the course
+        self.assertEqual(len(predictor.collider_ranges), 1)
+        self.assertTrue(Gf.IsClose(predictor.gravity, Gf.Vec3d(0.0, 0.0, -981.0), 1e-6))
+
+    async def test_short_jump_misses(self):
+        predictor = make_predictor(self.stage)
+        self.assertTrue(predictor.predict_miss(START_POS, Gf.Vec3d(1000.0, 0.0, 0.0)))
+
+    async def test_reaches_landing_ramp(self):
+        predictor = make_predictor(self.stage)
+        self.assertFalse(predictor.predict_miss(START_POS, Gf.Vec3d(1500.0, 0.0, 800.0)))
+
+    async def test_road_in_the_way(self):
+        # the same short jump comes down on a road above the dead zone
+        add_collider(self.stage, "/World/road", (900.0, 0.0, -120.0), (600.0, 500.0, 20.0))
+        predictor = make_predictor(self.stage)
+        self.assertFalse(predictor.predict_miss(START_POS, Gf.Vec3d(1000.0, 0.0, 0.0)))
+
+    async def test_no_out_of_bounds(self):
+        self.stage.RemovePrim("/World/dead_zone")
+        predictor = make_predictor(self.stage)
+        self.assertFalse(predictor.predict_miss(START_POS, Gf.Vec3d(1000.0, 0.0, 0.0)))
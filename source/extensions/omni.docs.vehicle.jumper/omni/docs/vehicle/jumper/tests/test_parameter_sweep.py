@@ -0,0 +1,65 @@
+import random
+import omni.kit.test
+
+from omni.docs.vehicle.jumper.parameter_sweep import (
+    SweepParameter,
+    ParameterSweep,
+    latin_hypercube,
+    halton,
+    radical_inverse,
+    HALTON,
+    LATIN_HYPERCUBE,
+    FRICTION_ATTR_PATH,
+    REAR_LEFT_STIFFNESS_ATTR_PATH,
+    REAR_RIGHT_STIFFNESS_ATTR_PATH
+)
+
+
+class TestParameterSweep(omni.kit.test.AsyncTestCase):
+
+    async def test_latin_hypercube_strata(self):
+        num_samples = 10
+        design = latin_hypercube(num_samples, 3, random.Random(7))
+        self.assertEqual(len(design), num_samples)
+        for dim in range(3):
+            # one sample in every 1/num_samples slice of each dimension
+            slots = sorted(int(sample[dim] * num_samples) for sample in design)
+            self.assertEqual(slots, list(range(num_samples)))
+
+    async def test_latin_hypercube_seeded(self):
+        self.assertEqual(latin_hypercube(8, 2, random.Random(3)), latin_hypercube(8, 2, random.Random(3)))
+
+    async def test_radical_inverse(self):
+        self.assertEqual([radical_inverse(idx, 2) for idx in range(1, 5)], [0.5, 0.25, 0.75, 0.125])
+        self.assertAlmostEqual(radical_inverse(5, 3), 7.0 / 9.0)
+
+    async def test_halton_extends(self):
+        # later points only add to a design, the first ones don't change
+        self.assertEqual(halton(16, 4)[:8], halton(8, 4))
+        for sample in halton(64, 4, skip=0):
+            for value in sample:
+                self.assertTrue(0.0 <= value < 1.0)
+        with self.assertRaises(ValueError):
+            halton(4, 17)
+
+    async def test_value_at(self):
+        linear = SweepParameter(FRICTION_ATTR_PATH, 0.6, 1.2)
+        self.assertAlmostEqual(linear.value_at(0.5), 0.9)
+        log_scale = SweepParameter(REAR_LEFT_STIFFNESS_ATTR_PATH, 100.0, 10000.0, log_scale=True)
+        self.assertAlmostEqual(log_scale.value_at(0.5), 1000.0)
+
+    async def test_design_links_paths(self):
+        stiffness = SweepParameter(REAR_LEFT_STIFFNESS_ATTR_PATH, 100.0, 10000.0, log_scale=True,
+                                   linked_paths=[REAR_RIGHT_STIFFNESS_ATTR_PATH])
+        for method in (HALTON, LATIN_HYPERCUBE):
+            sweep = ParameterSweep([SweepParameter(FRICTION_ATTR_PATH, 0.6, 1.2), stiffness], 5,
+                                   method=method, seed=1)
+            design = sweep.make_design()
+            self.assertEqual(len(design), 5)
+            for round_params in design:
+                self.assertEqual(round_params[REAR_LEFT_STIFFNESS_ATTR_PATH],
+                                 round_params[REAR_RIGHT_STIFFNESS_ATTR_PATH])
+                self.assertTrue(0.6 <= round_params[FRICTION_ATTR_PATH] <= 1.2)
+
+        with self.assertRaises(ValueError):
+            ParameterSweep([stiffness], 5, method="grid").make_design()
@@ -0,0 +1,84 @@
+import os
+import math
+import tempfile
+import omni.kit.test
+
+from omni.docs.vehicle.jumper.run_test_rounds import RoundResult
+from omni.docs.vehicle.jumper.results_store import ResultsStore
+
+FRICTION_PATH = "/World/Materials/tire_friction.defaultFrictionValue"
+
+
+def make_result(round_idx, torque, success, params=None):
+    result = RoundResult(round_idx, torque)
+    result.success = success
+    result.outcome = "landed" if success else "missed"
+    result.largest_susp_force = torque / 10.0
+    result.sim_time = 4.0
+    result.params = params or {}
+    return result
+
+
+class TestResultsStore(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.store = ResultsStore(os.path.join(self._folder.name, "results.db"))
+
+    async def tearDown(self):
+        self.store.close()
+        self._folder.cleanup()
+
+    async def test_query_columns(self):
+        sweep_id = self.store.start_sweep("/stages/jump.usd")
+        self.store.append_all([make_result(idx, 3000.0 + idx * 1000.0, idx % 2 == 0) for idx in range(4)], sweep_id)
+
+        cols = self.store.query(["torque", "success", "outcome"])
+        self.assertEqual(list(cols["torque"]), [3000.0, 4000.0, 5000.0, 6000.0])
+        self.assertEqual(list(cols["outcome"]), ["landed", "missed", "landed", "missed"])
+
+        landed = self.store.query(["torque"], success=True)
+        self.assertEqual(list(landed["torque"]), [3000.0, 5000.0])
+
+    async def test_param_columns(self):
+        sweep_id = self.store.start_sweep("/stages/jump.usd")
+        self.store.append(make_result(0, 4000.0, True, {FRICTION_PATH: 0.8}), sweep_id)
+        self.store.append(make_result(1, 5000.0, True), sweep_id)
+
+        cols = self.store.query(["torque"], param_paths=[FRICTION_PATH])
+        self.assertEqual(cols[FRICTION_PATH][0], 0.8)
+        self.assertTrue(math.isnan(cols[FRICTION_PATH][1]))
+
+        with self.assertRaises(ValueError):
+            self.store.query(["no_such_column"])
+
+    async def test_sweeps_and_stages(self):
+        first = self.store.start_sweep("/stages/a.usd")
+        second = self.store.start_sweep("/stages/b.usd")
+        self.store.append(make_result(0, 4000.0, True), first)
+        self.store.append(make_result(0, 4500.0, False), second)
+        self.store.append(make_result(1, 5000.0, True), first)
+
+        self.assertEqual(self.store.sweep_ids(), [first, second])
+        self.assertEqual(self.store.sweep_ids(stage="/stages/b.usd"), [second])
+        results = self.store.load_results(sweep_id=first)
+        self.assertEqual([result.torque for result in results], [4000.0, 5000.0])
+        self.assertTrue(all(result.success for result in results))
+
+    async def test_rows_survive_close(self):
+        sweep_id = self.store.start_sweep("/stages/jump.usd")
+        self.store.append(make_result(0, 4000.0, True, {FRICTION_PATH: 1.1}), sweep_id)
+        self.store.close()
+
+        self.store = ResultsStore(self.store.db_path)
+        results = self.store.load_results()
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].params, {FRICTION_PATH: 1.1})
+
+    async def test_append_after_close(self):
+        sweep_id = self.store.start_sweep("/stages/jump.usd")
+        self.store.append(make_result(0, 4000.0, True), sweep_id)
+        self.store.close()
+        # dropped, and reading doesn't wait on the stopped writer
+        self.store.append(make_result(1, 5000.0, True), sweep_id)
+        self.assertEqual([result.torque for result in self.store.load_results()], [4000.0])
@@ -0,0 +1,121 @@
+import os
+import time
+import tempfile
+import omni.kit.test
+from pxr import Gf, Usd, UsdGeom, UsdPhysics
+
+from omni.docs.vehicle.jumper.run_test_rounds import RoundResult
+from omni.docs.vehicle.jumper.round_cache import RoundCache, round_key, stage_digest
+
+FRICTION_PATH = "/World/Materials/tire_friction.defaultFrictionValue"
+MOI_PATH = "/World/WizardVehicle1/Vehicle.physxVehicleEngine:moi"
+
+
+def make_result(torque, success=True):
+    result = RoundResult(0, torque)
+    result.success = success
+    result.outcome = "landed" if success else "missed"
+    result.largest_susp_force = 5000.0
+    result.sim_time = 4.0
+    return result
+
+
+# a ramp, a rigid body, and the presentation prims the jumper writes to every frame
+def make_stage():
+    stage = Usd.Stage.CreateInMemory()
+    UsdPhysics.Scene.Define(stage, "/World/physicsScene")
+    ramp = UsdGeom.Cube.Define(stage, "/World/ramp")
+    ramp.AddTranslateOp().Set(Gf.Vec3d(0.0, 0.0, 0.0))
+    UsdPhysics.CollisionAPI.Apply(ramp.GetPrim())
+    body = UsdGeom.Xform.Define(stage, "/World/car")
+    UsdPhysics.RigidBodyAPI.Apply(body.GetPrim())
+    UsdPhysics.MassAPI.Apply(body.GetPrim()).CreateMassAttr(1000.0)
+    UsdGeom.Camera.Define(stage, "/World/camera").AddTransformOp().Set(Gf.Matrix4d(1.0))
+    UsdGeom.Mesh.Define(stage, "/World/car_mesh").AddTransformOp().Set(Gf.Matrix4d(1.0))
+    return stage
+
+
+class TestRoundCache(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._folder.name, "round_cache.db")
+
+    async def tearDown(self):
+        self._folder.cleanup()
+
+    async def test_round_key(self):
+        params = {FRICTION_PATH: 0.8, MOI_PATH: 1.5}
+        same_params = {MOI_PATH: 1.5, FRICTION_PATH: 0.8}
+        self.assertEqual(round_key("digest", 5000.2, params), round_key("digest", 4999.8, same_params))
+        self.assertNotEqual(round_key("digest", 5000.0, params), round_key("digest", 5001.0, params))
+        self.assertNotEqual(round_key("digest", 5000.0, params), round_key("other", 5000.0, params))
+        self.assertNotEqual(round_key("digest", 5000.0, params), round_key("digest", 5000.0, {FRICTION_PATH: 0.8}))
+
+    async def test_stage_digest_ignores_presentation(self):
+        stage = make_stage()
+        digest = stage_digest(stage, ["fast forward"])
+        stage.GetAttributeAtPath("/World/camera.xformOp:transform").Set(Gf.Matrix4d(2.0))
+        stage.GetAttributeAtPath("/World/car_mesh.xformOp:transform").Set(Gf.Matrix4d(3.0))
+        self.assertEqual(stage_digest(stage, ["fast forward"]), digest)
+        self.assertNotEqual(stage_digest(stage, ["real time"]), digest)
+
+    async def test_stage_digest_follows_physics(self):
+        stage = make_stage()
+        digest = stage_digest(stage)
+        stage.GetAttributeAtPath("/World/car.physics:mass").Set(1200.0)
+        mass_digest = stage_digest(stage)
+        self.assertNotEqual(mass_digest, digest)
+        stage.GetAttributeAtPath("/World/ramp.xformOp:translate").Set(Gf.Vec3d(0.0, 50.0, 0.0))
+        moved_digest = stage_digest(stage)
+        self.assertNotEqual(moved_digest, mass_digest)
+        stage.GetAttributeAtPath("/World/ramp.size").Set(4.0)
+        self.assertNotEqual(stage_digest(stage), moved_digest)
+
+    async def test_put_get(self):
+        cache = RoundCache(self.db_path)
+        key = round_key("digest", 5000.0, {})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "digest", make_result(5000.0))
+        self.assertEqual(cache.get(key)["outcome"], "landed")
+        self.assertEqual(len(cache), 1)
+        cache.close()
+
+        # still there for the next session
+        cache = RoundCache(self.db_path)
+        self.assertEqual(cache.get(key)["sim_time"], 4.0)
+        cache.close()
+
+    async def test_evicts_least_recently_used(self):
+        cache = RoundCache(self.db_path, max_entries=2)
+        keys = [round_key("digest", torque, {}) for torque in (4000.0, 5000.0, 6000.0)]
+        for key, torque in zip(keys, (4000.0, 5000.0, 6000.0)):
+            cache.put(key, "digest", make_result(torque))
+            time.sleep(0.01)
+        # the first is used again, the second is the oldest now
+        cache.get(keys[0])
+        cache.evict()
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        cache.close()
+
+    async def test_evicts_old_entries(self):
+        cache = RoundCache(self.db_path, max_age_days=1.0)
+        key = round_key("digest", 5000.0, {})
+        cache.put(key, "digest", make_result(5000.0))
+        with cache._conn:
+            cache._conn.execute("UPDATE rounds SET last_used = ?", (time.time() - 2 * 24 * 3600,))
+        cache.evict()
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+    async def test_invalidate(self):
+        cache = RoundCache(self.db_path)
+        cache.put(round_key("first", 5000.0, {}), "first", make_result(5000.0))
+        cache.put(round_key("second", 5000.0, {}), "second", make_result(5000.0, False))
+        self.assertEqual(cache.invalidate("first"), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.invalidate(), 1)
+        self.assertEqual(len(cache), 0)
+        cache.close()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import numpy as np
+import omni.kit.test
+
+from omni.physx.bindings._physx import (
+    VEHICLE_WHEEL_STATE_GROUND_MATERIAL,
+    VEHICLE_WHEEL_STATE_SUSPENSION_FORCE,
+    VEHICLE_WHEEL_STATE_IS_ON_GROUND,
+    VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP,
+    VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP
+)
+from omni.docs.vehicle.jumper.telemetry import TelemetryRecorder, load_telemetry
+
+WHEEL_NAMES = ["/LeftWheel1References", "/RightWheel1References"]
+ROAD = "/World/Materials/road"
+RAMP = "/World/Materials/ramp"
+
+
+def wheel_state(susp_force, material):
+    return { VEHICLE_WHEEL_STATE_SUSPENSION_FORCE: (0.0, susp_force, 0.0),
+             VEHICLE_WHEEL_STATE_TIRE_LONGITUDINAL_SLIP: 0.1,
+             VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP: 0.01,
+             VEHICLE_WHEEL_STATE_IS_ON_GROUND: material is not None,
+             VEHICLE_WHEEL_STATE_GROUND_MATERIAL: material }
+
+
+def record(recorder, num_ticks):
+    for tick in range(num_ticks):
+        recorder.record_tick(tick / 60.0, np.eye(4), (100.0 * tick, 0.0, 0.0), 500.0 + tick)
+        recorder.record_wheel(0, wheel_state(float(tick), ROAD))
+        recorder.record_wheel(1, wheel_state(float(tick), RAMP if tick % 2 else None))
+
+
+class TestTelemetry(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+
+    async def tearDown(self):
+        self._folder.cleanup()
+
+    async def test_snapshot_in_order(self):
+        recorder = TelemetryRecorder(WHEEL_NAMES, capacity=8)
+        record(recorder, 5)
+        snapshot = recorder.snapshot()
+        self.assertEqual(len(snapshot["time"]), 5)
+        self.assertEqual(list(snapshot["engine_rpm"]), [500.0, 501.0, 502.0, 503.0, 504.0])
+        self.assertEqual(list(snapshot["susp_force"][:, 0, 1]), [0.0, 1.0, 2.0, 3.0, 4.0])
+        recorder.close()
+
+    async def test_ring_keeps_newest(self):
+        recorder = TelemetryRecorder(WHEEL_NAMES, capacity=8)
+        record(recorder, 20)
+        snapshot = recorder.snapshot()
+        # the last 8 ticks, oldest first
+        self.assertEqual(list(snapshot["engine_rpm"]), [500.0 + tick for tick in range(12, 20)])
+        self.assertTrue(np.all(np.diff(snapshot["time"]) > 0))
+        recorder.close()
+
+    async def test_materials_interned(self):
+        recorder = TelemetryRecorder(WHEEL_NAMES, capacity=8)
+        record(recorder, 4)
+        snapshot = recorder.snapshot()
+        self.assertEqual(recorder.materials, ["", ROAD, RAMP])
+        self.assertEqual(list(snapshot["ground_material"][:, 0]), [1, 1, 1, 1])
+        self.assertEqual(list(snapshot["ground_material"][:, 1]), [0, 2, 0, 2])
+        self.assertEqual(list(snapshot["on_ground"][:, 1]), [False, True, False, True])
+        recorder.close()
+
+    async def test_flush_round_trip(self):
+        recorder = TelemetryRecorder(WHEEL_NAMES, capacity=8)
+        record(recorder, 6)
+        file_path = os.path.join(self._folder.name, "rounds", "round_0.npz")
+        written = recorder.flush(file_path, metadata={"torque": 5000.0}).result()
+        self.assertEqual(written, file_path)
+        # the buffers are free for the next round
+        self.assertEqual(recorder.count, 0)
+        recorder.close()
+
+        telemetry = load_telemetry(file_path)
+        self.assertEqual(telemetry["metadata"], {"torque": 5000.0})
+        self.assertEqual(telemetry["wheel_names"], WHEEL_NAMES)
+        self.assertEqual(telemetry["materials"], ["", ROAD, RAMP])
+        self.assertEqual(telemetry["transform"].shape, (6, 4, 4))
+        self.assertEqual(list(telemetry["velocity"][:, 0]), [100.0 * tick for tick in range(6)])
@@ -0,0 +1,49 @@
+import omni.kit.test
+
+from omni.docs.vehicle.jumper.torque_search import AdaptiveTorqueSearch
+
+
+# what the search reads from a RoundResult: lands between feasible_low and feasible_high,
+# suspension force growing with the square of the distance from the best torque
+class FakeResult():
+
+    def __init__(self, torque, feasible_low, feasible_high, best_torque):
+        self.torque = torque
+        self.success = feasible_low <= torque <= feasible_high
+        self.soft_landing = True
+        self.largest_susp_force = (torque - best_torque) ** 2 + 1000.0
+        self.largest_body_impulse = 0.0
+
+
+def run_search(search, feasible_low, feasible_high, best_torque):
+    while not search.is_done():
+        search.report_result(FakeResult(search.next_torque(), feasible_low, feasible_high, best_torque))
+    return search
+
+
+class TestAdaptiveTorqueSearch(omni.kit.test.AsyncTestCase):
+
+    async def test_converges_on_parabola(self):
+        for tolerance in (50.0, 1.0):
+            search = run_search(AdaptiveTorqueSearch(3000.0, 10000.0, tolerance), 4000.0, 9000.0, 6200.0)
+            self.assertLessEqual(search.rounds, 6)
+            self.assertAlmostEqual(search.best_torque, 6200.0, delta=tolerance)
+
+    async def test_converges_near_window_edge(self):
+        for best_torque in (4100.0, 8900.0):
+            search = run_search(AdaptiveTorqueSearch(3000.0, 10000.0, 50.0), 4000.0, 9000.0, best_torque)
+            self.assertLessEqual(search.rounds, 8)
+            self.assertAlmostEqual(search.best_torque, best_torque, delta=50.0)
+
+    async def test_stays_in_range_without_landings(self):
+        search = run_search(AdaptiveTorqueSearch(3000.0, 10000.0, 50.0), 20000.0, 30000.0, 25000.0)
+        self.assertEqual(search.rounds, search.max_rounds)
+        self.assertIsNone(search.feasible_low)
+        for torque, _ in search.tested:
+            self.assertTrue(3000.0 <= torque <= 10000.0)
+
+    async def test_reset(self):
+        search = run_search(AdaptiveTorqueSearch(3000.0, 10000.0, 50.0), 4000.0, 9000.0, 6200.0)
+        search.reset()
+        self.assertEqual(search.rounds, 0)
+        self.assertEqual(search.next_torque(), 3000.0)
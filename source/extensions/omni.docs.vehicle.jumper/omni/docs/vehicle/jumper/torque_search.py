@@ -0,0 +1,165 @@
+import math
+
+__all__ = ['AdaptiveTorqueSearch', 'round_score']
+
+GOLDEN_SECTION = 0.381966011250105  # 2 - golden ratio
+
+DEFAULT_INITIAL_SAMPLES = 3
+DEFAULT_MAX_ROUNDS = 12
+
+
+# lower is better, same order as is_better_round:
+# soft landings by suspension force, then hard landings by body impulse, then failures
+def round_score(result):
+    if not result.success:
+        return (2, math.inf)
+    if result.soft_landing:
+        return (0, result.largest_susp_force)
+    return (1, result.largest_body_impulse)
+
+
+# Picks the next torque to test from the results so far, instead of evenly spaced steps.
+# - probes a few evenly spaced torques to find the feasible window (torques that land on the ramp)
+# - if nothing lands, bisects the largest untested gap until the gaps are under tolerance
+# - then narrows in on the best landing around the best round: a parabolic step through the best
+#   round and the nearest landings of the same kind when the parabola has its minimum inside the
+#   bracket (the rounds either side of the best), golden-section steps otherwise
+# - stops when the bracket is under tolerance, when the parabola's vertex is within tolerance of
+#   the best round or of the last vertex tested, when a round improved on the best but moved it
+#   less than tolerance, or at max_rounds
+#
+# JumpTestRound uses it when sim_data.torque_search is set.
+class AdaptiveTorqueSearch():
+
+    def __init__(self, min_torque, max_torque, tolerance, initial_samples=DEFAULT_INITIAL_SAMPLES,
+                 max_rounds=DEFAULT_MAX_ROUNDS):
+        self.min_torque = min(min_torque, max_torque)
+        self.max_torque = max(min_torque, max_torque)
+        self.tolerance = max(tolerance, 1.0)
+        self.initial_samples = max(1, initial_samples)
+        self.max_rounds = max_rounds
+        self.reset()
+
+    def reset(self):
+        # (torque, score) for every round, kept sorted by torque
+        self.tested = []
+        self._next_torque = None
+        # how far the last round moved the best torque, None if it didn't improve on it
+        self.last_best_move = None
+        self._last_vertex = None
+
+    @property
+    def rounds(self):
+        return len(self.tested)
+
+    @property
+    def best_torque(self):
+        if not self.tested:
+            return None
+        return min(self.tested, key=lambda ts: ts[1])[0]
+
+    @property
+    def feasible_low(self):
+        landed = [t for t, score in self.tested if score[0] < 2]
+        return min(landed) if landed else None
+
+    @property
+    def feasible_high(self):
+        landed = [t for t, score in self.tested if score[0] < 2]
+        return max(landed) if landed else None
+
+    def report_result(self, result):
+        previous_best = self.best_torque
+        self.tested.append((result.torque, round_score(result)))
+        self.tested.sort(key=lambda ts: ts[0])
+        self._next_torque = None
+        best = self.best_torque
+        self.last_best_move = abs(best - previous_best) if previous_best is not None and best != previous_best else None
+
+    def is_done(self):
+        return self.next_torque() is None
+
+    def next_torque(self):
+        if self._next_torque is None and self.rounds < self.max_rounds:
+            self._next_torque = self.pick_next_torque()
+        return self._next_torque
+
+    def pick_next_torque(self):
+        # coarse probes first
+        if self.rounds < self.initial_samples:
+            if self.initial_samples == 1:
+                return (self.min_torque + self.max_torque) / 2.0
+            torque_inc = (self.max_torque - self.min_torque) / float(self.initial_samples - 1)
+            return self.min_torque + torque_inc * self.rounds
+
+        if self.feasible_low is None:
+            return self.bisect_largest_gap()
+
+        return self.golden_section_step()
+
+    def bisect_largest_gap(self):
+        torques = [self.min_torque] + [t for t, _ in self.tested] + [self.max_torque]
+        gap, low = max((torques[idx + 1] - torques[idx], torques[idx]) for idx in range(len(torques) - 1))
+        if gap <= self.tolerance:
+            return None
+        return low + gap / 2.0
+
+    def golden_section_step(self):
+        best_idx = min(range(self.rounds), key=lambda idx: self.tested[idx][1])
+        best = self.tested[best_idx][0]
+        # bracket is the neighbouring rounds, or the end of the range
+        low = self.tested[best_idx - 1][0] if best_idx > 0 else self.min_torque
+        high = self.tested[best_idx + 1][0] if best_idx + 1 < self.rounds else self.max_torque
+        if high - low <= self.tolerance:
+            return None
+        # the estimate has settled, past the coarse probes
+        if (self.rounds > self.initial_samples and self.last_best_move is not None
+                and self.last_best_move < self.tolerance):
+            return None
+
+        vertex, centred = self.parabolic_vertex(best, low, high)
+        if vertex is not None:
+            # landings either side agree the minimum is at the best round,
+            # or the fit puts it where it did last time, after testing there
+            if (centred and abs(vertex - best) < self.tolerance) or (
+                    self._last_vertex is not None and abs(vertex - self._last_vertex) < self.tolerance):
+                return None
+            if abs(vertex - best) >= self.tolerance:
+                self._last_vertex = vertex
+                return vertex
+
+        # step into the larger side of the bracket
+        if high - best > best - low:
+            return best + GOLDEN_SECTION * (high - best)
+        return best - GOLDEN_SECTION * (best - low)
+
+    # (vertex, centred): minimum of the parabola through the best round and the two nearest
+    # rounds of the same landing kind inside the feasible window, centred when they're on either
+    # side of the best. vertex is None if there aren't three, the parabola has no minimum,
+    # or the minimum is outside the bracket or too close to its ends.
+    def parabolic_vertex(self, best, low, high):
+        kind = min(score for _, score in self.tested)[0]
+        if kind == 2:
+            return None, False
+        same_kind = [(t, score[1]) for t, score in self.tested
+                     if score[0] == kind and self.feasible_low <= t <= self.feasible_high]
+        if len(same_kind) < 3:
+            return None, False
+        best_pos = [t for t, _ in same_kind].index(best)
+        start = min(max(best_pos - 1, 0), len(same_kind) - 3)
+        centred = start == best_pos - 1
+        (t0, f0), (t1, f1), (t2, f2) = same_kind[start:start + 3]
+
+        # second difference, positive when the parabola opens upwards
+        curvature = ((f2 - f1) / (t2 - t1) - (f1 - f0) / (t1 - t0)) / (t2 - t0)
+        if curvature <= 0:
+            return None, False
+        denom = (t1 - t0) * (f1 - f2) - (t1 - t2) * (f1 - f0)
+        if denom == 0:
+            return None, False
+        numer = (t1 - t0) ** 2 * (f1 - f2) - (t1 - t2) ** 2 * (f1 - f0)
+        torque = t1 - 0.5 * numer / denom
+        min_spacing = self.tolerance * 0.5
+        if not (low + min_spacing < torque < high - min_spacing):
+            return None, False
+        return torque, centred
@@ -2,6 +2,8 @@ import omni
 import omni.timeline
 from omni.physx.scripts.physicsUtils import *
 from omni.physx import get_physx_interface, get_physx_simulation_interface
+from .attribute_registry import AttributeRegistry
+from omni.docs.vehicle.helper import get_write_queue, timed
 import random
 
 from omni.physx.bindings._physx import (
@@ -47,6 +49,8 @@ class VehicleAudio():
         self.last_slam_size = -1.0        
         
         self.physx_interface = omni.physx.get_physx_interface()
+        # vehicle state comes from physx, or from this when set (TelemetryReplay)
+        self.state_source = None
         # sim has let off throttle due to round's end
         self.killed_throttle = False
         # when flying through the air with the throttle down, wind up engine
@@ -81,6 +85,9 @@ class VehicleAudio():
         
 
         if self.stage is not None:
+            self.attributes = AttributeRegistry(self.stage, write_queue=get_write_queue())
+            # slam and impacts: spawn_voice() reads gain and timeScale right away, these aren't queued
+            self.voice_attributes = AttributeRegistry(self.stage)
             self.vehicle_prim = self.stage.GetPrimAtPath(self.vehicle_prim_path)
 
             self.audio_prims['tire_skid'] = self.stage.GetPrimAtPath(self.audio_tire_skid_prim_path)
@@ -103,17 +110,17 @@ class VehicleAudio():
         self.last_impact_time = -10.0
         self.last_impact_size = -1
         self.last_slam_time = -10.0
-        self.audio_slam_prim.GetAttribute("gain").Set(0.0)
+        self.voice_attributes.set(self.audio_slam_prim, "gain", 0.0)
         for prim in self.audio_prims.values():
-            prim.GetAttribute("timeScale").Set(1.0)
-            prim.GetAttribute("gain").Set(0.0)
-            prim.GetAttribute("loopCount").Set(-1)
+            self.attributes.set(prim, "timeScale", 1.0)
+            self.attributes.set(prim, "gain", 0.0)
+            self.attributes.set(prim, "loopCount", -1)
             #prim.GetAttribute("startTime").Set(-1)
         
         for prim in self.audio_impact_prims.values():
-            prim.GetAttribute("timeScale").Set(1.0)
-            prim.GetAttribute("gain").Set(1)
-            prim.GetAttribute("loopCount").Set(0)
+            self.voice_attributes.set(prim, "timeScale", 1.0)
+            self.voice_attributes.set(prim, "gain", 1)
+            self.voice_attributes.set(prim, "loopCount", 0)
         
         
     def stop_audio(self):   
@@ -121,18 +128,33 @@ class VehicleAudio():
         self.last_impact_time = -10.0
         self.last_impact_size = -1
         self.last_slam_time = -10.0
-        self.audio_slam_prim.GetAttribute("gain").Set(0.0)
+        self.voice_attributes.set(self.audio_slam_prim, "gain", 0.0)
         for prim in self.audio_prims.values():
-            prim.GetAttribute("timeScale").Set(1.0)
-            prim.GetAttribute("gain").Set(0.0)
-            prim.GetAttribute("loopCount").Set(-1)
+            self.attributes.set(prim, "timeScale", 1.0)
+            self.attributes.set(prim, "gain", 0.0)
+            self.attributes.set(prim, "loopCount", -1)
             
         for prim in self.audio_impact_prims.values():
-            prim.GetAttribute("timeScale").Set(1.0)
-            prim.GetAttribute("gain").Set(1)
-            prim.GetAttribute("loopCount").Set(0)        
+            self.voice_attributes.set(prim, "timeScale", 1.0)
+            self.voice_attributes.set(prim, "gain", 1)
+            self.voice_attributes.set(prim, "loopCount", 0)        
             
+    def get_wheel_state(self, wheel_path):
+        source = self.state_source or self.physx_interface
+        return source.get_wheel_state(wheel_path)
+
+    def get_vehicle_drive_state(self, vehicle_path):
+        source = self.state_source or self.physx_interface
+        return source.get_vehicle_drive_state(vehicle_path)
+
+    def get_vehicle_velocity(self):
+        if self.state_source is not None:
+            return self.state_source.get_vehicle_velocity()
+        return self.vehicle_prim.GetAttribute(UsdPhysics.Tokens.physicsVelocity).Get()
+
     def get_time(self):
+        if self.state_source is not None:
+            return self.state_source.get_time()
         timeline = omni.timeline.get_timeline_interface()
         ct = timeline.get_current_time()
         tcps = timeline.get_time_codes_per_seconds()
@@ -171,8 +193,8 @@ class VehicleAudio():
         impact_n = "impact_heavy_" + str(s_idx)
         #print(f"impact_n: {impact_n}")
         prim = self.audio_impact_prims[impact_n]
-        prim.GetAttribute("timeScale").Set(1)
-        prim.GetAttribute("gain").Set(mag)
+        self.voice_attributes.set(prim, "timeScale", 1)
+        self.voice_attributes.set(prim, "gain", mag)
         #prim.GetAttribute("loopCount").Set(1)
         #self.impactsound = self._audio.spawn_voice(prim)
         print("##########################################")
@@ -184,7 +206,11 @@ class VehicleAudio():
             self.impact_sound_idx = 0
  
         
+    @timed("VehicleAudio.update_audio")
     def update_audio(self, e: carb.events.IEvent):
+        self.step_audio(e.payload["dt"])
+
+    def step_audio(self, dt):
          
         # Iterate over all the wheels for 2 things:
         # - get the slip contribution for each tire that's on the ground
@@ -197,7 +223,7 @@ class VehicleAudio():
         largest_slip = 0        
         for curWheel in self.sim_data.wheel_list:
             CurWheelPath = self.sim_data.vehicle_prim_path + curWheel
-            wheelState = self.physx_interface.get_wheel_state(CurWheelPath)
+            wheelState = self.get_wheel_state(CurWheelPath)
             if wheelState: 
                     
                 lateralSlip = wheelState[VEHICLE_WHEEL_STATE_TIRE_LATERAL_SLIP]
@@ -233,7 +259,7 @@ class VehicleAudio():
                         self.last_slam_time = curtime
                         self.last_slam_size = f_mag
                         slam_p = self.audio_slam_prim
-                        slam_p.GetAttribute("gain").Set(f_mag)
+                        self.voice_attributes.set(slam_p, "gain", f_mag)
                         self._audio.spawn_voice(slam_p)
    
                         
@@ -263,12 +289,12 @@ class VehicleAudio():
         #print(f"largest_slip: {largest_slip}")
 
         skid_p = self.audio_prims['tire_skid']          
-        skid_p.GetAttribute("timeScale").Set(largest_slip)
-        skid_p.GetAttribute("gain").Set(slip_amt)
+        self.attributes.set(skid_p, "timeScale", largest_slip)
+        self.attributes.set(skid_p, "gain", slip_amt)
             
         #if self.sim_data.audio_car_engine_prim:
         if self.audio_prims['engine'] is not None:
-            drive_state = self.physx_interface.get_vehicle_drive_state(self.vehicle_prim_path)
+            drive_state = self.get_vehicle_drive_state(self.vehicle_prim_path)
             rpm = drive_state[VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED]
             #self.ui_data.engine_rpm_model.as_float = rpm
             rpm_amt = rpm / self.sim_data.engine_max_rpm
@@ -280,8 +306,8 @@ class VehicleAudio():
                     rev_amt = ((rpm_amt - RPM_REV_START) / rev_range) + (self.off_ground_windup / 3.0)
                     rev_scale = 1.5 + (self.off_ground_windup / 3.0)
                     #self.audio_prims['rev']
-                    self.audio_prims['rev'].GetAttribute("timeScale").Set(1.0 + (rev_amt * rev_scale))
-                    self.audio_prims['rev'].GetAttribute("gain").Set(rev_amt)
+                    self.attributes.set(self.audio_prims['rev'], "timeScale", 1.0 + (rev_amt * rev_scale))
+                    self.attributes.set(self.audio_prims['rev'], "gain", rev_amt)
             
 
             self.ui_data.engine_rpm_model.as_float = rpm_amt
@@ -289,8 +315,7 @@ class VehicleAudio():
             if self.killed_throttle:
                 amt *= 0.5
                 
-            velAttr = self.vehicle_prim.GetAttribute(UsdPhysics.Tokens.physicsVelocity)
-            vehicle_vel = velAttr.Get() 
+            vehicle_vel = self.get_vehicle_velocity()
             velmag = math.sqrt( vehicle_vel[0] * vehicle_vel[0] + 
                                 vehicle_vel[1] * vehicle_vel[1] + 
                                 vehicle_vel[2] * vehicle_vel[2])
@@ -306,17 +331,17 @@ class VehicleAudio():
             # but lerp in and out at different rates, since landing brings the
             # engine back to its "proper" rpm quickly 
             if all_wheels_off_ground and not self.killed_throttle:
-                self.off_ground_windup = min(OFF_GROUND_RAMP_UP_MAX, self.off_ground_windup + OFF_GROUND_RAMP_UP_SPEED * e.payload["dt"]) 
+                self.off_ground_windup = min(OFF_GROUND_RAMP_UP_MAX, self.off_ground_windup + OFF_GROUND_RAMP_UP_SPEED * dt) 
                             
             else: # on ground, wind back down  
                 if self.off_ground_windup > 0.0: # false most common, skip calcs
-                    self.off_ground_windup = max(0.0, self.off_ground_windup - OFF_GROUND_RAMP_DOWN_SPEED * e.payload["dt"]   )
+                    self.off_ground_windup = max(0.0, self.off_ground_windup - OFF_GROUND_RAMP_DOWN_SPEED * dt   )
                      
             scale += self.off_ground_windup 
             engine_p = self.audio_prims['engine']
-            engine_p.GetAttribute("timeScale").Set(scale  )
+            self.attributes.set(engine_p, "timeScale", scale)
             #engine_p.GetAttribute("gain").Set(0.75) 
-            engine_p.GetAttribute("gain").Set(scale / 2.5) 
+            self.attributes.set(engine_p, "gain", scale / 2.5) 
             
            # print(f"scale ========== {scale}")
             
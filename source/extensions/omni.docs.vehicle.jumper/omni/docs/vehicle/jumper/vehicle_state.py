@@ -0,0 +1,112 @@
+import omni.timeline
+import omni.physx
+from pxr import Gf, UsdGeom, UsdPhysics
+
+from omni.physx.bindings._physx import VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED
+
+__all__ = ['VehicleState']
+
+
+# One sample of the vehicle per physics tick, shared by the round logic, VehicleAudio and JumperCam.
+# sample() starts a new tick; each value is read from PhysX/USD the first time it's asked for
+# in that tick and kept until the next sample(), so nothing is queried twice and nothing
+# nobody uses is queried at all.
+#
+# Answers the same calls as the physx interface (get_wheel_state, get_vehicle_drive_state),
+# so it can be a VehicleAudio / JumperCam state_source.
+#
+# Sampled from physics step events, pass the step's sim time and pose_from_physx: USD and the
+# timeline only catch up once per frame, PhysX has the pose of the step that just ran.
+# The velocity still comes from USD (refreshed every frame).
+class VehicleState():
+
+    def __init__(self, vehicle_prim, wheel_paths, physx_interface=None, pose_from_physx=False):
+        self.vehicle_prim = vehicle_prim
+        self.vehicle_path = str(vehicle_prim.GetPath())
+        self.wheel_paths = list(wheel_paths)
+        self._wheel_idx = {path: idx for idx, path in enumerate(self.wheel_paths)}
+        self._physx = physx_interface or omni.physx.get_physx_interface()
+        self._timeline = omni.timeline.get_timeline_interface()
+        self.pose_from_physx = pose_from_physx
+        self.sample()
+
+    # sim_time None: the timeline's current time
+    def sample(self, sim_time=None):
+        self._time = sim_time
+        self._transform = None
+        self._velocity = None
+        self._drive_state = None
+        self._wheel_states = [None] * len(self.wheel_paths)
+        self._wheel_sampled = [False] * len(self.wheel_paths)
+
+    @property
+    def time(self):
+        if self._time is None:
+            self._time = self._timeline.get_current_time()
+        return self._time
+
+    @property
+    def transform(self):
+        if self._transform is None:
+            if self.pose_from_physx:
+                self._transform = self.physx_transform()
+            if self._transform is None:
+                self._transform = UsdGeom.Xformable(self.vehicle_prim).GetLocalTransformation()
+        return self._transform
+
+    # rigid body pose as a matrix, None if PhysX doesn't know the body (yet)
+    def physx_transform(self):
+        body = self._physx.get_rigidbody_transformation(self.vehicle_path)
+        if not body or not body["ret_val"]:
+            return None
+        rot = body["rotation"]
+        transform = Gf.Matrix4d(1.0)
+        # PhysX quaternions are x, y, z, w
+        transform.SetRotateOnly(Gf.Quatd(rot[3], rot[0], rot[1], rot[2]))
+        transform.SetTranslateOnly(Gf.Vec3d(body["position"][0], body["position"][1], body["position"][2]))
+        return transform
+
+    @property
+    def position(self):
+        return self.transform.ExtractTranslation()
+
+    @property
+    def velocity(self):
+        if self._velocity is None:
+            self._velocity = self.vehicle_prim.GetAttribute(UsdPhysics.Tokens.physicsVelocity).Get()
+        return self._velocity
+
+    @property
+    def engine_rpm(self):
+        drive_state = self.get_vehicle_drive_state(self.vehicle_path)
+        return drive_state[VEHICLE_DRIVE_STATE_ENGINE_ROTATION_SPEED] if drive_state else 0.0
+
+    def wheel_state(self, wheel_idx):
+        if not self._wheel_sampled[wheel_idx]:
+            self._wheel_states[wheel_idx] = self._physx.get_wheel_state(self.wheel_paths[wheel_idx])
+            self._wheel_sampled[wheel_idx] = True
+        return self._wheel_states[wheel_idx]
+
+    ################ same calls as physx / TelemetryReplay ################
+
+    def get_wheel_state(self, wheel_path):
+        wheel_idx = self._wheel_idx.get(wheel_path)
+        if wheel_idx is None:
+            return self._physx.get_wheel_state(wheel_path)
+        return self.wheel_state(wheel_idx)
+
+    def get_vehicle_drive_state(self, vehicle_path):
+        if vehicle_path != self.vehicle_path:
+            return self._physx.get_vehicle_drive_state(vehicle_path)
+        if self._drive_state is None:
+            self._drive_state = self._physx.get_vehicle_drive_state(vehicle_path)
+        return self._drive_state
+
+    def get_vehicle_velocity(self):
+        return self.velocity
+
+    def get_vehicle_transform(self):
+        return self.transform
+
+    def get_time(self):
+        return self.time